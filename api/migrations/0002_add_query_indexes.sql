@@ -0,0 +1,11 @@
+-- Migration: secondary indexes for tenant-scoped listings and keyset pagination
+-- Listings order by (created_at DESC, id DESC) and cursors compare on the same pair.
+
+-- Executions: tenant listing, per-task history, admission-control counts
+CREATE INDEX IF NOT EXISTS executions_tenant_created_idx ON executions (tenant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS executions_task_created_idx   ON executions (task_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS executions_active_idx         ON executions (tenant_id, agent_id) WHERE status IN ('pending', 'submitted', 'running');
+
+-- Audit events: tenant log and per-user activity
+CREATE INDEX IF NOT EXISTS audit_events_tenant_created_idx ON audit_events (tenant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS audit_events_user_created_idx   ON audit_events (tenant_id, user_id, created_at DESC, id DESC);
@@ -0,0 +1,11 @@
+-- Migration: indexes for the tenant-scoped task listing
+-- The listing joins tasks to projects by tenant and pages by (created_at DESC, id DESC).
+
+CREATE INDEX IF NOT EXISTS projects_tenant_id_idx ON projects (tenant_id);
+
+-- Board listing: active tasks per project, newest first
+CREATE INDEX IF NOT EXISTS tasks_project_created_idx ON tasks (project_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS tasks_project_status_idx  ON tasks (project_id, status) WHERE archived = false;
+
+-- Delta refresh: tasks changed since the previous listing
+CREATE INDEX IF NOT EXISTS tasks_project_updated_idx ON tasks (project_id, updated_at);
@@ -0,0 +1,16 @@
+-- Migration: hourly coderClawLLM usage rollup per claw
+-- Upserted in batches by the API worker and read by the claw usage view.
+
+CREATE TABLE IF NOT EXISTS llm_usage (
+  claw_id           integer   NOT NULL REFERENCES coderclaw_instances(id) ON DELETE CASCADE,
+  tenant_id         integer   NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+  bucket_start      timestamp NOT NULL,
+  requests          integer   NOT NULL DEFAULT 0,
+  cached_requests   integer   NOT NULL DEFAULT 0,
+  prompt_tokens     integer   NOT NULL DEFAULT 0,
+  completion_tokens integer   NOT NULL DEFAULT 0,
+  PRIMARY KEY (claw_id, bucket_start)
+);
+
+-- Tenant-wide usage over a time range
+CREATE INDEX IF NOT EXISTS llm_usage_tenant_bucket_idx ON llm_usage (tenant_id, bucket_start);
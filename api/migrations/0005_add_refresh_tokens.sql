@@ -0,0 +1,19 @@
+-- Migration: rotating refresh tokens for web / API-key sessions
+-- Tokens are stored as SHA-256 hex digests; renewal is one lookup by hash.
+
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+  id          serial      PRIMARY KEY,
+  user_id     varchar(36) NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  family_id   uuid        NOT NULL,
+  token_hash  varchar(64) NOT NULL,
+  expires_at  timestamp   NOT NULL,
+  revoked_at  timestamp,
+  created_at  timestamp   NOT NULL DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS refresh_tokens_token_hash_idx ON refresh_tokens (token_hash);
+-- Rotation chains: family-wide revocation and cleanup
+CREATE INDEX IF NOT EXISTS refresh_tokens_family_idx ON refresh_tokens (family_id);
+
+-- Membership check folded into the refresh lookup (also serves /tenants/mine)
+CREATE INDEX IF NOT EXISTS tenant_members_user_tenant_idx ON tenant_members (user_id, tenant_id);
@@ -0,0 +1,5 @@
+-- Migration: per-user sweep of expired refresh tokens
+-- Starting a session deletes the user's expired rows, so families that are
+-- never renewed (and so never swept by rotation) don't accumulate.
+
+CREATE INDEX IF NOT EXISTS refresh_tokens_user_idx ON refresh_tokens (user_id);
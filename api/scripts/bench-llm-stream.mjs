@@ -0,0 +1,168 @@
+#!/usr/bin/env node
+/**
+ * Streaming overhead benchmark for the coderClawLLM proxy.
+ *
+ * Starts a local stub of the OpenRouter completions endpoint, then drives
+ * LlmProxyService against it in-process and reports:
+ *
+ *   - added time to first byte: first data event via the proxy minus the
+ *     same measured directly against the stub (p50 / p95)
+ *   - memory per concurrent stream: heap + array buffers held while
+ *     CONCURRENCY streams are open and idle, divided by CONCURRENCY
+ *
+ * Both figures are also measured for the previous tee()-and-peek approach
+ * (reimplemented below) so the two can be compared.
+ *
+ * The service is bundled from src/ with esbuild (an api devDependency).
+ *
+ * Environment:
+ *   ITERATIONS      – sequential TTFB samples (default 200)
+ *   CONCURRENCY     – parallel streams for the memory probe (default 200)
+ *   FIRST_EVENT_MS  – stub delay before the first data event (default 20)
+ *   EVENT_BYTES     – payload size of each data event (default 512)
+ *
+ *   node --expose-gc scripts/bench-llm-stream.mjs
+ */
+
+import { createServer } from 'node:http';
+import { dirname, join } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { build } from 'esbuild';
+
+const here = dirname(fileURLToPath(import.meta.url));
+
+const ITERATIONS     = Number(process.env.ITERATIONS ?? 200);
+const CONCURRENCY    = Number(process.env.CONCURRENCY ?? 200);
+const FIRST_EVENT_MS = Number(process.env.FIRST_EVENT_MS ?? 20);
+const EVENT_BYTES    = Number(process.env.EVENT_BYTES ?? 512);
+
+// ---------------------------------------------------------------------------
+// Stub upstream: keep-alive comment, first data event, then holds the stream
+// open until the client goes away
+// ---------------------------------------------------------------------------
+
+const event = (content) =>
+  `data: ${JSON.stringify({ choices: [{ delta: { content } }] })}\n\n`;
+
+const server = createServer((req, res) => {
+  req.resume();
+  req.on('end', () => {
+    res.writeHead(200, { 'content-type': 'text/event-stream' });
+    res.write(': OPENROUTER PROCESSING\n\n');
+    const timer = setTimeout(() => res.write(event('x'.repeat(EVENT_BYTES))), FIRST_EVENT_MS);
+    res.on('close', () => clearTimeout(timer));
+  });
+});
+await new Promise((resolve) => server.listen(0, '127.0.0.1', resolve));
+const stubUrl = `http://127.0.0.1:${server.address().port}/v1/chat/completions`;
+
+// ---------------------------------------------------------------------------
+// Load LlmProxyService from source
+// ---------------------------------------------------------------------------
+
+const bundle = await build({
+  stdin: {
+    contents: [
+      "export { LlmProxyService } from './src/application/llm/LlmProxyService';",
+      "export { LocalModelHealthStore } from './src/infrastructure/llm/LocalModelHealthStore';",
+    ].join('\n'),
+    resolveDir: join(here, '..'),
+    loader: 'ts',
+  },
+  bundle:   true,
+  format:   'esm',
+  platform: 'neutral',
+  write:    false,
+});
+const { LlmProxyService, LocalModelHealthStore } = await import(
+  `data:text/javascript;base64,${Buffer.from(bundle.outputFiles[0].text).toString('base64')}`
+);
+
+const request = { messages: [{ role: 'user', content: 'hi' }], stream: true };
+const proxy   = new LlmProxyService('bench', new LocalModelHealthStore(), { baseUrl: stubUrl });
+
+/** The pre-pipeline approach: tee the body and decode the first chunk. */
+async function legacyTee() {
+  const upstream = await fetch(stubUrl, { method: 'POST', body: JSON.stringify(request) });
+  const [peek, pass] = upstream.body.tee();
+  const reader = peek.getReader();
+  await reader.read();
+  reader.cancel().catch(() => {});
+  return new Response(pass);
+}
+
+const variants = {
+  direct:   async () => fetch(stubUrl, { method: 'POST', body: JSON.stringify(request) }),
+  pipeline: async () => (await proxy.complete(request)).response,
+  tee:      legacyTee,
+};
+
+// ---------------------------------------------------------------------------
+// Measurements
+// ---------------------------------------------------------------------------
+
+/** Open a stream and read until the first data event; returns [ms, reader]. */
+async function firstDataEvent(open) {
+  const started = performance.now();
+  const res     = await open();
+  const reader  = res.body.getReader();
+  const decoder = new TextDecoder();
+  let text = '';
+  while (!text.includes('data:')) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    text += decoder.decode(value, { stream: true });
+  }
+  return [performance.now() - started, reader];
+}
+
+async function ttfb(open) {
+  const samples = [];
+  for (let i = 0; i < ITERATIONS; i++) {
+    const [ms, reader] = await firstDataEvent(open);
+    samples.push(ms);
+    await reader.cancel();
+  }
+  samples.sort((a, b) => a - b);
+  return { p50: samples[Math.floor(samples.length * 0.5)], p95: samples[Math.floor(samples.length * 0.95)] };
+}
+
+function heldBytes() {
+  globalThis.gc?.();
+  const m = process.memoryUsage();
+  return m.heapUsed + m.arrayBuffers;
+}
+
+async function bytesPerStream(open) {
+  const before  = heldBytes();
+  const readers = (await Promise.all(Array.from({ length: CONCURRENCY }, () => firstDataEvent(open))))
+    .map(([, reader]) => reader);
+  const after   = heldBytes();
+  await Promise.all(readers.map((r) => r.cancel()));
+  return Math.round((after - before) / CONCURRENCY);
+}
+
+if (!globalThis.gc) console.warn('⚠  run with --expose-gc for stable memory figures');
+
+const results = {};
+for (const [name, open] of Object.entries(variants)) {
+  results[name] = { ttfbMs: await ttfb(open), bytesPerStream: await bytesPerStream(open) };
+}
+
+const round = (n) => Math.round(n * 100) / 100;
+const added = (name) => ({
+  addedTtfbP50Ms:       round(results[name].ttfbMs.p50 - results.direct.ttfbMs.p50),
+  addedTtfbP95Ms:       round(results[name].ttfbMs.p95 - results.direct.ttfbMs.p95),
+  addedBytesPerStream:  results[name].bytesPerStream - results.direct.bytesPerStream,
+});
+
+console.log(JSON.stringify({
+  iterations:  ITERATIONS,
+  concurrency: CONCURRENCY,
+  direct:      results.direct,
+  pipeline:    { ...results.pipeline, ...added('pipeline') },
+  tee:         { ...results.tee, ...added('tee') },
+}, null, 2));
+
+server.close();
+server.closeAllConnections?.();
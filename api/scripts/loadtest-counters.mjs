@@ -0,0 +1,120 @@
+#!/usr/bin/env node
+/**
+ * Hot-row load test for the marketplace download counter.
+ *
+ * Hammers a single skill and reports how many counter updates per second
+ * land in Postgres.
+ *
+ *   MODE=api    (default) – GET /marketplace/skills/:slug against a running
+ *                           worker (`wrangler dev` or a deployment), which
+ *                           goes through the SkillCounterBuffer.
+ *   MODE=direct           – `UPDATE … SET downloads = downloads + 1` straight
+ *                           against Postgres, i.e. the old per-view write.
+ *
+ * Environment:
+ *   DATABASE_URL  – read from api/.env or the environment (required)
+ *   SLUG          – published skill to hit (required)
+ *   BASE_URL      – worker origin for MODE=api (default http://127.0.0.1:8787)
+ *   CONCURRENCY   – parallel clients (default 32)
+ *   DURATION      – seconds to run (default 20)
+ *   SETTLE        – seconds to wait for buffered flushes afterwards (default 10)
+ *
+ *   SLUG=my-skill node scripts/loadtest-counters.mjs
+ */
+
+import { readFileSync } from 'node:fs';
+import { join, dirname } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { neon } from '@neondatabase/serverless';
+
+const here = dirname(fileURLToPath(import.meta.url));
+
+// ---------------------------------------------------------------------------
+// Load .env (DATABASE_URL is a secret, never committed to source control)
+// ---------------------------------------------------------------------------
+
+function loadDotEnv(path) {
+  try {
+    const text = readFileSync(path, 'utf8');
+    for (const line of text.split('\n')) {
+      const trimmed = line.trim();
+      if (!trimmed || trimmed.startsWith('#')) continue;
+      const eq = trimmed.indexOf('=');
+      if (eq === -1) continue;
+      const key = trimmed.slice(0, eq).trim();
+      const val = trimmed.slice(eq + 1).trim().replace(/^["']|["']$/g, '');
+      if (key && !process.env[key]) process.env[key] = val;
+    }
+  } catch { /* file not found – that's fine */ }
+}
+
+loadDotEnv(join(here, '../.env'));
+
+const DATABASE_URL = process.env.DATABASE_URL;
+const SLUG         = process.env.SLUG;
+const MODE         = process.env.MODE ?? 'api';
+const BASE_URL     = process.env.BASE_URL ?? 'http://127.0.0.1:8787';
+const CONCURRENCY  = Number(process.env.CONCURRENCY ?? 32);
+const DURATION     = Number(process.env.DURATION ?? 20);
+const SETTLE       = Number(process.env.SETTLE ?? 10);
+
+if (!DATABASE_URL || !SLUG) {
+  console.error('❌  DATABASE_URL and SLUG are required.');
+  process.exit(1);
+}
+
+const sql = neon(DATABASE_URL);
+
+async function readDownloads() {
+  const [row] = await sql`SELECT downloads FROM marketplace_skills WHERE slug = ${SLUG}`;
+  if (!row) throw new Error(`skill "${SLUG}" not found`);
+  return Number(row.downloads);
+}
+
+const hit = MODE === 'direct'
+  ? () => sql`UPDATE marketplace_skills SET downloads = downloads + 1 WHERE slug = ${SLUG}`
+  : async () => {
+      const res = await fetch(`${BASE_URL}/marketplace/skills/${encodeURIComponent(SLUG)}`);
+      await res.arrayBuffer();
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    };
+
+// ---------------------------------------------------------------------------
+// Run
+// ---------------------------------------------------------------------------
+
+const before   = await readDownloads();
+const deadline = Date.now() + DURATION * 1000;
+let sent   = 0;
+let failed = 0;
+
+console.log(`▶  ${MODE}: ${CONCURRENCY} clients × ${DURATION}s on "${SLUG}" (downloads=${before})`);
+
+const started = Date.now();
+await Promise.all(Array.from({ length: CONCURRENCY }, async () => {
+  while (Date.now() < deadline) {
+    try { await hit(); sent++; } catch { failed++; }
+  }
+}));
+const elapsed = (Date.now() - started) / 1000;
+
+// Buffered increments land after the requests finish – wait for them
+let after = await readDownloads();
+const settleUntil = Date.now() + SETTLE * 1000;
+while (after - before < sent && Date.now() < settleUntil) {
+  await new Promise((resolve) => setTimeout(resolve, 500));
+  after = await readDownloads();
+}
+
+const applied = after - before;
+console.log(JSON.stringify({
+  mode:               MODE,
+  concurrency:        CONCURRENCY,
+  seconds:            Number(elapsed.toFixed(2)),
+  requests:           sent,
+  failed,
+  requestsPerSecond:  Math.round(sent / elapsed),
+  incrementsApplied:  applied,
+  updatesPerSecond:   Math.round(applied / elapsed),
+  lost:               sent - applied,
+}, null, 2));
@@ -2,6 +2,7 @@ import { IAuditRepository, AuditQueryOptions } from '../../domain/audit/IAuditRe
 import { AuditEvent } from '../../domain/audit/AuditEvent';
 import { TenantRole, TenantId, asTenantId } from '../../domain/shared/types';
 import { ForbiddenError } from '../../domain/shared/errors';
+import { Cursor, Page } from '../../domain/shared/pagination';
 
 export class AuditService {
   constructor(private readonly audit: IAuditRepository) {}
@@ -12,7 +13,7 @@ export class AuditService {
   async query(
     opts:     AuditQueryOptions,
     actorRole: TenantRole,
-  ): Promise<AuditEvent[]> {
+  ): Promise<Page<AuditEvent>> {
     if (
       actorRole !== TenantRole.OWNER &&
       actorRole !== TenantRole.MANAGER
@@ -27,13 +28,14 @@ export class AuditService {
     tenantId:  number,
     actorRole: TenantRole,
     limit?:    number,
-  ): Promise<AuditEvent[]> {
+    cursor?:   Cursor,
+  ): Promise<Page<AuditEvent>> {
     if (
       actorRole !== TenantRole.OWNER &&
       actorRole !== TenantRole.MANAGER
     ) {
       throw new ForbiddenError('Only OWNER or MANAGER may view user activity');
     }
-    return this.audit.query({ userId, tenantId: asTenantId(tenantId), limit });
+    return this.audit.query({ userId, tenantId: asTenantId(tenantId), limit, cursor });
   }
 }
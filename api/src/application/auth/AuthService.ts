@@ -3,10 +3,27 @@ import { User } from '../../domain/user/User';
 import { AuditEventType, UserId, asTenantId } from '../../domain/shared/types';
 import { UnauthorizedError, ConflictError } from '../../domain/shared/errors';
 import { signJwt, signWebJwt } from '../../infrastructure/auth/JwtService';
-import { hashSecret, generateApiKey, hashPassword, verifyPassword } from '../../infrastructure/auth/HashService';
+import {
+  hashSecret, generateApiKey, generateRefreshToken, hashPassword, verifyPassword,
+} from '../../infrastructure/auth/HashService';
 import { IAuditRepository } from '../../domain/audit/IAuditRepository';
 import { AuditEvent } from '../../domain/audit/AuditEvent';
 import { ITenantRepository } from '../../domain/tenant/ITenantRepository';
+import { IRefreshTokenRepository, NewRefreshToken } from '../../domain/auth/IRefreshTokenRepository';
+
+// ---------------------------------------------------------------------------
+// Session lifetimes
+// ---------------------------------------------------------------------------
+
+/** Access JWTs of refreshable sessions are short-lived; refresh tokens renew them. */
+const ACCESS_TTL_SECONDS  = 15 * 60;
+const REFRESH_TTL_SECONDS = 30 * 86_400;
+/**
+ * A rotated token replayed this soon after rotation is a client race (two
+ * tabs renewing at once): refused, but it does not revoke the session.
+ * Later replays look like a stolen token and revoke the whole family.
+ */
+const REUSE_GRACE_MS = 30_000;
 
 // ---------------------------------------------------------------------------
 // DTOs
@@ -27,6 +44,12 @@ export interface LoginResult {
   expiresIn: number;
 }
 
+/** Login results that can be renewed via `refresh` instead of logging in again. */
+export interface SessionResult extends LoginResult {
+  refreshToken:     string;
+  refreshExpiresIn: number;
+}
+
 export interface WebRegisterDto {
   email:    string;
   username: string;
@@ -38,9 +61,7 @@ export interface WebLoginDto {
   password: string;
 }
 
-export interface WebLoginResult {
-  token:     string;
-  expiresIn: number;
+export interface WebLoginResult extends SessionResult {
   user: {
     id:          string;
     email:       string;
@@ -64,6 +85,7 @@ export class AuthService {
     private readonly users:     IUserRepository,
     private readonly tenants:   ITenantRepository,
     private readonly audit:     IAuditRepository,
+    private readonly refreshTokens: IRefreshTokenRepository,
     private readonly jwtSecret: string,
   ) {}
 
@@ -92,6 +114,11 @@ export class AuthService {
     return { user: { id: user.id, email: user.email }, apiKey };
   }
 
+  /**
+   * API-key exchange for claws and scripts.  No refresh token: the caller
+   * holds a long-lived key and exchanges it again, so a session here would
+   * only pile up unrotated rows (and could be renewed into a web JWT).
+   */
   async login(rawApiKey: string, tenantId: number): Promise<LoginResult> {
     const hash = await hashSecret(rawApiKey);
     const user = await this.users.findByApiKeyHash(hash);
@@ -129,12 +156,9 @@ export class AuthService {
    * No JWT is issued – the caller uses the result to pick a tenant and then calls /token.
    */
   async myTenants(userId: string): Promise<MyTenantsResult> {
-    const userTenants = await this.tenants.findByUserId(userId);
+    const memberships = await this.tenants.findMembershipsByUserId(userId);
     return {
-      tenants: userTenants.map(t => {
-        const member = t.getMember(userId);
-        return { id: t.id, name: t.name, slug: t.slug, role: member?.role ?? 'member' };
-      }),
+      tenants: memberships.map(m => ({ id: m.id, name: m.name, slug: m.slug, role: m.role ?? 'member' })),
     };
   }
 
@@ -174,7 +198,7 @@ export class AuthService {
     );
 
 
-    const expiresIn = 86_400;
+    const expiresIn = ACCESS_TTL_SECONDS;
     const token = await signWebJwt(
       { sub: user.id, email: user.email, username: user.username! },
       this.jwtSecret,
@@ -184,6 +208,7 @@ export class AuthService {
     return {
       token,
       expiresIn,
+      ...(await this.startSession(user.id)),
       user: {
         id:          user.id,
         email:       user.email,
@@ -202,7 +227,7 @@ export class AuthService {
     const ok = await verifyPassword(dto.password, user.passwordHash);
     if (!ok) throw new UnauthorizedError('Invalid email or password');
 
-    const expiresIn = 86_400;
+    const expiresIn = ACCESS_TTL_SECONDS;
     const token = await signWebJwt(
       { sub: user.id, email: user.email, username: user.username ?? '' },
       this.jwtSecret,
@@ -212,6 +237,7 @@ export class AuthService {
     return {
       token,
       expiresIn,
+      ...(await this.startSession(user.id)),
       user: {
         id:          user.id,
         email:       user.email,
@@ -223,6 +249,69 @@ export class AuthService {
     };
   }
 
+  // -- Refresh tokens ---------------------------------------------------------
+
+  /**
+   * Rotate a refresh token and issue a new access token: a web JWT, or a
+   * tenant-scoped JWT when `tenantId` is given (this is how a session
+   * switches workspace).  Costs one SHA-256, one indexed lookup, one
+   * rotation statement and an HMAC — no key derivation, no tenant load.
+   */
+  async refresh(rawToken: string, tenantId: number | null): Promise<SessionResult> {
+    const session = await this.refreshTokens.findSession(await hashSecret(rawToken), tenantId);
+    if (!session) throw new UnauthorizedError('Invalid refresh token');
+
+    if (session.revokedAt) {
+      if (Date.now() - session.revokedAt.getTime() > REUSE_GRACE_MS) {
+        await this.refreshTokens.revokeFamily(session.familyId);
+      }
+      throw new UnauthorizedError('Refresh token has already been used');
+    }
+    if (session.expiresAt.getTime() <= Date.now()) throw new UnauthorizedError('Refresh token expired');
+    if (tenantId !== null && !session.role) {
+      throw new UnauthorizedError('User is not a member of this tenant');
+    }
+
+    const next = await this.nextRefreshToken();
+    const rotated = await this.refreshTokens.rotate(session.id, next.stored);
+    if (!rotated) throw new UnauthorizedError('Refresh token has already been used');
+
+    const { user } = session;
+    const token = tenantId !== null
+      ? await signJwt({ sub: user.id, tid: tenantId, role: session.role! }, this.jwtSecret, ACCESS_TTL_SECONDS)
+      : await signWebJwt({ sub: user.id, email: user.email, username: user.username ?? '' }, this.jwtSecret, ACCESS_TTL_SECONDS);
+
+    return {
+      token,
+      expiresIn:        ACCESS_TTL_SECONDS,
+      refreshToken:     next.token,
+      refreshExpiresIn: REFRESH_TTL_SECONDS,
+    };
+  }
+
+  /** Revoke the session a refresh token belongs to (sign-out).  Unknown tokens are ignored. */
+  async logout(rawToken: string): Promise<void> {
+    const session = await this.refreshTokens.findSession(await hashSecret(rawToken), null);
+    if (session) await this.refreshTokens.revokeFamily(session.familyId);
+  }
+
+  private async startSession(userId: UserId): Promise<Omit<SessionResult, keyof LoginResult>> {
+    const next = await this.nextRefreshToken();
+    await this.refreshTokens.create(userId, crypto.randomUUID(), next.stored);
+    return { refreshToken: next.token, refreshExpiresIn: REFRESH_TTL_SECONDS };
+  }
+
+  private async nextRefreshToken(): Promise<{ token: string; stored: NewRefreshToken }> {
+    const token = generateRefreshToken();
+    return {
+      token,
+      stored: {
+        tokenHash: await hashSecret(token),
+        expiresAt: new Date(Date.now() + REFRESH_TTL_SECONDS * 1000),
+      },
+    };
+  }
+
   async getMe(userId: UserId): Promise<WebLoginResult['user'] | null> {
     const user = await this.users.findById(userId);
     if (!user) return null;
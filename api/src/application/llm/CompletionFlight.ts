@@ -0,0 +1,149 @@
+/**
+ * Single-flight fan-out for identical in-flight completions.
+ *
+ * The first request for a cache key starts the upstream call and drives a
+ * CompletionFlight; identical requests that arrive while it is running
+ * subscribe instead of calling OpenRouter again.  Every chunk read from the
+ * upstream body is kept, so a late subscriber replays from the start and then
+ * follows live — each gets the complete response.
+ *
+ * Buffering is capped at `maxBufferedBytes`.  Past it the flight calls
+ * `onOverflow` (the owner stops handing it to new callers) and only keeps the
+ * chunks an existing subscriber has yet to read.
+ *
+ * Only plain bytes and promises cross requests: the upstream body is read by
+ * the leading request alone (run it under `ctx.waitUntil`), so no I/O object
+ * is touched from another request's context.
+ */
+import type { ProxyResult } from './LlmProxyService';
+
+/** Everything needed to render a completion apart from its body. */
+export interface CompletionHead {
+  status:        number;
+  contentType:   string | null;
+  resolvedModel: string;
+  retries:       number;
+  hedged:        boolean;
+}
+
+export class CompletionFlight {
+  readonly head: Promise<CompletionHead>;
+
+  private chunks:   Uint8Array[] = [];
+  /** Position of `chunks[0]` in the body, once overflow has trimmed the front. */
+  private base      = 0;
+  private cursors   = new Set<{ next: number }>();
+  private bytes     = 0;
+  private overflowed = false;
+  private finished  = false;
+  private failure:  unknown = null;
+  private waiters:  Array<() => void> = [];
+  private setHead!:  (head: CompletionHead) => void;
+  private failHead!: (err: unknown) => void;
+
+  constructor(
+    private readonly maxBufferedBytes = Number.POSITIVE_INFINITY,
+    private readonly onOverflow: () => void = () => {},
+  ) {
+    this.head = new Promise((resolve, reject) => {
+      this.setHead  = resolve;
+      this.failHead = reject;
+    });
+    this.head.catch(() => { /* surfaced to whoever awaits it */ });
+  }
+
+  /** Drive the flight from the upstream result; settles once the body is fully read. */
+  async run(result: Promise<ProxyResult>): Promise<void> {
+    try {
+      const { response, resolvedModel, retries, hedged } = await result;
+      this.setHead({
+        status:      response.status,
+        contentType: response.headers.get('content-type'),
+        resolvedModel,
+        retries,
+        hedged,
+      });
+      if (response.body) {
+        const reader = response.body.getReader();
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          this.chunks.push(value);
+          this.bytes += value.byteLength;
+          if (!this.overflowed && this.bytes > this.maxBufferedBytes) {
+            this.overflowed = true;
+            this.onOverflow();
+          }
+          this.trim();
+          this.notify();
+        }
+      }
+    } catch (err) {
+      this.failure = err ?? new Error('completion flight failed');
+      this.failHead(this.failure);
+    } finally {
+      this.finished = true;
+      this.notify();
+    }
+  }
+
+  /**
+   * A fresh reader over the whole body: buffered chunks first, then live ones.
+   * Call it as soon as the flight is picked up (before awaiting `head`) so
+   * nothing is trimmed from under it.
+   */
+  subscribe(): ReadableStream<Uint8Array> {
+    if (this.base > 0) {
+      return new ReadableStream({ start: (controller) => controller.error(new Error('completion flight overflowed')) });
+    }
+    const cursor = { next: 0 };
+    this.cursors.add(cursor);
+    const release = () => { this.cursors.delete(cursor); this.trim(); };
+    return new ReadableStream<Uint8Array>({
+      pull: async (controller) => {
+        while (cursor.next >= this.base + this.chunks.length && !this.finished) await this.changed();
+        if (cursor.next < this.base + this.chunks.length) {
+          controller.enqueue(this.chunks[cursor.next++ - this.base]!);
+          this.trim();
+        } else {
+          release();
+          if (this.failure) controller.error(this.failure);
+          else controller.close();
+        }
+      },
+      cancel: release,
+    });
+  }
+
+  /** The complete body once the flight succeeded, or null if it failed or exceeds `maxBytes`. */
+  body(maxBytes: number): Uint8Array | null {
+    if (!this.finished || this.failure || this.overflowed || this.bytes > maxBytes) return null;
+    const out = new Uint8Array(this.bytes);
+    let offset = 0;
+    for (const chunk of this.chunks) {
+      out.set(chunk, offset);
+      offset += chunk.byteLength;
+    }
+    return out;
+  }
+
+  /** After overflow, drop the chunks every subscriber has already read. */
+  private trim(): void {
+    if (!this.overflowed) return;
+    let low = this.base + this.chunks.length;
+    for (const cursor of this.cursors) low = Math.min(low, cursor.next);
+    if (low === this.base) return;
+    this.chunks.splice(0, low - this.base);
+    this.base = low;
+  }
+
+  private changed(): Promise<void> {
+    return new Promise((resolve) => this.waiters.push(resolve));
+  }
+
+  private notify(): void {
+    const waiters = this.waiters;
+    this.waiters  = [];
+    for (const wake of waiters) wake();
+  }
+}
@@ -6,14 +6,23 @@
  *   2. HTTP 200 with {"error":{...}} in the body
  *      (OpenRouter sends this for upstream provider errors — rate limits, spend
  *       limits, capacity issues, etc.)
- *   3. First SSE chunk contains an error object (streaming variant of #2)
+ *   3. First SSE data event contains an error object (streaming variant of #2)
+ *      — detected in-line by SseLeadInspector, without tee()-ing the body
  *
  * On any of these signals the model is put on a 60-second cooldown and the next
  * healthy model in the pool is tried transparently.
  *
- * Requests are distributed round-robin across the pool so no single model is
- * hammered first on every call.
+ * Every attempt is recorded in an IModelHealthStore (success rate, time to
+ * first token, p95).  Each request orders the pool by weighted random
+ * selection over those stats, so fast, reliable models take most traffic
+ * while the rest keep being sampled.  With `hedgeAfterMs` set, a request
+ * whose first model has not answered within that time is raced against the
+ * next-ranked model and the loser is aborted.
  */
+import {
+  IModelHealthStore, isCoolingDown, rankModels,
+} from '../../domain/llm/ModelHealth';
+import { SseLeadInspector } from './SseLeadInspector';
 
 // ---------------------------------------------------------------------------
 // Free model pool — ordered by quality/ctx preference (best first)
@@ -58,6 +67,13 @@ export interface ChatCompletionRequest {
   [key: string]: unknown;
 }
 
+export interface RoutingOptions {
+  /** Race the next-ranked model if the first is silent this long. Off when unset. */
+  hedgeAfterMs?: number;
+  /** Upstream completions endpoint; defaults to OpenRouter (override for stubs/benchmarks). */
+  baseUrl?: string;
+}
+
 export interface ProxyResult {
   /** The raw Response from OpenRouter (may be streamed). */
   response: Response;
@@ -65,34 +81,44 @@ export interface ProxyResult {
   resolvedModel: string;
   /** How many failovers happened before success. */
   retries: number;
+  /** True when the response came from a hedged (second) request. */
+  hedged: boolean;
 }
 
 // ---------------------------------------------------------------------------
-// Cooldown tracker  (in-memory, per-isolate)
+// Hedging helpers
 // ---------------------------------------------------------------------------
 
-/** model → timestamp when cooldown expires */
-const cooldowns = new Map<string, number>();
-
-const COOLDOWN_MS = 60_000; // 60 s cooldown after any provider error
+/** Outcome of one upstream attempt against one model. */
+type Attempt =
+  | { ok: true;  model: string; response: Response }
+  | { ok: false; model: string; response?: Response; aborted?: boolean };
 
-function markCooldown(model: string): void {
-  cooldowns.set(model, Date.now() + COOLDOWN_MS);
+interface InFlight {
+  model:      string;
+  controller: AbortController;
+  result:     Promise<Attempt>;
 }
 
-function isOnCooldown(model: string): boolean {
-  const until = cooldowns.get(model);
-  if (!until) return false;
-  if (Date.now() >= until) { cooldowns.delete(model); return false; }
-  return true;
+function delay(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
 }
 
-// ---------------------------------------------------------------------------
-// Round-robin cursor  (in-memory, per-isolate)
-// ---------------------------------------------------------------------------
-
-/** Advances each request so the starting model rotates evenly across the pool. */
-let requestCursor = 0;
+/** Resolve with the first successful attempt; abort whichever is still running. */
+async function firstSuccessful(racers: InFlight[]): Promise<{ winner: Attempt | null; failures: Attempt[] }> {
+  const failures: Attempt[] = [];
+  const pending  = new Map(racers.map((r) => [r, r.result.then((a) => ({ r, a }))]));
+  while (pending.size > 0) {
+    const { r, a } = await Promise.race(pending.values());
+    pending.delete(r);
+    if (a.ok) {
+      for (const loser of pending.keys()) loser.controller.abort();
+      return { winner: a, failures };
+    }
+    failures.push(a);
+  }
+  return { winner: null, failures };
+}
 
 // ---------------------------------------------------------------------------
 // Error detection helpers
@@ -108,25 +134,17 @@ function isFailoverStatus(status: number): boolean {
   return status >= 400 && status !== 400 && status !== 401;
 }
 
-/** Detect any provider error in a parsed JSON body. */
-function isBodyError(json: Record<string, unknown>): boolean {
-  return 'error' in json && json['error'] != null;
-}
-
 /**
- * Detect a provider error in a raw SSE text chunk.
- * Tries to parse the first `data:` line as JSON; falls back to text heuristics.
+ * Detect a provider error in a raw JSON body without parsing every response:
+ * only bodies that contain an `"error"` token are parsed to confirm.
  */
-function isChunkError(text: string): boolean {
+function isBodyError(text: string): boolean {
   if (!text.includes('"error"')) return false;
-  // Try to parse the first SSE data line
-  const dataLine = text.split('\n').find((l) => l.startsWith('data: '));
-  if (!dataLine) return true; // has "error" substring but no parseable line → be safe
   try {
-    const parsed = JSON.parse(dataLine.slice(6)) as Record<string, unknown>;
-    return 'error' in parsed && parsed['error'] != null;
+    const json = JSON.parse(text) as Record<string, unknown>;
+    return 'error' in json && json['error'] != null;
   } catch {
-    return true; // unparseable chunk that mentions "error" → failover
+    return false; // not JSON – let the client see it as-is
   }
 }
 
@@ -139,93 +157,54 @@ const OPENROUTER_BASE = 'https://openrouter.ai/api/v1/chat/completions';
 export class LlmProxyService {
   private readonly apiKey: string;
 
-  constructor(apiKey: string) {
+  constructor(
+    apiKey:                   string,
+    private readonly health:  IModelHealthStore,
+    private readonly routing: RoutingOptions = {},
+  ) {
     this.apiKey = apiKey;
   }
 
   /**
    * Forward a chat-completion request through the free model pool.
    * Automatically fails over on any HTTP error status OR embedded error body.
-   * Requests are distributed round-robin so all models share traffic evenly.
+   * Models are tried in health-weighted order (see rankModels).
    */
   async complete(
     body: ChatCompletionRequest,
     requestHeaders?: Record<string, string>,
   ): Promise<ProxyResult> {
-    const available = FREE_MODEL_POOL.filter((m) => !isOnCooldown(m));
-    const pool = available.length > 0 ? available : [...FREE_MODEL_POOL];
-
-    // Rotate the starting position for round-robin distribution
-    const start = requestCursor % pool.length;
-    const candidates = [...pool.slice(start), ...pool.slice(0, start)];
-    requestCursor++;
+    const snapshot   = await this.health.snapshot();
+    const candidates = rankModels(FREE_MODEL_POOL, snapshot, Date.now());
+    const queue      = [...candidates];
 
     let lastResponse: Response | undefined;
     let retries = 0;
 
-    for (const model of candidates) {
-      const upstream = await fetch(OPENROUTER_BASE, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          Authorization: `Bearer ${this.apiKey}`,
-          'HTTP-Referer': 'https://coderclaw.ai',
-          'X-Title': 'coderClawLLM',
-          ...(requestHeaders ?? {}),
-        },
-        body: JSON.stringify({ ...body, model }),
-      });
+    while (queue.length > 0) {
+      const primary = this.launch(queue.shift()!, body, requestHeaders);
+      const racers  = [primary];
 
-      // ── HTTP error status (402 spend limit, 429 rate limit, 5xx, etc.) ───────
-      if (isFailoverStatus(upstream.status)) {
-        markCooldown(model);
-        lastResponse = upstream;
-        retries++;
-        continue;
+      // Hedge: if the primary is still silent after the threshold, race the next model
+      if (this.routing.hedgeAfterMs !== undefined && queue.length > 0) {
+        const early = await Promise.race([primary.result, delay(this.routing.hedgeAfterMs).then(() => null)]);
+        if (early === null) racers.push(this.launch(queue.shift()!, body, requestHeaders));
       }
 
-      // ── Streaming: peek first chunk for embedded error ────────────────────
-      if (body.stream && upstream.body) {
-        const [peekStream, passStream] = upstream.body.tee();
-        const reader = peekStream.getReader();
-        const { value: firstChunk } = await reader.read();
-        reader.cancel().catch(() => { /* ignore */ });
-
-        const firstText = firstChunk ? new TextDecoder().decode(firstChunk) : '';
-
-        if (isChunkError(firstText)) {
-          await passStream.cancel().catch(() => { /* ignore */ });
-          markCooldown(model);
-          retries++;
-          continue;
-        }
-
-        // Good stream — pass through
+      const { winner, failures } = await firstSuccessful(racers);
+      for (const failed of failures) {
+        if (failed.ok || failed.aborted) continue;
+        if (failed.response) lastResponse = failed.response;
+        retries++;
+      }
+      if (winner?.ok) {
         return {
-          response: new Response(passStream, { status: upstream.status, headers: upstream.headers }),
-          resolvedModel: model,
+          response:      winner.response,
+          resolvedModel: winner.model,
           retries,
+          hedged:        racers.length > 1 && winner.model !== primary.model,
         };
       }
-
-      // ── Non-streaming: read body and check for embedded error ─────────────
-      const json = await upstream.json() as Record<string, unknown>;
-
-      if (isBodyError(json)) {
-        markCooldown(model);
-        retries++;
-        continue;
-      }
-
-      // Good response — reconstruct so the route handler can .json() it
-      return {
-        response: new Response(JSON.stringify(json), {
-          status: upstream.status,
-          headers: upstream.headers,
-        }),
-        resolvedModel: model,
-        retries,
-      };
     }
 
     // All candidates exhausted — return a clean error
@@ -243,15 +222,110 @@ export class LlmProxyService {
       }),
       resolvedModel: candidates[candidates.length - 1] ?? FREE_MODEL_POOL[0],
       retries,
+      hedged: false,
     };
   }
 
-  /** Return the current model pool with cooldown status. */
-  status(): Array<{ model: string; available: boolean; cooldownUntil?: number }> {
+  /** Persist buffered health samples.  Intended for `ctx.waitUntil`. */
+  flushHealth(): Promise<void> {
+    return this.health.flush();
+  }
+
+  // ---------------------------------------------------------------------------
+  // Attempts
+  // ---------------------------------------------------------------------------
+
+  private launch(model: string, body: ChatCompletionRequest, requestHeaders?: Record<string, string>): InFlight {
+    const controller = new AbortController();
+    return { model, controller, result: this.attempt(model, body, requestHeaders, controller.signal) };
+  }
+
+  /** One upstream call.  Records a health sample unless it was aborted. */
+  private async attempt(
+    model:           string,
+    body:            ChatCompletionRequest,
+    requestHeaders:  Record<string, string> | undefined,
+    signal:          AbortSignal,
+  ): Promise<Attempt> {
+    const startedAt = Date.now();
+    const fail = (response?: Response): Attempt => {
+      if (signal.aborted) return { ok: false, model, aborted: true };
+      this.health.record({ model, ok: false, at: Date.now() });
+      return { ok: false, model, response };
+    };
+    const succeed = (response: Response): Attempt => {
+      this.health.record({ model, ok: true, ttftMs: Date.now() - startedAt, at: Date.now() });
+      return { ok: true, model, response };
+    };
+
+    try {
+      const upstream = await fetch(this.routing.baseUrl ?? OPENROUTER_BASE, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Authorization: `Bearer ${this.apiKey}`,
+          'HTTP-Referer': 'https://coderclaw.ai',
+          'X-Title': 'coderClawLLM',
+          ...(requestHeaders ?? {}),
+        },
+        body: JSON.stringify({ ...body, model }),
+        signal,
+      });
+
+      // ── HTTP error status (402 spend limit, 429 rate limit, 5xx, etc.) ───────
+      if (isFailoverStatus(upstream.status)) return fail(upstream);
+
+      // ── Streaming: inspect the leading data event in-line ─────────────────
+      if (body.stream && upstream.body) {
+        const inspector = new SseLeadInspector();
+        const passStream = upstream.body.pipeThrough(inspector.stream);
+
+        if (await inspector.verdict === 'error') {
+          await passStream.cancel().catch(() => { /* ignore */ });
+          return fail();
+        }
+
+        // Good stream — the inspected prefix is already queued in passStream
+        return succeed(new Response(passStream, { status: upstream.status, headers: upstream.headers }));
+      }
+
+      // ── Non-streaming: scan body text for embedded error ──────────────────
+      const text = await upstream.text();
+
+      if (isBodyError(text)) return fail();
+
+      // Good response — hand the text on unparsed
+      return succeed(new Response(text, {
+        status: upstream.status,
+        headers: upstream.headers,
+      }));
+    } catch {
+      // Network error, or aborted because a hedged racer won
+      return fail();
+    }
+  }
+
+  /** Return the current model pool with cooldown status and routing stats. */
+  async status(): Promise<Array<{
+    model: string; available: boolean; cooldownUntil?: number;
+    successRate?: number; ttftMs?: number; p95TtftMs?: number; samples: number;
+  }>> {
+    const snapshot = await this.health.snapshot();
+    const now      = Date.now();
     return FREE_MODEL_POOL.map((m) => {
-      const until = cooldowns.get(m);
-      const available = !until || Date.now() >= until;
-      return { model: m, available, ...(until && !available ? { cooldownUntil: until } : {}) };
+      const stats     = snapshot[m];
+      const available = !isCoolingDown(stats, now);
+      return {
+        model: m,
+        available,
+        ...(stats && !available ? { cooldownUntil: stats.cooldownUntil } : {}),
+        ...(stats ? {
+          successRate: Number(stats.successRate.toFixed(3)),
+          ttftMs:      Math.round(stats.ttftMs),
+          p95TtftMs:   Math.round(stats.p95TtftMs),
+        } : {}),
+        samples: stats?.samples ?? 0,
+      };
     });
   }
 }
@@ -0,0 +1,91 @@
+/**
+ * Streaming inspection of the leading SSE event of an upstream completion.
+ *
+ * OpenRouter reports provider errors on a 200 stream as the first `data:`
+ * event.  Instead of tee()-ing the body and decoding a copy, the upstream
+ * body is piped through this TransformStream: bytes pass through untouched
+ * while only the prefix up to the first data event is decoded and checked.
+ * `verdict` settles as soon as that event is complete, so the proxy can fail
+ * over before a single byte reaches the client.
+ *
+ * Nothing reads the stream until the verdict settles, so the verdict also
+ * settles (pass) once PENDING_CHUNKS chunks are held — e.g. a run of
+ * keep-alive comments — rather than letting backpressure stall the transform
+ * with the verdict still pending.  The held keep-alives then reach the client.
+ */
+
+export type LeadVerdict = 'ok' | 'error';
+
+/** Stop inspecting (and pass the stream through) after this much prefix. */
+const MAX_INSPECT_BYTES = 64 * 1024;
+
+/** Chunks held while the verdict is pending; reaching it settles the verdict as a pass. */
+const PENDING_CHUNKS = 64;
+
+export class SseLeadInspector {
+  readonly stream:  TransformStream<Uint8Array, Uint8Array>;
+  readonly verdict: Promise<LeadVerdict>;
+
+  private decoder   = new TextDecoder();
+  private text      = '';
+  private inspected = 0;
+  private held      = 0;
+  private settled   = false;
+  private settle!:  (v: LeadVerdict) => void;
+
+  constructor() {
+    this.verdict = new Promise((resolve) => { this.settle = resolve; });
+    this.stream  = new TransformStream<Uint8Array, Uint8Array>(
+      {
+        transform: (chunk, controller) => {
+          if (!this.settled) this.inspect(chunk);
+          controller.enqueue(chunk);
+          // The queue is now full: the next write would wait on a reader that
+          // only starts once the verdict is in
+          if (!this.settled && ++this.held >= PENDING_CHUNKS) this.decide('ok');
+        },
+        flush: () => {
+          // Stream ended before a complete data event: judge what we have
+          if (!this.settled) this.decide(this.text.includes('"error"') ? 'error' : 'ok');
+        },
+      },
+      undefined,
+      new CountQueuingStrategy({ highWaterMark: PENDING_CHUNKS }),
+    );
+  }
+
+  private inspect(chunk: Uint8Array) {
+    this.inspected += chunk.byteLength;
+    this.text      += this.decoder.decode(chunk, { stream: true });
+
+    // Walk complete events; comment-only keep-alives (": OPENROUTER PROCESSING") are skipped
+    let end: number;
+    while ((end = this.text.search(/\r?\n\r?\n/)) !== -1) {
+      const event = this.text.slice(0, end);
+      this.text   = this.text.slice(end).replace(/^\r?\n\r?\n/, '');
+      const data  = event.split(/\r?\n/).filter((l) => l.startsWith('data:'));
+      if (data.length === 0) continue;
+      this.decide(isErrorEvent(data.map((l) => l.slice(5).trimStart()).join('\n')) ? 'error' : 'ok');
+      return;
+    }
+
+    if (this.inspected >= MAX_INSPECT_BYTES) this.decide('ok');
+  }
+
+  private decide(v: LeadVerdict) {
+    this.settled = true;
+    this.text    = '';
+    this.settle(v);
+  }
+}
+
+/** True if an SSE data payload carries a provider error. */
+function isErrorEvent(data: string): boolean {
+  if (!data.includes('"error"')) return false;
+  try {
+    const parsed = JSON.parse(data) as Record<string, unknown>;
+    return 'error' in parsed && parsed['error'] != null;
+  } catch {
+    return true; // unparseable event that mentions "error" → failover
+  }
+}
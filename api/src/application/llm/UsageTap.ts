@@ -0,0 +1,52 @@
+/**
+ * Token usage of a completion, read from the response as it passes through.
+ *
+ * OpenRouter reports `usage` in the JSON body of a plain completion and in
+ * the final data event of a stream.  The tap forwards every chunk untouched
+ * and keeps only a short tail of the decoded text; when the body ends it
+ * looks for the last `"usage"` object there.  Nothing is parsed as JSON.
+ */
+
+export interface TokenUsage {
+  promptTokens:     number;
+  completionTokens: number;
+}
+
+/** Enough tail to hold the final usage chunk and the `[DONE]` terminator. */
+const TAIL_CHARS = 4096;
+
+/** Extract the last reported usage from a completion body (or its tail). */
+export function parseUsage(text: string): TokenUsage | null {
+  const at = text.lastIndexOf('"usage"');
+  if (at === -1) return null;
+  const rest       = text.slice(at);
+  const prompt     = /"prompt_tokens"\s*:\s*(\d+)/.exec(rest);
+  const completion = /"completion_tokens"\s*:\s*(\d+)/.exec(rest);
+  if (!prompt && !completion) return null;
+  return {
+    promptTokens:     Number(prompt?.[1] ?? 0),
+    completionTokens: Number(completion?.[1] ?? 0),
+  };
+}
+
+export class UsageTap {
+  readonly stream: TransformStream<Uint8Array, Uint8Array>;
+  /** Settles when the body ends: the usage, or null if none was reported or the client went away. */
+  readonly usage:  Promise<TokenUsage | null>;
+
+  private decoder = new TextDecoder();
+  private tail    = '';
+
+  constructor() {
+    let settle!: (usage: TokenUsage | null) => void;
+    this.usage  = new Promise((resolve) => { settle = resolve; });
+    this.stream = new TransformStream<Uint8Array, Uint8Array>({
+      transform: (chunk, controller) => {
+        this.tail = (this.tail + this.decoder.decode(chunk, { stream: true })).slice(-TAIL_CHARS);
+        controller.enqueue(chunk);
+      },
+      flush: () => settle(parseUsage(this.tail + this.decoder.decode())),
+      cancel: () => settle(null),
+    } as Transformer<Uint8Array, Uint8Array>);
+  }
+}
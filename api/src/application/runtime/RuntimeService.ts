@@ -2,13 +2,18 @@ import { IExecutionRepository } from '../../domain/execution/IExecutionRepositor
 import { ITaskRepository } from '../../domain/task/ITaskRepository';
 import { IAgentRepository } from '../../domain/agent/IAgentRepository';
 import { IAuditRepository } from '../../domain/audit/IAuditRepository';
+import { IExecutionEventPublisher } from '../../domain/execution/IExecutionEventPublisher';
+import { IExecutionDispatcher } from '../../domain/execution/IExecutionDispatcher';
 import { Execution } from '../../domain/execution/Execution';
 import { AuditEvent } from '../../domain/audit/AuditEvent';
 import {
   AuditEventType, ExecutionStatus,
   asExecutionId, asTaskId, asAgentId, asTenantId,
 } from '../../domain/shared/types';
-import { NotFoundError, ForbiddenError } from '../../domain/shared/errors';
+import {
+  ConflictError, DomainError, NotFoundError, ForbiddenError, TooManyRequestsError, ValidationError,
+} from '../../domain/shared/errors';
+import { Cursor, Page } from '../../domain/shared/pagination';
 
 export interface SubmitTaskDto {
   taskId:      number;
@@ -24,11 +29,73 @@ export interface UpdateExecutionDto {
   errorMessage?: string;
 }
 
+/** One entry of a `submitMany` call; tenant and submitter apply to the whole batch. */
+export type SubmitItemDto = Omit<SubmitTaskDto, 'tenantId' | 'submittedBy'>;
+
+/** One entry of an `updateMany` call. */
+export interface UpdateItemDto extends UpdateExecutionDto {
+  id: number;
+}
+
+/** Outcome of one batch item, reported at its position in the request. */
+export type BatchItemResult =
+  | { index: number; ok: true;  execution: Execution }
+  | { index: number; ok: false; error: DomainError };
+
+/** Largest batch accepted by `submitMany` / `updateMany`. */
+export const MAX_BATCH_SIZE = 100;
+
+/** Re-reads before a transition that keeps losing its compare-and-set gives up. */
+const MAX_TRANSITION_ATTEMPTS = 3;
+
+/**
+ * Admission-control limits for in-flight (pending / submitted / running)
+ * executions.  Submissions beyond these limits are rejected with 429 instead
+ * of piling more work onto the agents.
+ */
+export interface RuntimeLimits {
+  maxActivePerTenant: number;
+  maxActivePerAgent:  number;
+}
+
+export const DEFAULT_RUNTIME_LIMITS: RuntimeLimits = {
+  maxActivePerTenant: 200,
+  maxActivePerAgent:  20,
+};
+
+/**
+ * Starts a side effect the caller does not wait on.  Implementations keep
+ * `work` alive past the response (e.g. via `ctx.waitUntil`) and log, never
+ * rethrow, its failure.
+ */
+export type DeferWork = (label: string, work: Promise<unknown>) => void;
+
+/** Fallback for callers without a request context: let the work run detached. */
+const runDetached: DeferWork = (label, work) => {
+  work.catch((err) => console.error(`[${label}] deferred work failed`, err));
+};
+
+export interface RuntimeCapacity {
+  active:             number;
+  maxActivePerTenant: number;
+  maxActivePerAgent:  number;
+}
+
 /**
  * RuntimeService — the execution engine.
  *
  * Orchestrates the task execution lifecycle:
  *   submit → dispatch to agent → track state → complete / fail / cancel
+ *
+ * Every transition is pushed to the tenant's event channel so live views
+ * don't have to poll.  New executions are handed to the dispatcher, which
+ * pushes them to a connected claw; without one they wait to be polled.
+ * Both hand-offs are deferred: they run after the response, and a failed
+ * one never fails the committed change.
+ *
+ * State writes are compare-and-set on the status that was read, so a
+ * transition racing another (a claw's ack against its result, a REST update
+ * against the dispatcher) is re-judged against the state that won.
  */
 export class RuntimeService {
   constructor(
@@ -36,6 +103,10 @@ export class RuntimeService {
     private readonly tasks:      ITaskRepository,
     private readonly agents:     IAgentRepository,
     private readonly audit:      IAuditRepository,
+    private readonly events:     IExecutionEventPublisher,
+    private readonly dispatcher: IExecutionDispatcher | null = null,
+    private readonly defer:      DeferWork = runDetached,
+    private readonly limits:     RuntimeLimits = DEFAULT_RUNTIME_LIMITS,
   ) {}
 
   async submit(dto: SubmitTaskDto): Promise<Execution> {
@@ -48,6 +119,8 @@ export class RuntimeService {
       if (!agent.isActive) throw new ForbiddenError('Agent is not active');
     }
 
+    await this.assertCapacity(dto.tenantId, dto.agentId);
+
     const execution = await this.executions.save(
       Execution.create({
         taskId:      asTaskId(dto.taskId),
@@ -67,6 +140,8 @@ export class RuntimeService {
       metadata:     JSON.stringify({ taskId: dto.taskId, agentId: dto.agentId }),
     }));
 
+    this.publish([execution]);
+    this.dispatch([execution]);
     return execution;
   }
 
@@ -80,17 +155,21 @@ export class RuntimeService {
     return this.executions.findByTask(asTaskId(taskId));
   }
 
-  async listByTenant(tenantId: number, limit?: number): Promise<Execution[]> {
-    return this.executions.findByTenant(asTenantId(tenantId), limit);
+  async listByTenant(tenantId: number, limit?: number, cursor?: Cursor): Promise<Page<Execution>> {
+    return this.executions.findByTenant(asTenantId(tenantId), limit, cursor);
+  }
+
+  /** Current in-flight execution count for a tenant alongside the configured limits. */
+  async capacity(tenantId: number): Promise<RuntimeCapacity> {
+    const active = await this.executions.countActive(asTenantId(tenantId));
+    return { active, ...this.limits };
   }
 
   async cancel(id: number, cancelledBy: string): Promise<Execution> {
-    const execution = await this.getExecution(id);
-    const cancelled = execution.cancel();
-    const saved     = await this.executions.update(cancelled);
+    const saved = await this.transition(id, (e) => e.cancel());
 
     await this.audit.save(AuditEvent.create({
-      tenantId:     execution.tenantId,
+      tenantId:     saved.tenantId,
       userId:       cancelledBy,
       eventType:    AuditEventType.TASK_CANCELLED,
       resourceType: 'execution',
@@ -98,47 +177,267 @@ export class RuntimeService {
       metadata:     null,
     }));
 
+    this.publish([saved]);
+    if (this.dispatcher) this.defer('dispatch', this.dispatcher.cancel(saved));
     return saved;
   }
 
+  /**
+   * Mark executions as handed to a claw (pending → submitted).  Called by the
+   * dispatcher once deliveries went out; executions that already moved on
+   * (acked, cancelled) are left alone.
+   */
+  async markDispatched(ids: number[]): Promise<void> {
+    const pending = (await this.executions.findByIds(ids.map(asExecutionId)))
+      .filter((e) => e.status === ExecutionStatus.PENDING);
+    const written = await this.executions.updateMany(
+      pending.map((e) => ({ execution: e.markSubmitted(), from: e.status })),
+    );
+    // Null: acked (or cancelled) while we were reading – that state stands
+    this.publish(written.filter((e): e is Execution => e !== null));
+  }
+
   /**
    * Called by an agent (or webhook) to update execution state.
    * Transitions: submitted→running, running→completed|failed
    */
   async update(id: number, dto: UpdateExecutionDto): Promise<Execution> {
-    let execution = await this.getExecution(id);
-
-    switch (dto.status) {
-      case ExecutionStatus.RUNNING:
-        execution = execution.markRunning();
-        break;
-      case ExecutionStatus.COMPLETED:
-        execution = execution.markCompleted(dto.result ?? '');
-        break;
-      case ExecutionStatus.FAILED:
-        execution = execution.markFailed(dto.errorMessage ?? 'Unknown error');
-        break;
-      default:
-        throw new ForbiddenError(`Cannot transition to status '${dto.status}' via this endpoint`);
-    }
+    const saved = await this.transition(id, (e) => applyUpdate(e, dto));
+
+    await this.audit.save(updateAuditEvent(saved, dto));
+    this.publish([saved]);
+    this.withdraw([saved]);
+    return saved;
+  }
 
-    const saved = await this.executions.update(execution);
+  // -----------------------------------------------------------------------
+  // Batch operations
+  //
+  // Tasks, agents and executions are loaded with one IN query each and the
+  // writes go out as multi-row statements, so a batch costs a fixed number of
+  // round trips.  Items fail individually: results come back in request
+  // order, and an item's failure never rejects the others.
+  // -----------------------------------------------------------------------
 
-    const auditType = dto.status === ExecutionStatus.RUNNING
-      ? AuditEventType.EXECUTION_STARTED
-      : dto.status === ExecutionStatus.COMPLETED
-        ? AuditEventType.EXECUTION_COMPLETED
-        : AuditEventType.EXECUTION_FAILED;
+  /** Submit many tasks at once.  Admission limits apply item by item, in order. */
+  async submitMany(tenantId: number, submittedBy: string, items: SubmitItemDto[]): Promise<BatchItemResult[]> {
+    assertBatchSize(items.length);
 
-    await this.audit.save(AuditEvent.create({
-      tenantId:     execution.tenantId,
-      userId:       null,
-      eventType:    auditType,
+    const agentIds = items.flatMap((i) => (i.agentId !== undefined ? [asAgentId(i.agentId)] : []));
+    const [tasks, agents, activeByAgent] = await Promise.all([
+      this.tasks.findByIds([...new Set(items.map((i) => asTaskId(i.taskId)))]),
+      this.agents.findByIds([...new Set(agentIds)]),
+      this.executions.countActiveByAgent(asTenantId(tenantId)),
+    ]);
+    const taskIds   = new Set<number>(tasks.map((t) => t.id));
+    const agentById = new Map<number, (typeof agents)[number]>(agents.map((a) => [a.id, a]));
+    let tenantActive = [...activeByAgent.values()].reduce((a, b) => a + b, 0);
+
+    const results: BatchItemResult[] = [];
+    const accepted: Array<{ index: number; execution: Execution }> = [];
+
+    items.forEach((item, index) => {
+      const reject = (error: DomainError) => { results[index] = { index, ok: false, error }; };
+
+      if (!taskIds.has(item.taskId)) return reject(new NotFoundError('Task', item.taskId));
+      if (item.agentId !== undefined) {
+        const agent = agentById.get(item.agentId);
+        if (!agent) return reject(new NotFoundError('Agent', item.agentId));
+        if (!agent.isActive) return reject(new ForbiddenError('Agent is not active'));
+      }
+
+      const agentKey    = item.agentId !== undefined ? asAgentId(item.agentId) : null;
+      const agentActive = activeByAgent.get(agentKey) ?? 0;
+      if (tenantActive >= this.limits.maxActivePerTenant) {
+        return reject(new TooManyRequestsError(
+          `Workspace has ${tenantActive} active executions (limit ${this.limits.maxActivePerTenant}); retry once some finish`,
+        ));
+      }
+      if (agentKey !== null && agentActive >= this.limits.maxActivePerAgent) {
+        return reject(new TooManyRequestsError(
+          `Agent ${agentKey} has ${agentActive} active executions (limit ${this.limits.maxActivePerAgent}); retry once some finish`,
+        ));
+      }
+      tenantActive++;
+      activeByAgent.set(agentKey, agentActive + 1);
+
+      accepted.push({
+        index,
+        execution: Execution.create({
+          taskId:      asTaskId(item.taskId),
+          agentId:     agentKey,
+          tenantId:    asTenantId(tenantId),
+          submittedBy,
+          payload:     item.payload ?? null,
+        }),
+      });
+    });
+
+    const saved = await this.executions.saveMany(accepted.map((a) => a.execution));
+    await this.audit.saveMany(saved.map((execution) => AuditEvent.create({
+      tenantId:     asTenantId(tenantId),
+      userId:       submittedBy,
+      eventType:    AuditEventType.TASK_SUBMITTED,
       resourceType: 'execution',
-      resourceId:   String(saved.id),
-      metadata:     dto.result ? JSON.stringify({ result: dto.result }) : null,
-    }));
+      resourceId:   String(execution.id),
+      metadata:     JSON.stringify({ taskId: execution.taskId, agentId: execution.agentId ?? undefined }),
+    })));
+    this.publish(saved);
+    this.dispatch(saved);
 
-    return saved;
+    saved.forEach((execution, i) => {
+      const index = accepted[i]!.index;
+      results[index] = { index, ok: true, execution };
+    });
+    return results;
+  }
+
+  /** Apply many agent state updates at once.  Executions outside the tenant count as missing. */
+  async updateMany(tenantId: number, items: UpdateItemDto[]): Promise<BatchItemResult[]> {
+    assertBatchSize(items.length);
+
+    const found = (await this.executions.findByIds([...new Set(items.map((i) => asExecutionId(i.id)))]))
+      .filter((e) => e.tenantId === tenantId);
+    const byId     = new Map<number, Execution>(found.map((e) => [e.id, e]));
+    const readFrom = new Map<number, ExecutionStatus>(found.map((e) => [e.id, e.status]));
+
+    const results: BatchItemResult[] = [];
+    const changed: Array<{ index: number; execution: Execution; dto: UpdateItemDto }> = [];
+
+    items.forEach((item, index) => {
+      const current = byId.get(item.id);
+      if (!current) {
+        results[index] = { index, ok: false, error: new NotFoundError('Execution', item.id) };
+        return;
+      }
+      try {
+        const next = applyUpdate(current, item);
+        // Later items for the same execution build on the earlier transition
+        byId.set(item.id, next);
+        changed.push({ index, execution: next, dto: item });
+      } catch (err) {
+        if (!(err instanceof DomainError)) throw err;
+        results[index] = { index, ok: false, error: err };
+      }
+    });
+
+    // Several updates to one execution collapse into its final state
+    const finalStates = [...new Map(changed.map((c) => [c.execution.id, c.execution])).values()];
+    const written     = await this.executions.updateMany(
+      finalStates.map((execution) => ({ execution, from: readFrom.get(execution.id)! })),
+    );
+    const saved = new Map<number, Execution>();
+    written.forEach((e) => { if (e) saved.set(e.id, e); });
+
+    const applied = changed.filter((c) => saved.has(c.execution.id));
+    await this.audit.saveMany(applied.map((c) => updateAuditEvent(c.execution, c.dto)));
+    this.publish([...saved.values()]);
+    this.withdraw([...saved.values()]);
+
+    for (const c of changed) {
+      const execution = saved.get(c.execution.id);
+      results[c.index] = execution
+        ? { index: c.index, ok: true, execution }
+        : { index: c.index, ok: false, error: new ConflictError(`Execution ${c.execution.id} changed concurrently; retry`) };
+    }
+    return results;
+  }
+
+  // -----------------------------------------------------------------------
+  // Private helpers
+  // -----------------------------------------------------------------------
+
+  /**
+   * Read, transition and compare-and-set one execution.  Losing the race
+   * re-reads and re-applies, so the change is judged against the state that
+   * won (a late "running" is rejected once the execution has finished).
+   */
+  private async transition(id: number, apply: (e: Execution) => Execution): Promise<Execution> {
+    for (let attempt = 0; attempt < MAX_TRANSITION_ATTEMPTS; attempt++) {
+      const current = await this.getExecution(id);
+      const saved   = await this.executions.update(apply(current), current.status);
+      if (saved) return saved;
+    }
+    throw new ConflictError(`Execution ${id} changed concurrently; retry`);
+  }
+
+  /** Push transitions to live subscribers once the response is out. */
+  private publish(executions: Execution[]): void {
+    if (executions.length === 0) return;
+    this.defer('events', Promise.all(executions.map((e) => this.events.publish(e))));
   }
+
+  /** Hand new executions to the dispatcher once the response is out. */
+  private dispatch(executions: Execution[]): void {
+    if (!this.dispatcher || executions.length === 0) return;
+    this.defer('dispatch', this.dispatcher.enqueue(executions));
+  }
+
+  /**
+   * Executions moved on through the REST API (an agent that polled them):
+   * the dispatcher must not deliver them again.
+   */
+  private withdraw(executions: Execution[]): void {
+    if (!this.dispatcher || executions.length === 0) return;
+    this.defer('dispatch', this.dispatcher.withdraw(executions));
+  }
+
+  private async assertCapacity(tenantId: number, agentId?: number): Promise<void> {
+    const [tenantActive, agentActive] = await Promise.all([
+      this.executions.countActive(asTenantId(tenantId)),
+      agentId !== undefined
+        ? this.executions.countActive(asTenantId(tenantId), asAgentId(agentId))
+        : Promise.resolve(0),
+    ]);
+
+    if (tenantActive >= this.limits.maxActivePerTenant) {
+      throw new TooManyRequestsError(
+        `Workspace has ${tenantActive} active executions (limit ${this.limits.maxActivePerTenant}); retry once some finish`,
+      );
+    }
+    if (agentId !== undefined && agentActive >= this.limits.maxActivePerAgent) {
+      throw new TooManyRequestsError(
+        `Agent ${agentId} has ${agentActive} active executions (limit ${this.limits.maxActivePerAgent}); retry once some finish`,
+      );
+    }
+  }
+}
+
+// ---------------------------------------------------------------------------
+// Helpers
+// ---------------------------------------------------------------------------
+
+function assertBatchSize(n: number): void {
+  if (n === 0) throw new ValidationError('items must not be empty');
+  if (n > MAX_BATCH_SIZE) throw new ValidationError(`At most ${MAX_BATCH_SIZE} items per batch (got ${n})`);
+}
+
+function applyUpdate(execution: Execution, dto: UpdateExecutionDto): Execution {
+  switch (dto.status) {
+    case ExecutionStatus.RUNNING:
+      return execution.markRunning();
+    case ExecutionStatus.COMPLETED:
+      return execution.markCompleted(dto.result ?? '');
+    case ExecutionStatus.FAILED:
+      return execution.markFailed(dto.errorMessage ?? 'Unknown error');
+    default:
+      throw new ForbiddenError(`Cannot transition to status '${dto.status}' via this endpoint`);
+  }
+}
+
+function updateAuditEvent(execution: Execution, dto: UpdateExecutionDto): AuditEvent {
+  const eventType = dto.status === ExecutionStatus.RUNNING
+    ? AuditEventType.EXECUTION_STARTED
+    : dto.status === ExecutionStatus.COMPLETED
+      ? AuditEventType.EXECUTION_COMPLETED
+      : AuditEventType.EXECUTION_FAILED;
+
+  return AuditEvent.create({
+    tenantId:     execution.tenantId,
+    userId:       null,
+    eventType,
+    resourceType: 'execution',
+    resourceId:   String(execution.id),
+    metadata:     dto.result ? JSON.stringify({ result: dto.result }) : null,
+  });
 }
@@ -6,6 +6,7 @@ import {
   asProjectId, asTaskId, asTenantId,
 } from '../../domain/shared/types';
 import { NotFoundError, ForbiddenError } from '../../domain/shared/errors';
+import { Cursor, Page } from '../../domain/shared/pagination';
 
 export interface CreateTaskDto {
   projectId: number;
@@ -18,6 +19,16 @@ export interface CreateTaskDto {
   persona?: string | null;
 }
 
+export interface TaskListFilters {
+  projectId?:         number;
+  statuses?:          TaskStatus[];
+  archived?:          boolean;
+  assignedAgentType?: AgentType;
+  updatedSince?:      Date;
+  limit?:             number;
+  cursor?:            Cursor;
+}
+
 export interface UpdateTaskDto {
   title?: string;
   description?: string | null;
@@ -43,18 +54,27 @@ export class TaskService {
     private readonly projects: IProjectRepository,
   ) {}
 
-  /** List tasks scoped to the caller's tenant. Optionally narrow by project. */
-  async listTasks(callerTenantId: number, projectId?: number): Promise<Task[]> {
+  /**
+   * List tasks scoped to the caller's tenant, newest first, one page at a time.
+   * Pass `updatedSince` to fetch only what changed since a previous listing.
+   */
+  async listTasks(callerTenantId: number, filters: TaskListFilters = {}): Promise<Page<Task>> {
+    const { projectId } = filters;
     if (projectId !== undefined) {
       const project = await this.projects.findById(asProjectId(projectId));
       if (!project) throw new NotFoundError('Project', projectId);
       if (project.tenantId !== callerTenantId) throw new ForbiddenError('Project belongs to a different workspace');
-      return this.tasks.findAll(asProjectId(projectId));
     }
-    // No project filter: return tasks for ALL projects in this tenant
-    const tenantProjects = await this.projects.findByTenant(asTenantId(callerTenantId));
-    const projectIds = tenantProjects.map(p => asProjectId(p.id));
-    return this.tasks.findByProjectIds(projectIds);
+    return this.tasks.query({
+      tenantId:          asTenantId(callerTenantId),
+      projectId:         projectId !== undefined ? asProjectId(projectId) : undefined,
+      statuses:          filters.statuses,
+      archived:          filters.archived,
+      assignedAgentType: filters.assignedAgentType,
+      updatedSince:      filters.updatedSince,
+      limit:             filters.limit ?? 100,
+      cursor:            filters.cursor,
+    });
   }
 
   async getTask(id: number): Promise<Task> {
@@ -19,11 +19,8 @@ export class TenantService {
   }
 
   async listTenantsForUser(userId: string): Promise<Array<{ id: number; name: string; slug: string; role: string }>> {
-    const userTenants = await this.tenants.findByUserId(userId);
-    return userTenants.map(t => {
-      const member = t.getMember(userId);
-      return { id: t.id, name: t.name, slug: t.slug, role: member?.role ?? 'member' };
-    });
+    const memberships = await this.tenants.findMembershipsByUserId(userId);
+    return memberships.map(m => ({ id: m.id, name: m.name, slug: m.slug, role: m.role ?? 'member' }));
   }
 
   async getTenant(id: number): Promise<Tenant> {
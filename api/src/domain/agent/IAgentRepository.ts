@@ -3,6 +3,8 @@ import { AgentId, TenantId } from '../shared/types';
 
 export interface IAgentRepository {
   findById(id: AgentId): Promise<Agent | null>;
+  /** Agents for the given ids in one query; missing ids are simply absent. */
+  findByIds(ids: AgentId[]): Promise<Agent[]>;
   findAllByTenant(tenantId: TenantId): Promise<Agent[]>;
   save(agent: Agent): Promise<Agent>;
   update(agent: Agent): Promise<Agent>;
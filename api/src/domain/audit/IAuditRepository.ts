@@ -1,14 +1,26 @@
 import { AuditEvent } from './AuditEvent';
-import { TenantId } from '../shared/types';
+import { TenantId, AuditEventType } from '../shared/types';
+import { Cursor, Page } from '../shared/pagination';
 
 export interface AuditQueryOptions {
-  tenantId?:    TenantId;
-  userId?:      string;
-  limit?:       number;
-  offset?:      number;
+  tenantId?:     TenantId;
+  userId?:       string;
+  eventTypes?:   AuditEventType[];
+  resourceType?: string;
+  resourceId?:   string;
+  /** Inclusive lower bound on createdAt. */
+  since?:        Date;
+  /** Exclusive upper bound on createdAt. */
+  until?:        Date;
+  limit?:        number;
+  /** Continue after the last event of a previous page. */
+  cursor?:       Cursor;
 }
 
 export interface IAuditRepository {
   save(event: AuditEvent): Promise<AuditEvent>;
-  query(opts: AuditQueryOptions): Promise<AuditEvent[]>;
+  /** Persist several events in one round trip.  No ids are returned. */
+  saveMany(events: AuditEvent[]): Promise<void>;
+  /** Newest first, keyset-paginated. */
+  query(opts: AuditQueryOptions): Promise<Page<AuditEvent>>;
 }
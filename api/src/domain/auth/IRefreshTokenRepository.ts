@@ -0,0 +1,34 @@
+import { TenantRole, UserId } from '../shared/types';
+
+/** A refresh token row joined with what renewing it needs. */
+export interface RefreshSession {
+  id:        number;
+  familyId:  string;
+  expiresAt: Date;
+  revokedAt: Date | null;
+  user: {
+    id:       UserId;
+    email:    string;
+    username: string | null;
+  };
+  /** The user's active role in the requested tenant (null if none was requested or not a member). */
+  role: TenantRole | null;
+}
+
+export interface NewRefreshToken {
+  tokenHash: string;
+  expiresAt: Date;
+}
+
+export interface IRefreshTokenRepository {
+  /** One indexed lookup: the token by hash, its user and (optionally) tenant membership. */
+  findSession(tokenHash: string, tenantId: number | null): Promise<RefreshSession | null>;
+  /** Start a new family (a login). */
+  create(userId: UserId, familyId: string, token: NewRefreshToken): Promise<void>;
+  /**
+   * Revoke live token `id` and insert its successor in the same family, atomically.
+   * False when `id` was already used or expired (a concurrent renewal won).
+   */
+  rotate(id: number, next: NewRefreshToken): Promise<boolean>;
+  revokeFamily(familyId: string): Promise<void>;
+}
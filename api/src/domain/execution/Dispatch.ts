@@ -0,0 +1,81 @@
+/**
+ * Execution dispatch — routing submitted executions to a tenant's claws.
+ *
+ * Each execution is leased to one online claw at a time.  The claw must ack
+ * the lease within `ackTimeoutMs` and then keep it alive (any message about
+ * the execution renews it) for up to `runLeaseMs` between messages; a lease
+ * that lapses, or whose claw goes offline, puts the execution back in the
+ * queue until `maxAttempts` deliveries have been made.
+ *
+ * Claw selection is least-loaded among the online claws that are under
+ * `maxPerClaw` in-flight executions and have the execution's required skill
+ * (from claw_skill_assignments or a tenant-wide assignment).
+ */
+
+export interface DispatchLimits {
+  /** In-flight (leased) executions per claw. */
+  maxPerClaw:   number;
+  /** Time a claw has to ack a delivery. */
+  ackTimeoutMs: number;
+  /** Longest silence on an acked lease before it is reclaimed. */
+  runLeaseMs:   number;
+  /** Deliveries before the execution is failed. */
+  maxAttempts:  number;
+}
+
+export const DEFAULT_DISPATCH_LIMITS: DispatchLimits = {
+  maxPerClaw:   4,
+  ackTimeoutMs: 10_000,
+  runLeaseMs:   5 * 60_000,
+  maxAttempts:  5,
+};
+
+export interface DispatchJob {
+  executionId:   number;
+  taskId:        number;
+  agentId:       number | null;
+  payload:       string | null;
+  /** Skill slug a claw must have to take the job; null = any claw. */
+  requiredSkill: string | null;
+  attempts:      number;
+}
+
+export interface ClawLoad {
+  clawId:         number;
+  online:         boolean;
+  inFlight:       number;
+  /** Skill slugs assigned to the claw (including tenant-wide ones). */
+  skills:         string[];
+  lastDispatchAt: number;
+}
+
+/**
+ * The skill an execution asks for: `{"skill": "<slug>"}` in its JSON payload.
+ * Anything else (no payload, plain text, no skill field) runs on any claw.
+ */
+export function requiredSkillOf(payload: string | null): string | null {
+  if (!payload || !payload.includes('"skill"')) return null;
+  try {
+    const parsed = JSON.parse(payload) as { skill?: unknown };
+    return typeof parsed.skill === 'string' && parsed.skill ? parsed.skill : null;
+  } catch {
+    return null;
+  }
+}
+
+/** Least-loaded eligible claw for `job`; ties go to the claw idle longest. */
+export function selectClaw(claws: Iterable<ClawLoad>, job: DispatchJob, maxPerClaw: number): ClawLoad | null {
+  let best: ClawLoad | null = null;
+  for (const claw of claws) {
+    if (!claw.online || claw.inFlight >= maxPerClaw) continue;
+    if (job.requiredSkill && !claw.skills.includes(job.requiredSkill)) continue;
+    if (
+      !best ||
+      claw.inFlight < best.inFlight ||
+      (claw.inFlight === best.inFlight && claw.lastDispatchAt < best.lastDispatchAt)
+    ) {
+      best = claw;
+    }
+  }
+  return best;
+}
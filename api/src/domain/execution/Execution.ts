@@ -19,6 +19,16 @@ export interface ExecutionProps {
   updatedAt:    Date;
 }
 
+/** Lifecycle stage per status; a transition must move to a later stage. */
+const STAGE: Record<ExecutionStatus, number> = {
+  [ExecutionStatus.PENDING]:   0,
+  [ExecutionStatus.SUBMITTED]: 1,
+  [ExecutionStatus.RUNNING]:   2,
+  [ExecutionStatus.COMPLETED]: 3,
+  [ExecutionStatus.FAILED]:    3,
+  [ExecutionStatus.CANCELLED]: 3,
+};
+
 /**
  * Execution aggregate root.
  *
@@ -28,6 +38,10 @@ export interface ExecutionProps {
  *   PENDING → SUBMITTED → RUNNING → COMPLETED
  *                                  └→ FAILED
  *   PENDING/SUBMITTED/RUNNING → CANCELLED
+ *
+ * Transitions only move forward (a late "running" never overwrites a
+ * finished execution), and an earlier stage may be skipped — e.g. an agent
+ * that polled a pending execution reports RUNNING directly.
  */
 export class Execution {
   private constructor(private readonly props: ExecutionProps) {}
@@ -79,6 +93,9 @@ export class Execution {
   get createdAt():    Date             { return this.props.createdAt; }
   get updatedAt():    Date             { return this.props.updatedAt; }
 
+  /** Completed, failed or cancelled — no further transition is possible. */
+  get isFinished(): boolean { return STAGE[this.props.status] === STAGE[ExecutionStatus.COMPLETED]; }
+
   // -----------------------------------------------------------------------
   // State transitions
   // -----------------------------------------------------------------------
@@ -132,12 +149,7 @@ export class Execution {
   // -----------------------------------------------------------------------
 
   private assertNotTerminal(action: string): void {
-    const terminal: ExecutionStatus[] = [
-      ExecutionStatus.COMPLETED,
-      ExecutionStatus.FAILED,
-      ExecutionStatus.CANCELLED,
-    ];
-    if (terminal.includes(this.props.status)) {
+    if (this.isFinished) {
       throw new ValidationError(
         `Cannot ${action} an execution in status '${this.props.status}'`,
       );
@@ -148,6 +160,11 @@ export class Execution {
     status: ExecutionStatus,
     extra: Partial<ExecutionProps>,
   ): Execution {
+    if (STAGE[status] <= STAGE[this.props.status]) {
+      throw new ValidationError(
+        `Cannot move an execution from '${this.props.status}' to '${status}'`,
+      );
+    }
     return new Execution({ ...this.props, ...extra, status, updatedAt: new Date() });
   }
 
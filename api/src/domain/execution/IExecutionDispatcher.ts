@@ -0,0 +1,16 @@
+import { Execution } from './Execution';
+
+/**
+ * Port for handing new executions to the tenant's connected claws, so they
+ * start within milliseconds instead of waiting to be polled.
+ */
+export interface IExecutionDispatcher {
+  enqueue(executions: Execution[]): Promise<void>;
+  /** Withdraw a queued or leased execution. */
+  cancel(execution: Execution): Promise<void>;
+  /**
+   * Executions an agent moved on outside the dispatcher: drop their queued
+   * copies, and release the leases of those that finished.
+   */
+  withdraw(executions: Execution[]): Promise<void>;
+}
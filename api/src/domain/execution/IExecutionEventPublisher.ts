@@ -0,0 +1,9 @@
+import { Execution } from './Execution';
+
+/**
+ * Port for pushing execution state transitions to live subscribers
+ * (e.g. the task board) instead of having them poll the runtime API.
+ */
+export interface IExecutionEventPublisher {
+  publish(execution: Execution): Promise<void>;
+}
@@ -1,10 +1,35 @@
 import { Execution } from './Execution';
-import { ExecutionId, TaskId, TenantId } from '../shared/types';
+import { ExecutionId, TaskId, TenantId, AgentId, ExecutionStatus } from '../shared/types';
+import { Cursor, Page } from '../shared/pagination';
+
+/** A state transition to write, valid only while the stored status is still `from`. */
+export interface ExecutionChange {
+  execution: Execution;
+  from:      ExecutionStatus;
+}
 
 export interface IExecutionRepository {
   findById(id: ExecutionId): Promise<Execution | null>;
+  /** Executions for the given ids in one query; missing ids are simply absent. */
+  findByIds(ids: ExecutionId[]): Promise<Execution[]>;
   findByTask(taskId: TaskId): Promise<Execution[]>;
-  findByTenant(tenantId: TenantId, limit?: number): Promise<Execution[]>;
+  /** Newest first; pass the previous page's cursor to continue. */
+  findByTenant(tenantId: TenantId, limit?: number, cursor?: Cursor): Promise<Page<Execution>>;
+  /** Number of pending / submitted / running executions, optionally for one agent. */
+  countActive(tenantId: TenantId, agentId?: AgentId): Promise<number>;
+  /** Active executions per agent (key null = unassigned) in one grouped query. */
+  countActiveByAgent(tenantId: TenantId): Promise<Map<AgentId | null, number>>;
   save(execution: Execution): Promise<Execution>;
-  update(execution: Execution): Promise<Execution>;
+  /** Insert several executions as one multi-row statement; results keep input order. */
+  saveMany(executions: Execution[]): Promise<Execution[]>;
+  /**
+   * Compare-and-set: write the transition only if the stored status is still
+   * `from`.  Null when the execution moved on in the meantime.
+   */
+  update(execution: Execution, from: ExecutionStatus): Promise<Execution | null>;
+  /**
+   * Apply several compare-and-set transitions in one transactional round
+   * trip; results keep input order, null where the status had moved on.
+   */
+  updateMany(changes: ExecutionChange[]): Promise<Array<Execution | null>>;
 }
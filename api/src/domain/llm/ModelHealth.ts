@@ -0,0 +1,126 @@
+/**
+ * Model health — rolling per-model statistics used to route LLM requests.
+ *
+ * Every upstream attempt produces a ModelSample.  Samples are folded into
+ * ModelStats (EWMA success rate and time-to-first-token, p95 over the most
+ * recent TTFTs, and a failure cooldown).  The fold is pure so the same code
+ * runs in the isolate-local store and in the shared Durable Object.
+ */
+
+export interface ModelSample {
+  model:   string;
+  ok:      boolean;
+  /** Time to first byte of the completion; only set for successful attempts. */
+  ttftMs?: number;
+  at:      number;
+}
+
+export interface ModelStats {
+  /** EWMA of attempt outcomes, 1 = always succeeds. */
+  successRate:   number;
+  /** EWMA of time to first token. */
+  ttftMs:        number;
+  p95TtftMs:     number;
+  samples:       number;
+  cooldownUntil: number;
+  /** Most recent TTFTs, newest last, used for the p95. */
+  recentTtfts:   number[];
+}
+
+export type ModelHealthSnapshot = Record<string, ModelStats>;
+
+/** Port for the health store; implementations may be local or shared. */
+export interface IModelHealthStore {
+  snapshot(): Promise<ModelHealthSnapshot>;
+  /** Buffer a sample; it is applied locally at once and shared on flush(). */
+  record(sample: ModelSample): void;
+  /** Share buffered samples; may wait to batch them with later ones.  For `ctx.waitUntil`. */
+  flush(): Promise<void>;
+}
+
+export const MODEL_COOLDOWN_MS = 60_000;
+
+const EWMA_ALPHA     = 0.2;
+const RECENT_TTFTS   = 50;
+/** Prior for models with no samples yet, so they still get explored. */
+const PRIOR_TTFT_MS  = 1_500;
+
+export function emptyStats(): ModelStats {
+  return {
+    successRate:   1,
+    ttftMs:        PRIOR_TTFT_MS,
+    p95TtftMs:     PRIOR_TTFT_MS,
+    samples:       0,
+    cooldownUntil: 0,
+    recentTtfts:   [],
+  };
+}
+
+/** Fold one sample into a snapshot, returning the updated snapshot. */
+export function applySample(snapshot: ModelHealthSnapshot, sample: ModelSample): ModelHealthSnapshot {
+  const prev = snapshot[sample.model] ?? emptyStats();
+  const next: ModelStats = {
+    ...prev,
+    successRate: ewma(prev.successRate, sample.ok ? 1 : 0, prev.samples),
+    samples:     prev.samples + 1,
+  };
+
+  if (sample.ok && sample.ttftMs !== undefined) {
+    next.ttftMs      = ewma(prev.ttftMs, sample.ttftMs, prev.samples);
+    next.recentTtfts = [...prev.recentTtfts, sample.ttftMs].slice(-RECENT_TTFTS);
+    next.p95TtftMs   = percentile(next.recentTtfts, 0.95);
+  }
+  if (!sample.ok) {
+    next.cooldownUntil = Math.max(prev.cooldownUntil, sample.at + MODEL_COOLDOWN_MS);
+  }
+
+  return { ...snapshot, [sample.model]: next };
+}
+
+export function isCoolingDown(stats: ModelStats | undefined, now: number): boolean {
+  return stats !== undefined && stats.cooldownUntil > now;
+}
+
+/**
+ * Routing weight: favour models that succeed and answer quickly.  Squaring
+ * the success rate makes a flaky model lose traffic faster than a slow one.
+ */
+export function routingWeight(stats: ModelStats | undefined): number {
+  const s = stats ?? emptyStats();
+  return Math.max(0.001, s.successRate ** 2) * (1_000 / (1_000 + s.p95TtftMs));
+}
+
+/**
+ * Order the pool for one request: healthy models by weighted random sampling
+ * without replacement, then models in cooldown (soonest to recover first) as
+ * a last resort.
+ */
+export function rankModels(
+  pool:     readonly string[],
+  snapshot: ModelHealthSnapshot,
+  now:      number,
+  random:   () => number = Math.random,
+): string[] {
+  const healthy = pool.filter((m) => !isCoolingDown(snapshot[m], now));
+  const cooling = pool
+    .filter((m) => isCoolingDown(snapshot[m], now))
+    .sort((a, b) => (snapshot[a]?.cooldownUntil ?? 0) - (snapshot[b]?.cooldownUntil ?? 0));
+
+  // Efraimidis–Spirakis: key = u^(1/w), highest keys first
+  const keyed = healthy.map((m) => ({ m, key: random() ** (1 / routingWeight(snapshot[m])) }));
+  keyed.sort((a, b) => b.key - a.key);
+
+  return [...keyed.map((k) => k.m), ...cooling];
+}
+
+function ewma(prev: number, value: number, samples: number): number {
+  // Average plainly until the window fills so early samples aren't swamped by the prior
+  const alpha = samples < 1 / EWMA_ALPHA ? 1 / (samples + 1) : EWMA_ALPHA;
+  return prev + alpha * (value - prev);
+}
+
+function percentile(values: number[], p: number): number {
+  if (values.length === 0) return PRIOR_TTFT_MS;
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))] ?? 0;
+}
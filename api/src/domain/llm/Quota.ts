@@ -0,0 +1,134 @@
+/**
+ * Token-bucket quota for the coderClawLLM proxy.
+ *
+ * Each caller (a tenant's claw, or an anonymous client IP) has two buckets:
+ * one charged per request on admission, one charged with the tokens a
+ * completion actually used once it has finished.  The token bucket may go
+ * negative — a request is only admitted while it is positive — so a large
+ * completion delays the caller's next request instead of being cut off.
+ */
+
+export interface BucketPolicy {
+  /** Burst size. */
+  capacity:        number;
+  /** Sustained rate. */
+  refillPerSecond: number;
+}
+
+export interface QuotaPolicy {
+  requests: BucketPolicy;
+  tokens:   BucketPolicy;
+}
+
+export interface BucketState {
+  level:     number;
+  updatedAt: number;
+}
+
+export interface QuotaState {
+  requests: BucketState;
+  tokens:   BucketState;
+}
+
+export interface QuotaDecision {
+  allowed:           boolean;
+  /** How long until the next request would be admitted (0 when allowed). */
+  retryAfterMs:      number;
+  remainingRequests: number;
+  remainingTokens:   number;
+}
+
+/** A batch of request permits handed to one isolate to admit locally. */
+export interface QuotaLease extends QuotaDecision {
+  /** Permits taken from the request bucket; `allowed` is true when any were. */
+  granted: number;
+}
+
+/** Claws: 60 requests/min bursting to 30, 200k tokens/min bursting to 100k. */
+export const CLAW_QUOTA: QuotaPolicy = {
+  requests: { capacity: 30,      refillPerSecond: 1 },
+  tokens:   { capacity: 100_000, refillPerSecond: 200_000 / 60 },
+};
+
+/** Unauthenticated callers, keyed by client IP: 30 requests/min bursting to 10, 20k tokens/min. */
+export const ANONYMOUS_QUOTA: QuotaPolicy = {
+  requests: { capacity: 10,     refillPerSecond: 30 / 60 },
+  tokens:   { capacity: 20_000, refillPerSecond: 20_000 / 60 },
+};
+
+export function fullQuota(policy: QuotaPolicy, now: number): QuotaState {
+  return {
+    requests: { level: policy.requests.capacity, updatedAt: now },
+    tokens:   { level: policy.tokens.capacity,   updatedAt: now },
+  };
+}
+
+function refill(bucket: BucketState, policy: BucketPolicy, now: number): BucketState {
+  const elapsed = Math.max(0, now - bucket.updatedAt) / 1000;
+  return {
+    level:     Math.min(policy.capacity, bucket.level + elapsed * policy.refillPerSecond),
+    updatedAt: now,
+  };
+}
+
+/** Milliseconds until `bucket` holds at least `needed`. */
+function waitFor(bucket: BucketState, policy: BucketPolicy, needed: number): number {
+  if (bucket.level >= needed) return 0;
+  return Math.ceil(((needed - bucket.level) / policy.refillPerSecond) * 1000);
+}
+
+function decide(state: QuotaState, policy: QuotaPolicy, allowed: boolean): QuotaDecision {
+  const retryAfterMs = allowed ? 0 : Math.max(
+    waitFor(state.requests, policy.requests, 1),
+    waitFor(state.tokens,   policy.tokens,   Number.MIN_VALUE),
+  );
+  return {
+    allowed,
+    retryAfterMs,
+    remainingRequests: Math.max(0, Math.floor(state.requests.level)),
+    remainingTokens:   Math.max(0, Math.floor(state.tokens.level)),
+  };
+}
+
+/** Admit one request if both buckets allow it. */
+export function admit(
+  current: QuotaState, policy: QuotaPolicy, now: number,
+): { state: QuotaState; decision: QuotaDecision } {
+  const state: QuotaState = {
+    requests: refill(current.requests, policy.requests, now),
+    tokens:   refill(current.tokens,   policy.tokens,   now),
+  };
+  const allowed = state.requests.level >= 1 && state.tokens.level > 0;
+  if (allowed) state.requests.level -= 1;
+  return { state, decision: decide(state, policy, allowed) };
+}
+
+/**
+ * Take up to `count` request permits at once, while the token bucket is
+ * positive (the same test `admit` applies to one).  Permits the isolate never
+ * uses are simply lost, so leases should be a small share of the burst.
+ */
+export function lease(
+  current: QuotaState, policy: QuotaPolicy, count: number, now: number,
+): { state: QuotaState; decision: QuotaLease } {
+  const state: QuotaState = {
+    requests: refill(current.requests, policy.requests, now),
+    tokens:   refill(current.tokens,   policy.tokens,   now),
+  };
+  const granted = state.tokens.level > 0 ? Math.max(0, Math.min(count, Math.floor(state.requests.level))) : 0;
+  state.requests.level -= granted;
+  return { state, decision: { ...decide(state, policy, granted > 0), granted } };
+}
+
+/** Debit the tokens a finished completion used. */
+export function charge(
+  current: QuotaState, policy: QuotaPolicy, tokens: number, now: number,
+): { state: QuotaState; decision: QuotaDecision } {
+  const state: QuotaState = {
+    requests: refill(current.requests, policy.requests, now),
+    tokens:   refill(current.tokens,   policy.tokens,   now),
+  };
+  state.tokens.level -= tokens;
+  const allowed = state.requests.level >= 1 && state.tokens.level > 0;
+  return { state, decision: decide(state, policy, allowed) };
+}
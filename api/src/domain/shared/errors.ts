@@ -45,3 +45,11 @@ export class UnauthorizedError extends DomainError {
     this.name = 'UnauthorizedError';
   }
 }
+
+/** Thrown when a caller exceeds a capacity or rate limit. */
+export class TooManyRequestsError extends DomainError {
+  constructor(message = 'Too many requests') {
+    super(message);
+    this.name = 'TooManyRequestsError';
+  }
+}
@@ -0,0 +1,46 @@
+import { ValidationError } from './errors';
+
+/**
+ * Keyset pagination position: the (createdAt, id) of the last row returned.
+ *
+ * `createdAt` is kept as the database's own timestamp text so that the
+ * comparison on the next page is exact to the microsecond (a JS Date would
+ * truncate to milliseconds and skip rows).
+ */
+export interface Cursor {
+  createdAt: string;
+  id:        number;
+}
+
+export interface Page<T> {
+  items:      T[];
+  nextCursor: string | null;
+}
+
+export function encodeCursor(cursor: Cursor): string {
+  return btoa(`${cursor.createdAt}|${cursor.id}`)
+    .replace(/\+/g, '-').replace(/\//g, '_').replace(/=/g, '');
+}
+
+/** Decodes an opaque cursor string; throws ValidationError if it was tampered with. */
+export function decodeCursor(value: string): Cursor {
+  let raw: string;
+  try {
+    raw = atob(value.replace(/-/g, '+').replace(/_/g, '/'));
+  } catch {
+    throw new ValidationError('Invalid cursor');
+  }
+  const sep = raw.lastIndexOf('|');
+  const createdAt = raw.slice(0, sep);
+  const id = Number(raw.slice(sep + 1));
+  if (sep < 0 || !Number.isInteger(id) || !/^\d{4}-\d{2}-\d{2}[ T][\d:.+-]+$/.test(createdAt)) {
+    throw new ValidationError('Invalid cursor');
+  }
+  return { createdAt, id };
+}
+
+/** Clamp a caller-supplied page size into [1, max]. */
+export function clampLimit(value: number | undefined, fallback: number, max = 200): number {
+  if (value === undefined || !Number.isFinite(value)) return fallback;
+  return Math.min(max, Math.max(1, Math.floor(value)));
+}
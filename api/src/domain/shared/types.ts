@@ -70,9 +70,19 @@ export const ROLE_ORDER: TenantRole[] = [
   TenantRole.OWNER,
 ];
 
+/** Role → rank lookup, precomputed so role checks are a single property read. */
+export const ROLE_RANK: Readonly<Record<TenantRole, number>> = Object.freeze(
+  Object.fromEntries(ROLE_ORDER.map((r, i) => [r, i])) as Record<TenantRole, number>,
+);
+
+/** Rank of a role; unknown values (e.g. from a stale token) rank below VIEWER. */
+export function roleRank(role: TenantRole): number {
+  return ROLE_RANK[role] ?? -1;
+}
+
 /** Returns true if `actual` meets or exceeds `required`. */
 export function hasMinRole(actual: TenantRole, required: TenantRole): boolean {
-  return ROLE_ORDER.indexOf(actual) >= ROLE_ORDER.indexOf(required);
+  return roleRank(actual) >= roleRank(required);
 }
 
 // ---------------------------------------------------------------------------
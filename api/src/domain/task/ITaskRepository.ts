@@ -1,10 +1,26 @@
 import { Task } from './Task';
-import { TaskId, ProjectId } from '../shared/types';
+import { TaskId, ProjectId, TenantId, TaskStatus, AgentType } from '../shared/types';
+import { Cursor, Page } from '../shared/pagination';
+
+export interface TaskQueryOptions {
+  tenantId:           TenantId;
+  projectId?:         ProjectId;
+  statuses?:          TaskStatus[];
+  /** true: only archived, false: only active, undefined: both. */
+  archived?:          boolean;
+  assignedAgentType?: AgentType;
+  /** Only tasks created or modified after this instant. */
+  updatedSince?:      Date;
+  limit:              number;
+  cursor?:            Cursor;
+}
 
 export interface ITaskRepository {
-  findAll(projectId?: ProjectId): Promise<Task[]>;
-  findByProjectIds(ids: ProjectId[]): Promise<Task[]>;
+  /** Tenant-scoped listing in (createdAt DESC, id DESC) order. */
+  query(opts: TaskQueryOptions): Promise<Page<Task>>;
   findById(id: TaskId): Promise<Task | null>;
+  /** Tasks for the given ids in one query; missing ids are simply absent. */
+  findByIds(ids: TaskId[]): Promise<Task[]>;
   countByProject(projectId: ProjectId): Promise<number>;
   save(task: Task): Promise<Task>;
   update(task: Task): Promise<Task>;
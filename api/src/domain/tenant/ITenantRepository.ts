@@ -1,11 +1,20 @@
 import { Tenant } from './Tenant';
-import { TenantId } from '../shared/types';
+import { TenantId, TenantRole } from '../shared/types';
+
+/** A tenant a user is a member of, with their role there (null once deactivated). */
+export interface TenantMembership {
+  id:   TenantId;
+  name: string;
+  slug: string;
+  role: TenantRole | null;
+}
 
 export interface ITenantRepository {
   findAll(): Promise<Tenant[]>;
   findById(id: TenantId): Promise<Tenant | null>;
   findBySlug(slug: string): Promise<Tenant | null>;
-  findByUserId(userId: string): Promise<Tenant[]>;
+  /** Every tenant the user belongs to and their role in each, in one query. */
+  findMembershipsByUserId(userId: string): Promise<TenantMembership[]>;
   save(tenant: Tenant): Promise<Tenant>;
   update(tenant: Tenant): Promise<Tenant>;
   delete(id: TenantId): Promise<void>;
@@ -1,4 +1,8 @@
 import type { TenantRole } from './domain/shared/types';
+import type { TenantEventsDO } from './infrastructure/events/TenantEventsDO';
+import type { ModelHealthDO } from './infrastructure/llm/ModelHealthDO';
+import type { LlmQuotaDO } from './infrastructure/llm/LlmQuotaDO';
+import type { ExecutionDispatcherDO } from './infrastructure/dispatch/ExecutionDispatcherDO';
 
 /** Cloudflare Worker environment bindings for the API worker. */
 export interface Env {
@@ -12,6 +16,24 @@ export interface Env {
   JWT_SECRET: string;
   /** OpenRouter API key for coderClawLLM proxy.  Set via `wrangler secret put OPENROUTER_API_KEY`. */
   OPENROUTER_API_KEY: string;
+  /** Override the OpenRouter completions endpoint (local stubs, benchmarks). */
+  OPENROUTER_BASE_URL?: string;
+  /** Per-tenant execution event channel (Durable Object). */
+  TENANT_EVENTS: DurableObjectNamespace<TenantEventsDO>;
+  /** Per-tenant push dispatch of executions to connected claws (Durable Object).  Unbound = polling only. */
+  EXECUTION_DISPATCHER?: DurableObjectNamespace<ExecutionDispatcherDO>;
+  /** Shared per-model health for coderClawLLM routing (Durable Object). */
+  MODEL_HEALTH?: DurableObjectNamespace<ModelHealthDO>;
+  /** Per-caller coderClawLLM token buckets (Durable Object).  Unbound = no quota. */
+  LLM_QUOTA?: DurableObjectNamespace<LlmQuotaDO>;
+  /** Hedge LLM requests after this many ms without an answer.  Unset = off. */
+  LLM_HEDGE_AFTER_MS?: string;
+  /** Lifetime of opt-in cached LLM completions in seconds (default 3600). */
+  LLM_CACHE_TTL_SECONDS?: string;
+  /** Fraction of requests traced with spans + Server-Timing, 0..1 (default 0). */
+  TRACE_SAMPLE_RATE?: string;
+  /** Bearer token for /api/metrics.  Set via `wrangler secret put METRICS_TOKEN`; unset = disabled. */
+  METRICS_TOKEN?: string;
 }
 
 /** Variables injected into Hono context by the auth middleware. */
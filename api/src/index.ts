@@ -1,8 +1,9 @@
 /**
  * Cloudflare Worker entry point – api.coderclaw.ai
  *
- * All infrastructure dependencies are wired per-request via a factory so
- * each Worker invocation gets its own short-lived Hyperdrive connection.
+ * All infrastructure dependencies are wired once per isolate (per `env`)
+ * and reused across requests.  Everything built here is stateless or holds
+ * isolate-safe caches; the Neon HTTP driver opens no long-lived connection.
  *
  * Layer order (outermost → innermost):
  *   Presentation → Application → Domain ← Infrastructure
@@ -17,10 +18,17 @@ import { ProjectRepository }   from './infrastructure/repositories/ProjectReposi
 import { TaskRepository }       from './infrastructure/repositories/TaskRepository';
 import { TenantRepository }     from './infrastructure/repositories/TenantRepository';
 import { UserRepository }       from './infrastructure/repositories/UserRepository';
+import { RefreshTokenRepository } from './infrastructure/repositories/RefreshTokenRepository';
 import { AgentRepository }      from './infrastructure/repositories/AgentRepository';
 import { SkillRepository }       from './infrastructure/repositories/SkillRepository';
 import { ExecutionRepository }  from './infrastructure/repositories/ExecutionRepository';
 import { AuditRepository }      from './infrastructure/repositories/AuditRepository';
+import { ExecutionEventPublisher } from './infrastructure/events/ExecutionEventPublisher';
+import { ExecutionDispatcher } from './infrastructure/dispatch/ExecutionDispatcher';
+import { BufferedAuditRepository } from './infrastructure/audit/BufferedAuditRepository';
+import { DeferredWork }            from './infrastructure/background/DeferredWork';
+import { ClawConnectionCache }     from './infrastructure/relay/ClawConnectionCache';
+import { Tracer, traceMethods }    from './infrastructure/tracing/Tracer';
 
 // Application services
 import { ProjectService }  from './application/project/ProjectService';
@@ -43,50 +51,75 @@ import { createMarketplaceRoutes } from './presentation/routes/marketplaceRoutes
 import { createClawRoutes }        from './presentation/routes/clawRoutes';
 import { createSkillAssignmentRoutes } from './presentation/routes/skillAssignmentRoutes';
 import { createLlmRoutes }          from './presentation/routes/llmRoutes';
+import { createMetricsRoutes }      from './presentation/routes/metricsRoutes';
 
 // Middleware
 import { corsMiddleware } from './presentation/middleware/cors';
 import { errorHandler }   from './presentation/middleware/errorHandler';
+import { flushAuditAfterResponse } from './presentation/middleware/auditFlush';
+import { settleDeferredWork }      from './presentation/middleware/deferredWork';
+import { traceRequests }  from './presentation/middleware/tracing';
 
 // Durable Objects (must be re-exported so the Workers runtime can instantiate them)
 export { ClawRelayDO } from './infrastructure/relay/ClawRelayDO';
+export { TenantEventsDO } from './infrastructure/events/TenantEventsDO';
+export { ModelHealthDO } from './infrastructure/llm/ModelHealthDO';
+export { LlmQuotaDO } from './infrastructure/llm/LlmQuotaDO';
+export { ExecutionDispatcherDO } from './infrastructure/dispatch/ExecutionDispatcherDO';
 
 // ---------------------------------------------------------------------------
-// Composition root: build the full Hono app for a single request,
-// injecting the concrete infrastructure implementations.
+// Composition root: build the full Hono app for an `env`, injecting the
+// concrete infrastructure implementations.
 // ---------------------------------------------------------------------------
 
 function buildApp(env: Env): Hono<HonoEnv> {
-  const db = buildDatabase(env);
+  // Route / query histograms for this isolate; spans on sampled requests
+  const tracer = new Tracer(Number(env.TRACE_SAMPLE_RATE ?? '0') || 0);
+  const db = buildDatabase(env, tracer);
 
   // --- Infrastructure ---
   const projectRepo   = new ProjectRepository(db);
   const taskRepo      = new TaskRepository(db);
   const tenantRepo    = new TenantRepository(db);
   const userRepo      = new UserRepository(db);
+  const refreshTokenRepo = new RefreshTokenRepository(db);
   const agentRepo     = new AgentRepository(db);
   const skillRepo      = new SkillRepository(db);
   const executionRepo = new ExecutionRepository(db);
   const auditRepo     = new AuditRepository(db);
+  // Audited writes go through a write-behind buffer flushed via waitUntil
+  const auditSink     = new BufferedAuditRepository(auditRepo);
+  const eventPublisher = new ExecutionEventPublisher(env.TENANT_EVENTS);
+  const dispatcher     = new ExecutionDispatcher(env.EXECUTION_DISPATCHER);
+  // Event pushes and similar side effects, settled via waitUntil
+  const deferred       = new DeferredWork();
+  // Claw key hashes, shared by the relay upstream and the LLM proxy
+  const clawConnections = new ClawConnectionCache();
 
   // --- Application ---
-  const projectService  = new ProjectService(projectRepo);
-  const taskService     = new TaskService(taskRepo, projectRepo);
-  const tenantService   = new TenantService(tenantRepo);
-  const authService     = new AuthService(userRepo, tenantRepo, auditRepo, env.JWT_SECRET);
-  const agentService    = new AgentService(agentRepo, skillRepo, auditRepo);
-  const runtimeService  = new RuntimeService(executionRepo, taskRepo, agentRepo, auditRepo);
-  const auditService    = new AuditService(auditRepo);
+  // Each service method is a span on sampled requests
+  const projectService  = traceMethods('ProjectService', new ProjectService(projectRepo));
+  const taskService     = traceMethods('TaskService', new TaskService(taskRepo, projectRepo));
+  const tenantService   = traceMethods('TenantService', new TenantService(tenantRepo));
+  const authService     = traceMethods('AuthService',
+    new AuthService(userRepo, tenantRepo, auditSink, refreshTokenRepo, env.JWT_SECRET));
+  const agentService    = traceMethods('AgentService', new AgentService(agentRepo, skillRepo, auditSink));
+  const runtimeService  = traceMethods('RuntimeService',
+    new RuntimeService(executionRepo, taskRepo, agentRepo, auditSink, eventPublisher, dispatcher, deferred.defer));
+  const auditService    = traceMethods('AuditService', new AuditService(auditRepo));
 
   // --- Presentation ---
   const app = new Hono<HonoEnv>();
 
+  app.use('*', traceRequests(tracer));
   app.use('*', corsMiddleware);
+  app.use('*', flushAuditAfterResponse(auditSink));
+  app.use('*', settleDeferredWork(deferred));
 
   app.get('/health', (c) => c.json({ status: 'ok', worker: 'api.coderclaw.ai' }));
 
   // coderClawLLM — OpenAI-compatible LLM proxy (no JWT, keyed by OPENROUTER_API_KEY)
-  app.route('/llm', createLlmRoutes());
+  app.route('/llm', createLlmRoutes(db, clawConnections));
 
   // Marketplace (no JWT required for read, required for write)
   app.route('/marketplace', createMarketplaceRoutes(db));
@@ -95,7 +128,7 @@ function buildApp(env: Env): Hono<HonoEnv> {
   app.route('/api/auth',    createAuthRoutes(authService, db));
 
   // CoderClaw instances + skill assignments (tenant JWT inside each router)
-  app.route('/api/claws',            createClawRoutes(db));
+  app.route('/api/claws',            createClawRoutes(db, clawConnections));
   app.route('/api/skill-assignments', createSkillAssignmentRoutes(db));
 
   // Protected endpoints (JWT injected by authMiddleware inside each router)
@@ -107,6 +140,9 @@ function buildApp(env: Env): Hono<HonoEnv> {
   app.route('/api/runtime',  createRuntimeRoutes(runtimeService));
   app.route('/api/audit',    createAuditRoutes(auditService));
 
+  // Operator endpoints (METRICS_TOKEN bearer)
+  app.route('/api/metrics',  createMetricsRoutes(tracer));
+
   app.onError(errorHandler);
   app.notFound((c) => c.json({ error: 'Not found' }, 404));
 
@@ -117,8 +153,25 @@ function buildApp(env: Env): Hono<HonoEnv> {
 // Worker export
 // ---------------------------------------------------------------------------
 
+/**
+ * Apps memoized per isolate, keyed on the `env` object identity.  The
+ * runtime hands the same `env` to every request in an isolate, so the
+ * composition root runs once instead of on every fetch; a new `env`
+ * (e.g. after a secret change) gets a fresh app.
+ */
+const apps = new WeakMap<Env, Hono<HonoEnv>>();
+
+function getApp(env: Env): Hono<HonoEnv> {
+  let app = apps.get(env);
+  if (!app) {
+    app = buildApp(env);
+    apps.set(env, app);
+  }
+  return app;
+}
+
 export default {
   fetch(request: Request, env: Env, ctx: ExecutionContext): Response | Promise<Response> {
-    return buildApp(env).fetch(request, env, ctx);
+    return getApp(env).fetch(request, env, ctx);
   },
 } satisfies ExportedHandler<Env>;
@@ -0,0 +1,103 @@
+import { IAuditRepository, AuditQueryOptions } from '../../domain/audit/IAuditRepository';
+import { AuditEvent } from '../../domain/audit/AuditEvent';
+import { Page } from '../../domain/shared/pagination';
+
+export interface AuditBufferOptions {
+  /** Flush as soon as this many events are buffered. */
+  maxBatchSize: number;
+  /** Longest an event may wait before `drain()` flushes it. */
+  maxDelayMs:   number;
+}
+
+export const DEFAULT_AUDIT_BUFFER_OPTIONS: AuditBufferOptions = {
+  maxBatchSize: 50,
+  maxDelayMs:   250,
+};
+
+/**
+ * Write-behind decorator for IAuditRepository.
+ *
+ * `save()` only appends to an in-memory buffer, so audited use cases no longer
+ * wait on an INSERT … RETURNING round trip.  Buffered events are written as a
+ * single multi-row INSERT when the batch fills up or when `drain()` runs —
+ * the composition root calls it through `ctx.waitUntil` once the response
+ * has been sent.
+ *
+ * Events returned from `save()` are not yet persisted and keep id 0.
+ * Reads go straight to the wrapped repository and may briefly miss events
+ * still sitting in the buffer.
+ */
+export class BufferedAuditRepository implements IAuditRepository {
+  private buffer: AuditEvent[] = [];
+  private oldestAt = 0;
+  private inflight: Promise<void> | null = null;
+
+  constructor(
+    private readonly inner: IAuditRepository,
+    private readonly opts:  AuditBufferOptions = DEFAULT_AUDIT_BUFFER_OPTIONS,
+  ) {}
+
+  async save(event: AuditEvent): Promise<AuditEvent> {
+    this.enqueue(event);
+    return event;
+  }
+
+  async saveMany(events: AuditEvent[]): Promise<void> {
+    for (const event of events) this.enqueue(event);
+  }
+
+  query(opts: AuditQueryOptions): Promise<Page<AuditEvent>> {
+    return this.inner.query(opts);
+  }
+
+  /** Number of events waiting to be written. */
+  get pending(): number {
+    return this.buffer.length;
+  }
+
+  /**
+   * True while events are buffered or a batch is being written — including a
+   * size-triggered flush started by `save()`, which only `drain()` keeps alive
+   * past the response.
+   */
+  get busy(): boolean {
+    return this.buffer.length > 0 || this.inflight !== null;
+  }
+
+  /**
+   * Persist everything buffered so far.  If the batch is not full yet, waits
+   * until the oldest event reaches `maxDelayMs` so concurrent requests in
+   * the same isolate can share one INSERT.  Intended for `ctx.waitUntil`.
+   */
+  async drain(): Promise<void> {
+    if (this.buffer.length === 0) return this.inflight ?? undefined;
+    const waitMs = this.opts.maxDelayMs - (Date.now() - this.oldestAt);
+    if (this.buffer.length < this.opts.maxBatchSize && waitMs > 0) {
+      await new Promise((resolve) => setTimeout(resolve, waitMs));
+    }
+    await this.flush();
+  }
+
+  /** Write the current buffer immediately (after any in-flight batch). */
+  async flush(): Promise<void> {
+    while (this.inflight) await this.inflight;
+    if (this.buffer.length === 0) return;
+
+    const batch = this.buffer;
+    this.buffer = [];
+    this.inflight = this.inner.saveMany(batch)
+      .catch((err) => console.error(`[audit] dropped ${batch.length} event(s)`, err))
+      .finally(() => { this.inflight = null; });
+    await this.inflight;
+  }
+
+  // ---------------------------------------------------------------------------
+  // Helpers
+  // ---------------------------------------------------------------------------
+
+  private enqueue(event: AuditEvent) {
+    if (this.buffer.length === 0) this.oldestAt = Date.now();
+    this.buffer.push(event);
+    if (this.buffer.length >= this.opts.maxBatchSize) void this.flush();
+  }
+}
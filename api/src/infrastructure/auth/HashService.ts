@@ -1,35 +1,54 @@
 /**
- * Crypto utilities using the Web Crypto API (SubtleCrypto).
+ * Credential hashing and verification using the Web Crypto API (SubtleCrypto).
  *
  * These work natively in Cloudflare Workers without any npm dependencies.
+ *
+ * Two tiers:
+ *  - Random machine secrets (API keys, refresh tokens) carry 128+ bits of
+ *    entropy, so a single SHA-256 is enough.  The digest doubles as an
+ *    indexed lookup key: verification is one query, no key derivation.
+ *  - Human passwords go through 100k-iteration PBKDF2 with a per-user salt.
+ *    That cost is paid at login only; sessions are renewed with refresh tokens.
  */
 
-/** SHA-256 hex digest of a string – used to store API keys. */
+function toHex(bytes: Uint8Array): string {
+  return Array.from(bytes).map((b) => b.toString(16).padStart(2, '0')).join('');
+}
+
+function fromHex(hex: string): Uint8Array {
+  return new Uint8Array((hex.match(/../g) ?? []).map((h) => parseInt(h, 16)));
+}
+
+/** Constant-time string comparison (length is not secret). */
+function timingSafeEqual(a: string, b: string): boolean {
+  if (a.length !== b.length) return false;
+  let diff = 0;
+  for (let i = 0; i < a.length; i++) {
+    diff |= a.charCodeAt(i) ^ b.charCodeAt(i);
+  }
+  return diff === 0;
+}
+
+/** SHA-256 hex digest of a string – used to store API keys and refresh tokens. */
 export async function hashSecret(value: string): Promise<string> {
   const data = new TextEncoder().encode(value);
   const hash = await crypto.subtle.digest('SHA-256', data);
-  return Array.from(new Uint8Array(hash))
-    .map((b) => b.toString(16).padStart(2, '0'))
-    .join('');
+  return toHex(new Uint8Array(hash));
 }
 
 /** Constant-time comparison of a plaintext secret against a stored SHA-256 hex hash. */
 export async function verifySecret(value: string, storedHash: string): Promise<boolean> {
-  const computed = await hashSecret(value);
-  if (computed.length !== storedHash.length) return false;
-  // constant-time comparison
-  let diff = 0;
-  for (let i = 0; i < computed.length; i++) {
-    diff |= computed.charCodeAt(i) ^ storedHash.charCodeAt(i);
-  }
-  return diff === 0;
+  return timingSafeEqual(await hashSecret(value), storedHash);
 }
 
 /** Generates a new random API key in the format `clk_<32 hex chars>`. */
 export function generateApiKey(): string {
-  const bytes = crypto.getRandomValues(new Uint8Array(16));
-  const hex   = Array.from(bytes).map((b) => b.toString(16).padStart(2, '0')).join('');
-  return `clk_${hex}`;
+  return `clk_${toHex(crypto.getRandomValues(new Uint8Array(16)))}`;
+}
+
+/** Generates a new opaque refresh token in the format `clr_<64 hex chars>`. */
+export function generateRefreshToken(): string {
+  return `clr_${toHex(crypto.getRandomValues(new Uint8Array(32)))}`;
 }
 
 // ---------------------------------------------------------------------------
@@ -40,13 +59,7 @@ const ITERATIONS = 100_000;
 const HASH_ALG   = 'SHA-256';
 const KEY_LEN    = 256; // bits
 
-/**
- * Hash a plaintext password with PBKDF2.
- * Returns `<saltHex>:<derivedKeyHex>` (safe to store in the DB).
- */
-export async function hashPassword(password: string): Promise<string> {
-  const salt = crypto.getRandomValues(new Uint8Array(16));
-
+async function derive(password: string, salt: Uint8Array): Promise<string> {
   const keyMaterial = await crypto.subtle.importKey(
     'raw',
     new TextEncoder().encode(password),
@@ -60,11 +73,16 @@ export async function hashPassword(password: string): Promise<string> {
     keyMaterial,
     KEY_LEN,
   );
+  return toHex(new Uint8Array(derived));
+}
 
-  const toHex = (buf: Uint8Array) =>
-    Array.from(buf).map((b) => b.toString(16).padStart(2, '0')).join('');
-
-  return `${toHex(salt)}:${toHex(new Uint8Array(derived))}`;
+/**
+ * Hash a plaintext password with PBKDF2.
+ * Returns `<saltHex>:<derivedKeyHex>` (safe to store in the DB).
+ */
+export async function hashPassword(password: string): Promise<string> {
+  const salt = crypto.getRandomValues(new Uint8Array(16));
+  return `${toHex(salt)}:${await derive(password, salt)}`;
 }
 
 /**
@@ -76,29 +94,5 @@ export async function verifyPassword(
 ): Promise<boolean> {
   const [saltHex, hashHex] = stored.split(':');
   if (!saltHex || !hashHex) return false;
-
-  const fromHex = (hex: string) =>
-    new Uint8Array(hex.match(/../g)!.map((h) => parseInt(h, 16)));
-
-  const salt = fromHex(saltHex);
-
-  const keyMaterial = await crypto.subtle.importKey(
-    'raw',
-    new TextEncoder().encode(password),
-    'PBKDF2',
-    false,
-    ['deriveBits'],
-  );
-
-  const derived = await crypto.subtle.deriveBits(
-    { name: 'PBKDF2', salt, iterations: ITERATIONS, hash: HASH_ALG },
-    keyMaterial,
-    KEY_LEN,
-  );
-
-  const derivedHex = Array.from(new Uint8Array(derived))
-    .map((b) => b.toString(16).padStart(2, '0'))
-    .join('');
-
-  return derivedHex === hashHex;
+  return timingSafeEqual(await derive(password, fromHex(saltHex)), hashHex);
 }
@@ -1,4 +1,5 @@
 import { TenantRole } from '../../domain/shared/types';
+import { LruCache } from '../cache/LruCache';
 
 // ---------------------------------------------------------------------------
 // Payload
@@ -29,14 +30,60 @@ function b64urlToStr(s: string): string {
   return atob(s.replace(/-/g, '+').replace(/_/g, '/'));
 }
 
-async function importKey(secret: string): Promise<CryptoKey> {
-  return crypto.subtle.importKey(
-    'raw',
-    new TextEncoder().encode(secret),
-    { name: 'HMAC', hash: 'SHA-256' },
-    false,
-    ['sign', 'verify'],
+// ---------------------------------------------------------------------------
+// Per-isolate caches
+// ---------------------------------------------------------------------------
+
+/** Imported HMAC keys by secret – importKey is comparatively expensive. */
+const keyCache = new Map<string, Promise<CryptoKey>>();
+
+/**
+ * Verified tokens → decoded payload.  Entries expire with the token's own
+ * `exp`, so a cached hit never outlives what a fresh verification would allow.
+ * Keyed by secret + token so a rotated secret never matches old entries.
+ * Expired tokens are swept before live ones are evicted, so the cache holds
+ * (up to) the isolate's live sessions.
+ */
+const VERIFIED_CACHE_SIZE = 5_000;
+const verifiedTenantTokens = new LruCache<string, JwtPayload>(VERIFIED_CACHE_SIZE);
+const verifiedWebTokens    = new LruCache<string, WebJwtPayload>(VERIFIED_CACHE_SIZE);
+
+function importKey(secret: string): Promise<CryptoKey> {
+  let key = keyCache.get(secret);
+  if (!key) {
+    key = crypto.subtle.importKey(
+      'raw',
+      new TextEncoder().encode(secret),
+      { name: 'HMAC', hash: 'SHA-256' },
+      false,
+      ['sign', 'verify'],
+    );
+    key.catch(() => keyCache.delete(secret));
+    keyCache.set(secret, key);
+  }
+  return key;
+}
+
+/** Checks the HS256 signature of `token` and returns its decoded payload. */
+async function verifySignature<T extends { exp: number }>(token: string, secret: string): Promise<T> {
+  const parts = token.split('.');
+  if (parts.length !== 3) throw new Error('Malformed token');
+
+  const [header, body, sig] = parts as [string, string, string];
+  const input = `${header}.${body}`;
+
+  const key = await importKey(secret);
+  const sigBytes = Uint8Array.from(
+    atob(sig.replace(/-/g, '+').replace(/_/g, '/')),
+    (c) => c.charCodeAt(0),
   );
+  const valid = await crypto.subtle.verify('HMAC', key, sigBytes, new TextEncoder().encode(input));
+  if (!valid) throw new Error('Invalid token signature');
+
+  const payload: T = JSON.parse(b64urlToStr(body));
+  if (payload.exp < Math.floor(Date.now() / 1000)) throw new Error('Token expired');
+
+  return payload;
 }
 
 // ---------------------------------------------------------------------------
@@ -68,32 +115,15 @@ export async function signJwt(
 /**
  * Verifies and decodes a JWT.
  * Throws if the signature is invalid or the token is expired.
+ * Recently verified tokens are served from a per-isolate cache until `exp`.
  */
 export async function verifyJwt(token: string, secret: string): Promise<JwtPayload> {
-  const parts = token.split('.');
-  if (parts.length !== 3) throw new Error('Malformed token');
-
-  const header = parts[0]!;
-  const body   = parts[1]!;
-  const sig    = parts[2]!;
-  const input = `${header}.${body}`;
-
-  const key = await importKey(secret);
-  const sigBytes = Uint8Array.from(
-    atob(sig.replace(/-/g, '+').replace(/_/g, '/')),
-    (c) => c.charCodeAt(0),
-  );
-  const valid = await crypto.subtle.verify(
-    'HMAC',
-    key,
-    sigBytes,
-    new TextEncoder().encode(input),
-  );
-  if (!valid) throw new Error('Invalid token signature');
-
-  const payload: JwtPayload = JSON.parse(b64urlToStr(body));
-  if (payload.exp < Math.floor(Date.now() / 1000)) throw new Error('Token expired');
+  const cacheKey = `${secret}\n${token}`;
+  const cached = verifiedTenantTokens.get(cacheKey);
+  if (cached) return cached;
 
+  const payload = await verifySignature<JwtPayload>(token, secret);
+  verifiedTenantTokens.set(cacheKey, payload, payload.exp * 1000);
   return payload;
 }
 
@@ -128,22 +158,11 @@ export async function signWebJwt(
 }
 
 export async function verifyWebJwt(token: string, secret: string): Promise<WebJwtPayload> {
-  const parts = token.split('.');
-  if (parts.length !== 3) throw new Error('Malformed token');
-
-  const [header, body, sig] = parts as [string, string, string];
-  const input = `${header}.${body}`;
-
-  const key = await importKey(secret);
-  const sigBytes = Uint8Array.from(
-    atob(sig.replace(/-/g, '+').replace(/_/g, '/')),
-    (c) => c.charCodeAt(0),
-  );
-  const valid = await crypto.subtle.verify('HMAC', key, sigBytes, new TextEncoder().encode(input));
-  if (!valid) throw new Error('Invalid token signature');
-
-  const payload: WebJwtPayload = JSON.parse(b64urlToStr(body));
-  if (payload.exp < Math.floor(Date.now() / 1000)) throw new Error('Token expired');
+  const cacheKey = `${secret}\n${token}`;
+  const cached = verifiedWebTokens.get(cacheKey);
+  if (cached) return cached;
 
+  const payload = await verifySignature<WebJwtPayload>(token, secret);
+  verifiedWebTokens.set(cacheKey, payload, payload.exp * 1000);
   return payload;
 }
@@ -0,0 +1,29 @@
+/**
+ * Side effects started during a request that its response should not wait on.
+ *
+ * `defer()` tracks a promise that is already running; the composition root
+ * hands `drain()` to `ctx.waitUntil` once the response has been sent, so the
+ * runtime keeps the isolate alive until the work settles.  Like the audit
+ * buffer, one instance is shared by every request in the isolate.
+ */
+export class DeferredWork {
+  private readonly pending = new Set<Promise<void>>();
+
+  /** Track `work`; a rejection is logged under `label` and never rethrown. */
+  readonly defer = (label: string, work: Promise<unknown>): void => {
+    const settled: Promise<void> = work
+      .then(() => undefined, (err) => console.error(`[${label}] deferred work failed`, err))
+      .finally(() => this.pending.delete(settled));
+    this.pending.add(settled);
+  };
+
+  /** True while deferred work is still running. */
+  get busy(): boolean {
+    return this.pending.size > 0;
+  }
+
+  /** Settles once everything deferred so far has.  Intended for `ctx.waitUntil`. */
+  async drain(): Promise<void> {
+    await Promise.all(this.pending);
+  }
+}
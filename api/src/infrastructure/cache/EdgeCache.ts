@@ -0,0 +1,70 @@
+/**
+ * Versioned wrapper around the Workers Cache API (`caches.default`).
+ *
+ * Every entry key embeds the scope's current version, and the version itself
+ * lives in the same colo cache, so `bump()` invalidates everything in the
+ * scope for every isolate in the colo at once.  Other colos converge when
+ * their entries reach `ttlSeconds`.
+ */
+const CACHE_ORIGIN = 'https://edge-cache.coderclaw.internal';
+
+/** The version marker outlives entries by a wide margin. */
+const VERSION_TTL_SECONDS = 86_400;
+
+export class EdgeCache {
+  constructor(
+    private readonly scope: string,
+    readonly ttlSeconds:    number,
+  ) {}
+
+  /** Cache key for a request URL under the scope's current version. */
+  async keyFor(requestUrl: string): Promise<Request> {
+    const version = await this.version();
+    const url     = new URL(requestUrl);
+    url.searchParams.sort();
+    return new Request(`${CACHE_ORIGIN}/${this.scope}/${version}${url.pathname}${url.search}`);
+  }
+
+  match(key: Request): Promise<Response | undefined> {
+    return caches.default.match(key);
+  }
+
+  put(key: Request, response: Response): Promise<void> {
+    response.headers.set('Cache-Control', `public, max-age=${this.ttlSeconds}`);
+    return caches.default.put(key, response);
+  }
+
+  /**
+   * Drop the cached response for one URL (this colo; others converge when
+   * their entry reaches `ttlSeconds`).
+   */
+  async evict(requestUrl: string): Promise<void> {
+    await caches.default.delete(await this.keyFor(requestUrl));
+  }
+
+  /** Invalidate every entry in the scope. */
+  async bump(): Promise<void> {
+    await this.writeVersion(crypto.randomUUID());
+  }
+
+  private async version(): Promise<string> {
+    const hit = await caches.default.match(this.versionKey());
+    if (hit) return hit.text();
+
+    // Marker evicted: start a fresh version rather than resurrecting old keys
+    const version = crypto.randomUUID();
+    await this.writeVersion(version);
+    return version;
+  }
+
+  private writeVersion(version: string): Promise<void> {
+    return caches.default.put(
+      this.versionKey(),
+      new Response(version, { headers: { 'Cache-Control': `public, max-age=${VERSION_TTL_SECONDS}` } }),
+    );
+  }
+
+  private versionKey(): Request {
+    return new Request(`${CACHE_ORIGIN}/${this.scope}/__version`);
+  }
+}
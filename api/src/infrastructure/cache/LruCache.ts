@@ -0,0 +1,75 @@
+/**
+ * Small per-isolate LRU map with optional per-entry expiry.
+ *
+ * Relies on Map's insertion order: a hit re-inserts the key so the first key
+ * is always the least recently used one.  Nothing here is shared between
+ * isolates — use it only for data that is safe to recompute.
+ *
+ * Expired entries are dropped lazily on `get`, and swept in one pass when
+ * the cache is full before any live entry is evicted, so short-lived entries
+ * (e.g. verified tokens) never crowd out live ones.  The sweep is skipped
+ * until the earliest known expiry has passed.
+ */
+export class LruCache<K, V> {
+  private readonly entries = new Map<K, { value: V; expiresAt: number }>();
+  /** No entry expires before this (epoch ms); a lower bound, not exact. */
+  private nextExpiry = Number.POSITIVE_INFINITY;
+
+  constructor(private readonly maxEntries: number) {}
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key);
+      return undefined;
+    }
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  /** Store `value` until `expiresAt` (epoch ms); defaults to no expiry. */
+  set(key: K, value: V, expiresAt = Number.POSITIVE_INFINITY): void {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt });
+    if (expiresAt < this.nextExpiry) this.nextExpiry = expiresAt;
+    if (this.entries.size > this.maxEntries) {
+      this.prune();
+      if (this.entries.size > this.maxEntries) {
+        const oldest = this.entries.keys().next();
+        if (!oldest.done) this.entries.delete(oldest.value);
+      }
+    }
+  }
+
+  /** Drop every expired entry; a no-op until the earliest expiry has passed. */
+  prune(now = Date.now()): number {
+    if (now < this.nextExpiry) return 0;
+    let removed = 0;
+    let next    = Number.POSITIVE_INFINITY;
+    for (const [key, entry] of this.entries) {
+      if (entry.expiresAt <= now) {
+        this.entries.delete(key);
+        removed++;
+      } else if (entry.expiresAt < next) {
+        next = entry.expiresAt;
+      }
+    }
+    this.nextExpiry = next;
+    return removed;
+  }
+
+  delete(key: K): boolean {
+    return this.entries.delete(key);
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.nextExpiry = Number.POSITIVE_INFINITY;
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+}
@@ -0,0 +1,110 @@
+import { sql } from 'drizzle-orm';
+import type { Db } from '../database/connection';
+import { llmUsage } from '../database/schema';
+
+export interface LlmUsageOptions {
+  /** Longest a usage delta may wait before `drain()` flushes it. */
+  flushIntervalMs: number;
+  /** Flush as soon as this many (claw, hour) buckets have pending deltas. */
+  maxPendingBuckets: number;
+}
+
+export const DEFAULT_LLM_USAGE_OPTIONS: LlmUsageOptions = {
+  flushIntervalMs:   2_000,
+  maxPendingBuckets: 100,
+};
+
+export interface LlmUsageDelta {
+  requests:         number;
+  cachedRequests:   number;
+  promptTokens:     number;
+  completionTokens: number;
+}
+
+interface PendingBucket extends LlmUsageDelta {
+  tenantId:    number;
+  clawId:      number;
+  bucketStart: Date;
+}
+
+const HOUR_MS = 3_600_000;
+
+/**
+ * Write-coalescing accumulator for the hourly llm_usage rollup.
+ *
+ * Request and token counts are summed per (claw, hour) in isolate memory and
+ * upserted as one multi-row `INSERT … ON CONFLICT DO UPDATE`, so metering a
+ * busy claw costs one row write per flush.  Same best-effort guarantees as
+ * SkillCounterBuffer: failed flushes are merged back and retried, anything
+ * buffered when the isolate is evicted is lost.
+ */
+export class LlmUsageBuffer {
+  private pending = new Map<string, PendingBucket>();
+  private oldestAt = 0;
+  private inflight: Promise<void> | null = null;
+
+  constructor(
+    private readonly db:   Db,
+    private readonly opts: LlmUsageOptions = DEFAULT_LLM_USAGE_OPTIONS,
+  ) {}
+
+  add(tenantId: number, clawId: number, delta: Partial<LlmUsageDelta>, at = Date.now()): void {
+    const bucketStart = new Date(Math.floor(at / HOUR_MS) * HOUR_MS);
+    const key = `${clawId}:${bucketStart.getTime()}`;
+    if (this.pending.size === 0) this.oldestAt = Date.now();
+
+    const bucket = this.pending.get(key) ?? {
+      tenantId, clawId, bucketStart, requests: 0, cachedRequests: 0, promptTokens: 0, completionTokens: 0,
+    };
+    bucket.requests         += delta.requests ?? 0;
+    bucket.cachedRequests   += delta.cachedRequests ?? 0;
+    bucket.promptTokens     += delta.promptTokens ?? 0;
+    bucket.completionTokens += delta.completionTokens ?? 0;
+    this.pending.set(key, bucket);
+
+    if (this.pending.size >= this.opts.maxPendingBuckets) void this.flush();
+  }
+
+  /**
+   * Persist everything buffered so far, waiting until the oldest delta is
+   * `flushIntervalMs` old so concurrent requests share one upsert.
+   * Intended for `ctx.waitUntil`.
+   */
+  async drain(): Promise<void> {
+    if (this.pending.size === 0) return this.inflight ?? undefined;
+    const waitMs = this.opts.flushIntervalMs - (Date.now() - this.oldestAt);
+    if (waitMs > 0) await new Promise((resolve) => setTimeout(resolve, waitMs));
+    await this.flush();
+  }
+
+  /** Write the current deltas immediately (after any in-flight flush). */
+  async flush(): Promise<void> {
+    while (this.inflight) await this.inflight;
+    if (this.pending.size === 0) return;
+
+    const batch  = this.pending;
+    this.pending = new Map();
+    this.inflight = this.write([...batch.values()])
+      .catch((err) => {
+        console.error(`[usage] flush of ${batch.size} bucket(s) failed, retrying later`, err);
+        for (const b of batch.values()) this.add(b.tenantId, b.clawId, b, b.bucketStart.getTime());
+      })
+      .finally(() => { this.inflight = null; });
+    await this.inflight;
+  }
+
+  private async write(batch: PendingBucket[]): Promise<void> {
+    await this.db
+      .insert(llmUsage)
+      .values(batch)
+      .onConflictDoUpdate({
+        target: [llmUsage.clawId, llmUsage.bucketStart],
+        set: {
+          requests:         sql`${llmUsage.requests} + excluded.requests`,
+          cachedRequests:   sql`${llmUsage.cachedRequests} + excluded.cached_requests`,
+          promptTokens:     sql`${llmUsage.promptTokens} + excluded.prompt_tokens`,
+          completionTokens: sql`${llmUsage.completionTokens} + excluded.completion_tokens`,
+        },
+      });
+  }
+}
@@ -0,0 +1,117 @@
+import { sql } from 'drizzle-orm';
+import type { Db } from '../database/connection';
+import { marketplaceSkills } from '../database/schema';
+
+export interface SkillCounterOptions {
+  /** Longest an increment may wait before `drain()` flushes it. */
+  flushIntervalMs: number;
+  /** Flush as soon as this many distinct skills have pending deltas. */
+  maxPendingSkills: number;
+}
+
+export const DEFAULT_SKILL_COUNTER_OPTIONS: SkillCounterOptions = {
+  flushIntervalMs:  2_000,
+  maxPendingSkills: 100,
+};
+
+interface CounterDelta {
+  downloads: number;
+  likes:     number;
+}
+
+/**
+ * Write-coalescing accumulator for the marketplace_skills download and like
+ * counters.
+ *
+ * Increments are summed per skill in isolate memory and written as a single
+ * `UPDATE … FROM (VALUES …)`, so a burst of N views on a popular skill costs
+ * one row update per flush instead of N contending ones.  Counter reads are
+ * eventually consistent: a delta is visible once its flush commits.
+ *
+ * Deltas whose flush fails are merged back and retried on the next flush.
+ * Anything still buffered when the isolate is evicted is lost — the same
+ * best-effort guarantee the previous fire-and-forget UPDATE gave.
+ */
+export class SkillCounterBuffer {
+  private deltas = new Map<string, CounterDelta>();
+  private oldestAt = 0;
+  private inflight: Promise<void> | null = null;
+
+  constructor(
+    private readonly db:   Db,
+    private readonly opts: SkillCounterOptions = DEFAULT_SKILL_COUNTER_OPTIONS,
+  ) {}
+
+  addDownload(slug: string): void {
+    this.add(slug, { downloads: 1, likes: 0 });
+  }
+
+  addLike(slug: string, delta: 1 | -1): void {
+    this.add(slug, { downloads: 0, likes: delta });
+  }
+
+  /** Number of skills with deltas waiting to be written. */
+  get pending(): number {
+    return this.deltas.size;
+  }
+
+  /**
+   * Persist everything buffered so far, waiting until the oldest delta is
+   * `flushIntervalMs` old so concurrent requests share one UPDATE.
+   * Intended for `ctx.waitUntil`.
+   */
+  async drain(): Promise<void> {
+    if (this.deltas.size === 0) return this.inflight ?? undefined;
+    const waitMs = this.opts.flushIntervalMs - (Date.now() - this.oldestAt);
+    if (waitMs > 0) await new Promise((resolve) => setTimeout(resolve, waitMs));
+    await this.flush();
+  }
+
+  /** Write the current deltas immediately (after any in-flight flush). */
+  async flush(): Promise<void> {
+    while (this.inflight) await this.inflight;
+    if (this.deltas.size === 0) return;
+
+    const batch = this.deltas;
+    this.deltas = new Map();
+    this.inflight = this.write(batch)
+      .catch((err) => {
+        console.error(`[counters] flush of ${batch.size} skill(s) failed, retrying later`, err);
+        for (const [slug, delta] of batch) this.add(slug, delta);
+      })
+      .finally(() => { this.inflight = null; });
+    await this.inflight;
+  }
+
+  // ---------------------------------------------------------------------------
+  // Helpers
+  // ---------------------------------------------------------------------------
+
+  private add(slug: string, delta: CounterDelta) {
+    if (this.deltas.size === 0) this.oldestAt = Date.now();
+    const current = this.deltas.get(slug);
+    if (current) {
+      current.downloads += delta.downloads;
+      current.likes     += delta.likes;
+    } else {
+      this.deltas.set(slug, { ...delta });
+    }
+    if (this.deltas.size >= this.opts.maxPendingSkills) void this.flush();
+  }
+
+  private async write(batch: Map<string, CounterDelta>): Promise<void> {
+    const values = sql.join(
+      [...batch].map(([slug, d]) => sql`(${slug}, ${d.downloads}::integer, ${d.likes}::integer)`),
+      sql`, `,
+    );
+    await this.db.execute(sql`
+      UPDATE ${marketplaceSkills}
+         -- Only published skills count downloads, as the per-view UPDATE did
+         SET downloads = ${marketplaceSkills.downloads}
+                         + CASE WHEN ${marketplaceSkills.published} THEN v.downloads ELSE 0 END,
+             likes     = ${marketplaceSkills.likes} + v.likes
+        FROM (VALUES ${values}) AS v(slug, downloads, likes)
+       WHERE ${marketplaceSkills.slug} = v.slug
+    `);
+  }
+}
@@ -1,7 +1,8 @@
-import { neon } from '@neondatabase/serverless';
+import { neon, type NeonQueryFunction } from '@neondatabase/serverless';
 import { drizzle, NeonHttpDatabase } from 'drizzle-orm/neon-http';
 import * as schema from './schema';
 import type { Env } from '../../env';
+import type { Tracer } from '../tracing/Tracer';
 
 export type Db = NeonHttpDatabase<typeof schema>;
 
@@ -10,8 +11,45 @@ export type Db = NeonHttpDatabase<typeof schema>;
  *
  * @neondatabase/serverless uses HTTP fetch instead of TCP, making it
  * fully compatible with Cloudflare Workers without nodejs_compat TCP quirks.
+ *
+ * With a `tracer`, every statement (and every `db.batch`) is timed into the
+ * tracer's per-query histograms and the current request's trace.
  */
-export function buildDatabase(env: Env): Db {
+export function buildDatabase(env: Env, tracer?: Tracer): Db {
   const sql = neon(env.DATABASE_URL);
-  return drizzle(sql, { schema });
+  return drizzle(tracer ? traceSql(sql, tracer) : sql, { schema });
+}
+
+type Sql = NeonQueryFunction<false, false>;
+
+/**
+ * Neon queries are lazy: they run when first awaited, and a query handed to
+ * `sql.transaction([...])` never runs on its own.  So a query's clock starts
+ * in its `then`, and batched queries are timed once, as the batch.
+ */
+function traceSql(sql: Sql, tracer: Tracer): Sql {
+  const measure = <T>(promise: PromiseLike<T>, text: string, start: number): Promise<T> =>
+    Promise.resolve(promise).then(
+      (value) => {
+        tracer.recordQuery(text, start, false);
+        return value;
+      },
+      (err: unknown) => {
+        tracer.recordQuery(text, start, true);
+        throw err;
+      },
+    );
+
+  const traced = ((...args: Parameters<Sql>) => {
+    const [text] = args;
+    const query = sql(...args);
+    if (typeof text !== 'string') return query;
+    const then = query.then.bind(query);
+    query.then = ((onFulfilled, onRejected) =>
+      measure({ then }, text, performance.now()).then(onFulfilled, onRejected)) as typeof query.then;
+    return query;
+  }) as Sql;
+  traced.transaction = ((...args: Parameters<Sql['transaction']>) =>
+    measure(sql.transaction(...args), 'batch', performance.now())) as Sql['transaction'];
+  return traced;
 }
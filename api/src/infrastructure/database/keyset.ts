@@ -0,0 +1,34 @@
+import { sql, type SQL } from 'drizzle-orm';
+import type { PgColumn } from 'drizzle-orm/pg-core';
+import { Cursor, Page, encodeCursor } from '../../domain/shared/pagination';
+
+/**
+ * Helpers for (created_at DESC, id DESC) keyset pagination.
+ *
+ * Repositories select `cursorTs` alongside each row, fetch `limit + 1` rows
+ * and hand them to `toPage`, which trims the probe row and builds the cursor.
+ */
+
+/** Exact database text of a timestamp column, used to build the next cursor. */
+export function cursorText(createdAt: PgColumn): SQL<string> {
+  return sql<string>`${createdAt}::text`;
+}
+
+/** Rows strictly after `cursor` in (created_at DESC, id DESC) order. */
+export function olderThan(createdAt: PgColumn, id: PgColumn, cursor: Cursor): SQL {
+  return sql`(${createdAt}, ${id}) < (${cursor.createdAt}::timestamp, ${cursor.id})`;
+}
+
+export function toPage<R extends { id: number; cursorTs: string }, T>(
+  rows:  R[],
+  limit: number,
+  map:   (row: R) => T,
+): Page<T> {
+  const hasMore = rows.length > limit;
+  const page    = hasMore ? rows.slice(0, limit) : rows;
+  const last    = page[page.length - 1];
+  return {
+    items:      page.map(map),
+    nextCursor: hasMore && last ? encodeCursor({ createdAt: last.cursorTs, id: last.id }) : null,
+  };
+}
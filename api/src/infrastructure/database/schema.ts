@@ -10,7 +10,10 @@ import {
   primaryKey,
   serial,
   varchar,
+  index,
+  uniqueIndex,
 } from 'drizzle-orm/pg-core';
+import { sql } from 'drizzle-orm';
 
 // custom tsvector type for full-text search
 const tsvector = customType<{ data: string }>({
@@ -83,6 +86,25 @@ export const users = pgTable('users', {
   updatedAt:    timestamp('updated_at').notNull().defaultNow(),
 });
 
+/**
+ * Rotating refresh tokens (SHA-256 of the opaque token; never the token).
+ * Each use revokes the row and inserts its successor in the same family, so a
+ * replayed token is detected and revokes the family.
+ */
+export const refreshTokens = pgTable('refresh_tokens', {
+  id:        serial('id').primaryKey(),
+  userId:    varchar('user_id', { length: 36 }).notNull().references(() => users.id, { onDelete: 'cascade' }),
+  familyId:  uuid('family_id').notNull(),
+  tokenHash: varchar('token_hash', { length: 64 }).notNull(),
+  expiresAt: timestamp('expires_at').notNull(),
+  revokedAt: timestamp('revoked_at'),
+  createdAt: timestamp('created_at').notNull().defaultNow(),
+}, (t) => [
+  uniqueIndex('refresh_tokens_token_hash_idx').on(t.tokenHash),
+  index('refresh_tokens_family_idx').on(t.familyId),
+  index('refresh_tokens_user_idx').on(t.userId),
+]);
+
 // ---------------------------------------------------------------------------
 // Marketplace tables
 // ---------------------------------------------------------------------------
@@ -134,7 +156,9 @@ export const tenantMembers = pgTable('tenant_members', {
   role:      tenantRoleEnum('role').notNull().default('developer'),
   isActive:  boolean('is_active').notNull().default(true),
   joinedAt:  timestamp('joined_at').notNull().defaultNow(),
-});
+}, (t) => [
+  index('tenant_members_user_tenant_idx').on(t.userId, t.tenantId),
+]);
 
 export const projects = pgTable('projects', {
   id:              serial('id').primaryKey(),
@@ -148,7 +172,9 @@ export const projects = pgTable('projects', {
   githubRepoName:  varchar('github_repo_name', { length: 255 }),
   createdAt:       timestamp('created_at').notNull().defaultNow(),
   updatedAt:       timestamp('updated_at').notNull().defaultNow(),
-});
+}, (t) => [
+  index('projects_tenant_id_idx').on(t.tenantId),
+]);
 
 export const tasks = pgTable('tasks', {
   id:                serial('id').primaryKey(),
@@ -167,7 +193,13 @@ export const tasks = pgTable('tasks', {
   archived:          boolean('archived').notNull().default(false),
   createdAt:         timestamp('created_at').notNull().defaultNow(),
   updatedAt:         timestamp('updated_at').notNull().defaultNow(),
-});
+}, (t) => [
+  index('tasks_project_created_idx').on(t.projectId, t.createdAt.desc(), t.id.desc()),
+  index('tasks_project_status_idx')
+    .on(t.projectId, t.status)
+    .where(sql`${t.archived} = false`),
+  index('tasks_project_updated_idx').on(t.projectId, t.updatedAt),
+]);
 
 export const agents = pgTable('agents', {
   id:         serial('id').primaryKey(),
@@ -224,7 +256,13 @@ export const executions = pgTable('executions', {
   completedAt:  timestamp('completed_at'),
   createdAt:    timestamp('created_at').notNull().defaultNow(),
   updatedAt:    timestamp('updated_at').notNull().defaultNow(),
-});
+}, (t) => [
+  index('executions_tenant_created_idx').on(t.tenantId, t.createdAt.desc(), t.id.desc()),
+  index('executions_task_created_idx').on(t.taskId, t.createdAt.desc(), t.id.desc()),
+  index('executions_active_idx')
+    .on(t.tenantId, t.agentId)
+    .where(sql`${t.status} IN ('pending', 'submitted', 'running')`),
+]);
 
 export const auditEvents = pgTable('audit_events', {
   id:           serial('id').primaryKey(),
@@ -235,7 +273,10 @@ export const auditEvents = pgTable('audit_events', {
   resourceId:   varchar('resource_id', { length: 100 }),
   metadata:     text('metadata'),
   createdAt:    timestamp('created_at').notNull().defaultNow(),
-});
+}, (t) => [
+  index('audit_events_tenant_created_idx').on(t.tenantId, t.createdAt.desc(), t.id.desc()),
+  index('audit_events_user_created_idx').on(t.tenantId, t.userId, t.createdAt.desc(), t.id.desc()),
+]);
 
 // ---------------------------------------------------------------------------
 // Skill assignments
@@ -271,4 +312,25 @@ export const clawSkillAssignments = pgTable('claw_skill_assignments', {
   assignedAt: timestamp('assigned_at').notNull().defaultNow(),
 }, (t) => [
   primaryKey({ columns: [t.clawId, t.skillSlug] }),
-]);
\ No newline at end of file
+]);
+
+// ---------------------------------------------------------------------------
+// coderClawLLM usage
+// ---------------------------------------------------------------------------
+
+/**
+ * Hourly LLM proxy usage per claw, written by LlmUsageBuffer.
+ * Day/week views aggregate these rows; one row per claw per active hour.
+ */
+export const llmUsage = pgTable('llm_usage', {
+  clawId:           integer('claw_id').notNull().references(() => coderclawInstances.id, { onDelete: 'cascade' }),
+  tenantId:         integer('tenant_id').notNull().references(() => tenants.id, { onDelete: 'cascade' }),
+  bucketStart:      timestamp('bucket_start').notNull(),
+  requests:         integer('requests').notNull().default(0),
+  cachedRequests:   integer('cached_requests').notNull().default(0),
+  promptTokens:     integer('prompt_tokens').notNull().default(0),
+  completionTokens: integer('completion_tokens').notNull().default(0),
+}, (t) => [
+  primaryKey({ columns: [t.clawId, t.bucketStart] }),
+  index('llm_usage_tenant_bucket_idx').on(t.tenantId, t.bucketStart),
+]);
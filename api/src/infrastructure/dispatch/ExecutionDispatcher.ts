@@ -0,0 +1,59 @@
+import { IExecutionDispatcher } from '../../domain/execution/IExecutionDispatcher';
+import { Execution } from '../../domain/execution/Execution';
+import { DispatchJob, requiredSkillOf } from '../../domain/execution/Dispatch';
+import type { ExecutionDispatcherDO } from './ExecutionDispatcherDO';
+
+/**
+ * Hands executions to the tenant's ExecutionDispatcherDO.
+ *
+ * Best-effort, like ExecutionEventPublisher: a failed hand-off is logged and
+ * never fails the submission — the execution stays pending and can still be
+ * picked up by polling.
+ */
+export class ExecutionDispatcher implements IExecutionDispatcher {
+  constructor(private readonly namespace: DurableObjectNamespace<ExecutionDispatcherDO> | undefined) {}
+
+  async enqueue(executions: Execution[]): Promise<void> {
+    const byTenant = new Map<number, DispatchJob[]>();
+    for (const e of executions) {
+      const jobs = byTenant.get(e.tenantId) ?? [];
+      jobs.push({
+        executionId:   e.id,
+        taskId:        e.taskId,
+        agentId:       e.agentId,
+        payload:       e.payload,
+        requiredSkill: requiredSkillOf(e.payload),
+        attempts:      0,
+      });
+      byTenant.set(e.tenantId, jobs);
+    }
+    await Promise.all([...byTenant].map(([tenantId, jobs]) => this.post(tenantId, 'enqueue', { jobs })));
+  }
+
+  async cancel(execution: Execution): Promise<void> {
+    await this.post(execution.tenantId, 'cancel', { executionId: execution.id });
+  }
+
+  async withdraw(executions: Execution[]): Promise<void> {
+    const byTenant = new Map<number, Array<{ executionId: number; finished: boolean }>>();
+    for (const e of executions) {
+      const items = byTenant.get(e.tenantId) ?? [];
+      items.push({ executionId: e.id, finished: e.isFinished });
+      byTenant.set(e.tenantId, items);
+    }
+    await Promise.all([...byTenant].map(([tenantId, items]) => this.post(tenantId, 'withdraw', { items })));
+  }
+
+  private async post(tenantId: number, op: string, body: object): Promise<void> {
+    if (!this.namespace) return;
+    const stub = this.namespace.get(this.namespace.idFromName(String(tenantId)));
+    try {
+      await stub.fetch(`https://dispatcher/${op}`, {
+        method: 'POST',
+        body:   JSON.stringify({ tenantId, ...body }),
+      });
+    } catch (err) {
+      console.error(`[dispatch] ${op} failed`, err);
+    }
+  }
+}
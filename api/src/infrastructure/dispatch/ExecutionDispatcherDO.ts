@@ -0,0 +1,442 @@
+/**
+ * ExecutionDispatcherDO — Cloudflare Durable Object that pushes a tenant's
+ * new executions to its connected claws.
+ *
+ * One instance per tenant (keyed by tenant id).
+ *
+ *   1. RuntimeService enqueues each submitted execution here
+ *   2. The queue is matched to online claws (least loaded, skill-aware, at
+ *      most `maxPerClaw` each) and every match is delivered over the claw's
+ *      upstream socket through its ClawRelayDO:
+ *        → { type:"execution.dispatch", leaseId, execution, ackTimeoutMs }
+ *   3. The claw answers on the same socket; ClawRelayDO forwards to /claw-message:
+ *        ← { type:"execution.ack",       executionId, leaseId }   → running
+ *        ← { type:"execution.heartbeat", executionId, leaseId }   → lease renewed
+ *        ← { type:"execution.reject",    executionId, leaseId }   → redelivered
+ *        ← { type:"execution.result",    executionId, leaseId, status, result?, errorMessage? }
+ *   4. Lapsed leases (alarm) and leases on a claw that went offline
+ *      (/claw-offline) are redelivered, up to `maxAttempts` deliveries
+ *   5. Executions an agent started or finished over REST are withdrawn
+ *      (/withdraw) so they are not delivered a second time; jobs needing a
+ *      skill that no claw in the tenant has are failed on arrival
+ *
+ * Internal API (all POST bodies carry `tenantId`):
+ *   POST /enqueue       ← { jobs: DispatchJob[] }
+ *   POST /cancel        ← { executionId }
+ *   POST /withdraw      ← { items: { executionId, finished }[] }
+ *   POST /claw-online   ← { clawId }
+ *   POST /claw-offline  ← { clawId }
+ *   POST /claw-message  ← { clawId, message }
+ *   GET  /status        → queue, leases and per-claw load
+ */
+import { and, eq, inArray } from "drizzle-orm";
+import type { Env } from "../../env";
+import {
+  ClawLoad, DEFAULT_DISPATCH_LIMITS, DispatchJob, DispatchLimits, selectClaw,
+} from "../../domain/execution/Dispatch";
+import { ExecutionStatus } from "../../domain/shared/types";
+import { RuntimeService } from "../../application/runtime/RuntimeService";
+import { buildDatabase, type Db } from "../database/connection";
+import { clawSkillAssignments, tenantSkillAssignments } from "../database/schema";
+import { ExecutionRepository } from "../repositories/ExecutionRepository";
+import { TaskRepository } from "../repositories/TaskRepository";
+import { AgentRepository } from "../repositories/AgentRepository";
+import { AuditRepository } from "../repositories/AuditRepository";
+import { ExecutionEventPublisher } from "../events/ExecutionEventPublisher";
+import type { ClawRelayDO } from "../relay/ClawRelayDO";
+
+type DispatcherEnv = Env & { CLAW_RELAY: DurableObjectNamespace<ClawRelayDO> };
+
+interface Lease {
+  job:       DispatchJob;
+  clawId:    number;
+  leaseId:   string;
+  acked:     boolean;
+  expiresAt: number;
+}
+
+interface DispatcherState {
+  tenantId: number | null;
+  queue:    DispatchJob[];
+  leases:   Record<number, Lease>;
+  claws:    Record<number, ClawLoad>;
+}
+
+interface WithdrawItem {
+  executionId: number;
+  /** Finished elsewhere: also take back a lease and tell its claw to stop. */
+  finished:    boolean;
+}
+
+interface ClawMessage {
+  type:          string;
+  executionId:   number;
+  leaseId:       string;
+  status?:       string;
+  result?:       string;
+  errorMessage?: string;
+}
+
+const STORAGE_KEY = "state";
+
+export class ExecutionDispatcherDO implements DurableObject {
+  private readonly limits: DispatchLimits = DEFAULT_DISPATCH_LIMITS;
+
+  private data: DispatcherState = { tenantId: null, queue: [], leases: {}, claws: {} };
+  private pumping   = false;
+  private pumpAgain = false;
+  private db:      Db | null = null;
+  private service: RuntimeService | null = null;
+
+  constructor(private state: DurableObjectState, private env: DispatcherEnv) {
+    this.state.blockConcurrencyWhile(async () => {
+      this.data = (await this.state.storage.get<DispatcherState>(STORAGE_KEY)) ?? this.data;
+    });
+  }
+
+  async fetch(request: Request): Promise<Response> {
+    const url = new URL(request.url);
+    const op  = url.pathname.split("/").pop();
+
+    if (request.method === "GET" && op === "status") {
+      return Response.json(this.status());
+    }
+    if (request.method !== "POST") return new Response("Not found", { status: 404 });
+
+    const body = await request.json<{
+      tenantId: number; jobs?: DispatchJob[]; executionId?: number; clawId?: number; message?: ClawMessage;
+      items?: WithdrawItem[];
+    }>();
+    this.data.tenantId ??= body.tenantId;
+
+    switch (op) {
+      case "enqueue":
+        await this.enqueue(body.jobs ?? []);
+        break;
+      case "cancel":
+        await this.cancel(body.executionId!);
+        break;
+      case "withdraw":
+        await this.withdraw(body.items ?? []);
+        break;
+      case "claw-online":
+        await this.clawOnline(body.clawId!);
+        break;
+      case "claw-offline":
+        await this.clawOffline(body.clawId!);
+        break;
+      case "claw-message":
+        await this.onClawMessage(body.clawId!, body.message!);
+        break;
+      default:
+        return new Response("Not found", { status: 404 });
+    }
+
+    await this.pump();
+    return Response.json({ ok: true });
+  }
+
+  /** Reclaim every lease whose ack or run window has lapsed. */
+  async alarm(): Promise<void> {
+    const now = Date.now();
+    for (const lease of Object.values(this.data.leases)) {
+      if (lease.expiresAt <= now) await this.reclaim(lease, lease.acked ? "lease expired" : "ack timeout");
+    }
+    await this.pump();
+  }
+
+  // ---------------------------------------------------------------------------
+  // Queue and claws
+  // ---------------------------------------------------------------------------
+
+  private async enqueue(jobs: DispatchJob[]) {
+    const fresh = jobs.filter((job) =>
+      !this.data.leases[job.executionId] && !this.data.queue.some((q) => q.executionId === job.executionId));
+    const assigned = await this.assignedSkills(fresh);
+
+    for (const job of fresh) {
+      if (job.requiredSkill && assigned && !assigned.has(job.requiredSkill)) {
+        // No claw could ever take it – fail now rather than queue it forever
+        await this.transition(job.executionId, {
+          status:       ExecutionStatus.FAILED,
+          errorMessage: `No claw in this workspace has the '${job.requiredSkill}' skill`,
+        });
+        continue;
+      }
+      this.data.queue.push(job);
+    }
+  }
+
+  /** An agent started or finished these outside the dispatcher: never deliver them again. */
+  private async withdraw(items: WithdrawItem[]) {
+    for (const { executionId, finished } of items) {
+      if (finished) {
+        await this.cancel(executionId);
+      } else {
+        this.data.queue = this.data.queue.filter((j) => j.executionId !== executionId);
+      }
+    }
+  }
+
+  private async cancel(executionId: number) {
+    this.data.queue = this.data.queue.filter((j) => j.executionId !== executionId);
+    const lease = this.data.leases[executionId];
+    if (lease) {
+      this.release(lease);
+      await this.deliver(lease.clawId, { type: "execution.cancel", executionId, leaseId: lease.leaseId });
+    }
+  }
+
+  private async clawOnline(clawId: number) {
+    const claw = this.data.claws[clawId] ??= {
+      clawId, online: true, inFlight: 0, skills: [], lastDispatchAt: 0,
+    };
+    claw.online = true;
+    claw.skills = await this.loadSkills(clawId).catch((err) => {
+      console.error(`[dispatch] skills for claw ${clawId} unavailable`, err);
+      return claw.skills;
+    });
+  }
+
+  /** The claw's socket closed: everything leased to it goes back to the queue. */
+  private async clawOffline(clawId: number) {
+    const claw = this.data.claws[clawId];
+    if (claw) claw.online = false;
+    for (const lease of Object.values(this.data.leases)) {
+      if (lease.clawId === clawId) await this.reclaim(lease, "claw_offline");
+    }
+  }
+
+  /**
+   * Which of the jobs' required skills are assigned to some claw of the
+   * tenant (or tenant-wide).  Null when that cannot be checked right now.
+   */
+  private async assignedSkills(jobs: DispatchJob[]): Promise<Set<string> | null> {
+    const wanted = [...new Set(jobs.flatMap((j) => (j.requiredSkill ? [j.requiredSkill] : [])))];
+    if (wanted.length === 0) return new Set();
+    const db = this.database();
+    const tenantId = this.data.tenantId!;
+    try {
+      const [own, tenantWide] = await Promise.all([
+        db.selectDistinct({ slug: clawSkillAssignments.skillSlug })
+          .from(clawSkillAssignments)
+          .where(and(eq(clawSkillAssignments.tenantId, tenantId), inArray(clawSkillAssignments.skillSlug, wanted))),
+        db.select({ slug: tenantSkillAssignments.skillSlug })
+          .from(tenantSkillAssignments)
+          .where(and(eq(tenantSkillAssignments.tenantId, tenantId), inArray(tenantSkillAssignments.skillSlug, wanted))),
+      ]);
+      return new Set([...own, ...tenantWide].map((r) => r.slug));
+    } catch (err) {
+      console.error("[dispatch] skill assignments unavailable, queueing anyway", err);
+      return null;
+    }
+  }
+
+  private async loadSkills(clawId: number): Promise<string[]> {
+    const db = this.database();
+    const tenantId = this.data.tenantId!;
+    const [own, tenantWide] = await Promise.all([
+      db.select({ slug: clawSkillAssignments.skillSlug })
+        .from(clawSkillAssignments)
+        .where(and(eq(clawSkillAssignments.clawId, clawId), eq(clawSkillAssignments.tenantId, tenantId))),
+      db.select({ slug: tenantSkillAssignments.skillSlug })
+        .from(tenantSkillAssignments)
+        .where(eq(tenantSkillAssignments.tenantId, tenantId)),
+    ]);
+    return [...new Set([...own, ...tenantWide].map((r) => r.slug))];
+  }
+
+  // ---------------------------------------------------------------------------
+  // Leases
+  // ---------------------------------------------------------------------------
+
+  private async onClawMessage(clawId: number, message: ClawMessage) {
+    const lease = this.data.leases[message.executionId];
+    // Stale or foreign lease (already redelivered elsewhere): ignore
+    if (!lease || lease.leaseId !== message.leaseId || lease.clawId !== clawId) return;
+
+    const now = Date.now();
+    switch (message.type) {
+      case "execution.ack":
+        lease.acked     = true;
+        lease.expiresAt = now + this.limits.runLeaseMs;
+        await this.transition(lease.job.executionId, { status: ExecutionStatus.RUNNING });
+        break;
+      case "execution.heartbeat":
+        lease.expiresAt = now + this.limits.runLeaseMs;
+        break;
+      case "execution.reject":
+        await this.reclaim(lease, "rejected by claw");
+        break;
+      case "execution.result": {
+        this.release(lease);
+        const failed = message.status === ExecutionStatus.FAILED;
+        await this.transition(lease.job.executionId, failed
+          ? { status: ExecutionStatus.FAILED,    errorMessage: message.errorMessage }
+          : { status: ExecutionStatus.COMPLETED, result: message.result });
+        break;
+      }
+    }
+  }
+
+  /** Take a lease back; redeliver its job unless it is out of attempts. */
+  private async reclaim(lease: Lease, reason: string) {
+    this.release(lease);
+    if (lease.job.attempts >= this.limits.maxAttempts) {
+      await this.transition(lease.job.executionId, {
+        status:       ExecutionStatus.FAILED,
+        errorMessage: `Dispatch failed after ${lease.job.attempts} attempts (${reason})`,
+      });
+      return;
+    }
+    this.data.queue.unshift(lease.job);
+  }
+
+  private release(lease: Lease) {
+    delete this.data.leases[lease.job.executionId];
+    const claw = this.data.claws[lease.clawId];
+    if (claw) claw.inFlight = Math.max(0, claw.inFlight - 1);
+  }
+
+  /**
+   * Match queued jobs to claws until nothing more fits.  Re-entrant calls
+   * (a request arriving while a delivery is awaited) just ask for another pass.
+   */
+  private async pump() {
+    if (this.pumping) {
+      this.pumpAgain = true;
+      return;
+    }
+    this.pumping = true;
+    const dispatched: number[] = [];
+    try {
+      do {
+        this.pumpAgain = false;
+        const waiting = this.data.queue;
+        this.data.queue = [];
+
+        for (const job of waiting) {
+          const claw = selectClaw(Object.values(this.data.claws), job, this.limits.maxPerClaw);
+          if (!claw) {
+            this.data.queue.push(job);
+            continue;
+          }
+
+          const now   = Date.now();
+          const lease: Lease = {
+            job:       { ...job, attempts: job.attempts + 1 },
+            clawId:    claw.clawId,
+            leaseId:   crypto.randomUUID(),
+            acked:     false,
+            expiresAt: now + this.limits.ackTimeoutMs,
+          };
+          this.data.leases[job.executionId] = lease;
+          claw.inFlight++;
+          claw.lastDispatchAt = now;
+
+          const delivered = await this.deliver(claw.clawId, {
+            type:         "execution.dispatch",
+            leaseId:      lease.leaseId,
+            ackTimeoutMs: this.limits.ackTimeoutMs,
+            execution:    {
+              id: job.executionId, taskId: job.taskId, agentId: job.agentId, payload: job.payload,
+            },
+          });
+          if (delivered) {
+            dispatched.push(job.executionId);
+          } else {
+            // Socket gone before the relay noticed: treat as claw_offline
+            this.release(lease);
+            this.data.queue.push(job);
+            await this.clawOffline(claw.clawId);
+            this.pumpAgain = true;
+          }
+        }
+      } while (this.pumpAgain);
+    } finally {
+      this.pumping = false;
+      this.save();
+    }
+
+    if (dispatched.length > 0) {
+      await this.runtime().markDispatched(dispatched)
+        .catch((err) => console.error("[dispatch] marking executions submitted failed", err));
+    }
+    await this.scheduleAlarm();
+  }
+
+  // ---------------------------------------------------------------------------
+  // Helpers
+  // ---------------------------------------------------------------------------
+
+  /** Send a frame to a claw's upstream socket; false if the claw is not connected. */
+  private async deliver(clawId: number, frame: object): Promise<boolean> {
+    const stub = this.env.CLAW_RELAY.get(this.env.CLAW_RELAY.idFromName(String(clawId)));
+    try {
+      const res = await stub.fetch("https://claw-relay/dispatch", {
+        method: "POST",
+        body:   JSON.stringify(frame),
+      });
+      return res.ok;
+    } catch (err) {
+      console.error(`[dispatch] delivery to claw ${clawId} failed`, err);
+      return false;
+    }
+  }
+
+  private async transition(
+    executionId: number,
+    dto: { status: ExecutionStatus; result?: string; errorMessage?: string },
+  ) {
+    try {
+      await this.runtime().update(executionId, dto);
+    } catch (err) {
+      // e.g. cancelled in the meantime – the lease is gone either way
+      console.error(`[dispatch] execution ${executionId} → ${dto.status} rejected`, err);
+    }
+  }
+
+  private async scheduleAlarm() {
+    const next = Math.min(...Object.values(this.data.leases).map((l) => l.expiresAt));
+    if (Number.isFinite(next)) {
+      await this.state.storage.setAlarm(next);
+    } else {
+      await this.state.storage.deleteAlarm();
+    }
+  }
+
+  private save() {
+    // Unawaited: the output gate holds responses until this commits
+    void this.state.storage.put(STORAGE_KEY, this.data);
+  }
+
+  private status() {
+    return {
+      queued: this.data.queue.length,
+      leases: Object.values(this.data.leases).map((l) => ({
+        executionId: l.job.executionId,
+        clawId:      l.clawId,
+        acked:       l.acked,
+        attempts:    l.job.attempts,
+        expiresAt:   new Date(l.expiresAt).toISOString(),
+      })),
+      claws: Object.values(this.data.claws),
+    };
+  }
+
+  private database(): Db {
+    return this.db ??= buildDatabase(this.env);
+  }
+
+  /** Execution state changes go through the same service (audit + events) as REST callbacks. */
+  private runtime(): RuntimeService {
+    const db = this.database();
+    return this.service ??= new RuntimeService(
+      new ExecutionRepository(db),
+      new TaskRepository(db),
+      new AgentRepository(db),
+      new AuditRepository(db),
+      new ExecutionEventPublisher(this.env.TENANT_EVENTS),
+    );
+  }
+}
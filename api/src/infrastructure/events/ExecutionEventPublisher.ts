@@ -0,0 +1,29 @@
+import { IExecutionEventPublisher } from '../../domain/execution/IExecutionEventPublisher';
+import { Execution } from '../../domain/execution/Execution';
+import type { TenantEventsDO } from './TenantEventsDO';
+
+/**
+ * Publishes execution transitions to the tenant's TenantEventsDO.
+ *
+ * Delivery is best-effort: a failed publish is logged and never fails the
+ * state change that triggered it (subscribers can always re-read the
+ * execution over REST).
+ */
+export class ExecutionEventPublisher implements IExecutionEventPublisher {
+  constructor(private readonly namespace: DurableObjectNamespace<TenantEventsDO> | undefined) {}
+
+  async publish(execution: Execution): Promise<void> {
+    if (!this.namespace) return;
+
+    const stub = this.namespace.get(this.namespace.idFromName(String(execution.tenantId)));
+    try {
+      await stub.fetch('https://tenant-events/publish', {
+        method:  'POST',
+        headers: { 'x-task-id': String(execution.taskId) },
+        body:    JSON.stringify({ type: 'execution.updated', execution: execution.toPlain() }),
+      });
+    } catch (err) {
+      console.error('[events] publish failed', err);
+    }
+  }
+}
@@ -0,0 +1,76 @@
+/**
+ * TenantEventsDO — Cloudflare Durable Object that fans execution state
+ * transitions out to every browser subscribed to a tenant.
+ *
+ * One DO instance per tenant (keyed by tenant id).
+ *
+ * Lifecycle:
+ *   1. Browser connects to /api/runtime/events (tenant JWT via ?token=),
+ *      optionally narrowed with ?task_id= → hibernatable socket
+ *   2. RuntimeService POSTs each transition to /publish
+ *      → forwarded to every matching subscriber
+ *
+ * Sockets are accepted through the Hibernation API and pings are answered by
+ * the runtime's auto-response, so an idle board costs no DO duration.
+ */
+
+interface Subscription {
+  taskId: number | null;
+}
+
+export class TenantEventsDO implements DurableObject {
+  constructor(private state: DurableObjectState, private env: unknown) {
+    this.state.setWebSocketAutoResponse(
+      new WebSocketRequestResponsePair(
+        JSON.stringify({ type: "ping" }),
+        JSON.stringify({ type: "pong" }),
+      ),
+    );
+  }
+
+  async fetch(request: Request): Promise<Response> {
+    const url = new URL(request.url);
+
+    if (request.method === "POST" && url.pathname.endsWith("/publish")) {
+      const taskId = Number(request.headers.get("x-task-id"));
+      this.publish(await request.text(), taskId);
+      return new Response(null, { status: 204 });
+    }
+
+    if (request.headers.get("Upgrade") !== "websocket") {
+      return new Response("Expected WebSocket upgrade", { status: 426 });
+    }
+
+    const { 0: client, 1: server } = new WebSocketPair();
+    const taskParam = url.searchParams.get("task_id");
+    const subscription: Subscription = { taskId: taskParam ? Number(taskParam) : null };
+
+    this.state.acceptWebSocket(server);
+    server.serializeAttachment(subscription);
+
+    return new Response(null, { status: 101, webSocket: client });
+  }
+
+  // Subscribers are receive-only; anything other than a ping is ignored.
+  async webSocketMessage(): Promise<void> {}
+
+  async webSocketClose(ws: WebSocket, code: number, reason: string): Promise<void> {
+    try { ws.close(code, reason); } catch { /* already closed */ }
+  }
+
+  // ---------------------------------------------------------------------------
+  // Helpers
+  // ---------------------------------------------------------------------------
+
+  private publish(data: string, taskId: number) {
+    for (const ws of this.state.getWebSockets()) {
+      const sub = ws.deserializeAttachment() as Subscription | null;
+      if (sub?.taskId != null && sub.taskId !== taskId) continue;
+      try {
+        ws.send(data);
+      } catch {
+        /* socket is closing – webSocketClose cleans up */
+      }
+    }
+  }
+}
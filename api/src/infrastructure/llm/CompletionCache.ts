@@ -0,0 +1,91 @@
+/**
+ * Edge cache for opt-in coderClawLLM completions.
+ *
+ * Entries are keyed by a SHA-256 of the caller's scope plus the canonical
+ * request (object keys sorted recursively, the ignored `model` field dropped),
+ * so the same messages and parameters hit regardless of key order — but only
+ * for the caller that stored them; the cache is shared by every tenant.  Bodies are stored verbatim — the
+ * SSE transcript for streamed requests, the upstream JSON otherwise — and
+ * expire after the TTL; the Cache API evicts least-recently-used entries
+ * under pressure, and bodies larger than MAX_CACHED_BYTES are never stored.
+ */
+import { EdgeCache } from '../cache/EdgeCache';
+
+/** Largest body worth caching; bigger completions are served but not stored. */
+export const MAX_CACHED_BYTES = 1024 * 1024;
+
+/** Bump when the key derivation or stored format changes. */
+const KEY_VERSION = 'v2';
+
+export interface CachedCompletion {
+  body:          ReadableStream<Uint8Array> | null;
+  contentType:   string | null;
+  resolvedModel: string;
+  ageSeconds:    number;
+}
+
+export interface CompletionEntry {
+  body:          Uint8Array;
+  contentType:   string | null;
+  resolvedModel: string;
+}
+
+/** JSON with object keys sorted at every level. */
+function canonicalJson(value: unknown): string {
+  if (Array.isArray(value)) return `[${value.map(canonicalJson).join(',')}]`;
+  if (value && typeof value === 'object') {
+    const entries = Object.entries(value as Record<string, unknown>)
+      .filter(([, v]) => v !== undefined)
+      .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0));
+    return `{${entries.map(([k, v]) => `${JSON.stringify(k)}:${canonicalJson(v)}`).join(',')}}`;
+  }
+  return JSON.stringify(value) ?? 'null';
+}
+
+/**
+ * Hex SHA-256 cache key for a chat-completion request body, scoped to the
+ * caller (`claw:<tenant>:<id>` or `ip:<addr>`, as the rate limiter keys it).
+ */
+export async function completionKey(request: Record<string, unknown>, scope: string): Promise<string> {
+  const params: Record<string, unknown> = { ...request };
+  delete params['model'];
+  const digest = await crypto.subtle.digest(
+    'SHA-256',
+    new TextEncoder().encode(`${KEY_VERSION}:${scope}:${canonicalJson(params)}`),
+  );
+  return [...new Uint8Array(digest)].map((b) => b.toString(16).padStart(2, '0')).join('');
+}
+
+export class CompletionCache {
+  private readonly store: EdgeCache;
+
+  constructor(ttlSeconds: number) {
+    this.store = new EdgeCache('llm-completions', ttlSeconds);
+  }
+
+  async match(key: string): Promise<CachedCompletion | null> {
+    const hit = await this.store.match(await this.requestFor(key));
+    if (!hit) return null;
+    const storedAt = Number(hit.headers.get('x-stored-at'));
+    return {
+      body:          hit.body,
+      contentType:   hit.headers.get('content-type'),
+      resolvedModel: hit.headers.get('x-resolved-model') ?? '',
+      ageSeconds:    storedAt ? Math.max(0, Math.floor((Date.now() - storedAt) / 1000)) : 0,
+    };
+  }
+
+  async put(key: string, entry: CompletionEntry): Promise<void> {
+    if (entry.body.byteLength > MAX_CACHED_BYTES) return;
+    const headers = new Headers({
+      'x-resolved-model': entry.resolvedModel,
+      'x-stored-at':      String(Date.now()),
+    });
+    if (entry.contentType) headers.set('content-type', entry.contentType);
+    await this.store.put(await this.requestFor(key), new Response(entry.body, { headers }));
+  }
+
+  private requestFor(key: string): Promise<Request> {
+    return this.store.keyFor(`https://llm.coderclaw.internal/completions/${key}`);
+  }
+}
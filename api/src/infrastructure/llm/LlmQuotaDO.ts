@@ -0,0 +1,52 @@
+/**
+ * LlmQuotaDO — Cloudflare Durable Object holding the token buckets of one
+ * coderClawLLM caller.
+ *
+ * One instance per caller, keyed "claw:<tenantId>:<clawId>" or "ip:<address>".
+ * The policy travels with each call so limits can change without migrating
+ * stored state.
+ *
+ *   POST /admit   ← { policy }          → QuotaDecision
+ *   POST /lease   ← { policy, count }   → QuotaLease (up to `count` permits)
+ *   POST /charge  ← { policy, tokens }  → QuotaDecision
+ */
+import {
+  QuotaDecision, QuotaPolicy, QuotaState, admit, charge, fullQuota, lease,
+} from "../../domain/llm/Quota";
+
+const STORAGE_KEY = "buckets";
+
+export class LlmQuotaDO implements DurableObject {
+  private buckets: QuotaState | null = null;
+
+  constructor(private state: DurableObjectState, private env: unknown) {
+    this.state.blockConcurrencyWhile(async () => {
+      this.buckets = (await this.state.storage.get<QuotaState>(STORAGE_KEY)) ?? null;
+    });
+  }
+
+  async fetch(request: Request): Promise<Response> {
+    const url = new URL(request.url);
+    if (request.method !== "POST") return new Response("Not found", { status: 404 });
+
+    const now  = Date.now();
+    const body = await request.json<{ policy: QuotaPolicy; tokens?: number; count?: number }>();
+    const current = this.buckets ?? fullQuota(body.policy, now);
+
+    let result: { state: QuotaState; decision: QuotaDecision };
+    if (url.pathname.endsWith("/admit")) {
+      result = admit(current, body.policy, now);
+    } else if (url.pathname.endsWith("/lease")) {
+      result = lease(current, body.policy, Math.max(1, Math.floor(body.count ?? 1)), now);
+    } else if (url.pathname.endsWith("/charge")) {
+      result = charge(current, body.policy, Math.max(0, body.tokens ?? 0), now);
+    } else {
+      return new Response("Not found", { status: 404 });
+    }
+
+    this.buckets = result.state;
+    // Unawaited: the output gate holds the response until this commits
+    void this.state.storage.put(STORAGE_KEY, this.buckets);
+    return Response.json(result.decision);
+  }
+}
@@ -0,0 +1,94 @@
+import type { QuotaDecision, QuotaLease, QuotaPolicy } from '../../domain/llm/Quota';
+import { LruCache } from '../cache/LruCache';
+import type { LlmQuotaDO } from './LlmQuotaDO';
+
+/** Callers remembered as throttled, or holding leased permits, per isolate. */
+const MAX_BLOCKED_CALLERS = 5_000;
+const MAX_LEASED_CALLERS  = 5_000;
+
+/** Each lease takes this share of the caller's request burst (at least one permit). */
+const LEASE_SHARE = 1 / 5;
+/** Leased permits not used within this long are given up. */
+const LEASE_TTL_MS = 10_000;
+
+interface HeldLease {
+  permits:  number;
+  decision: QuotaDecision;
+}
+
+const UNLIMITED: QuotaDecision = {
+  allowed: true, retryAfterMs: 0, remainingRequests: Number.POSITIVE_INFINITY, remainingTokens: Number.POSITIVE_INFINITY,
+};
+
+/**
+ * Isolate-side front of the LlmQuotaDO buckets.
+ *
+ * Admission leases a few request permits per DO round trip and hands the rest
+ * out locally for up to LEASE_TTL_MS, so most requests skip the DO.  The DO
+ * still owns the bucket: an isolate can only spend what it was granted, and
+ * a throttling answer (from a lease or a charge) drops the local permits.
+ * A caller the DO has throttled is remembered locally until its retry time,
+ * so a claw hammering the proxy while over quota is turned away without a
+ * DO round trip.  When the LLM_QUOTA binding is missing every request is
+ * admitted; when the DO call fails the request is admitted too (fail open —
+ * the proxy's own model cooldowns still apply).
+ */
+export class LlmRateLimiter {
+  private readonly blockedUntil = new LruCache<string, number>(MAX_BLOCKED_CALLERS);
+  private readonly leases       = new LruCache<string, HeldLease>(MAX_LEASED_CALLERS);
+
+  constructor(private readonly quotas: DurableObjectNamespace<LlmQuotaDO> | undefined) {}
+
+  async admit(caller: string, policy: QuotaPolicy): Promise<QuotaDecision> {
+    const until = this.blockedUntil.get(caller);
+    if (until !== undefined) {
+      return { allowed: false, retryAfterMs: until - Date.now(), remainingRequests: 0, remainingTokens: 0 };
+    }
+
+    const held = this.leases.get(caller);
+    if (held && held.permits > 0) {
+      held.permits--;
+      return { ...held.decision, remainingRequests: held.decision.remainingRequests + held.permits };
+    }
+
+    const count  = Math.max(1, Math.floor(policy.requests.capacity * LEASE_SHARE));
+    const leased = await this.call(caller, 'lease', { policy, count }) as Partial<QuotaLease> & QuotaDecision;
+    if (!leased.allowed) return leased;
+
+    const decision: QuotaDecision = {
+      allowed:           true,
+      retryAfterMs:      0,
+      remainingRequests: leased.remainingRequests,
+      remainingTokens:   leased.remainingTokens,
+    };
+    // The fail-open answer carries no grant but admits this one request
+    const permits = (leased.granted ?? 1) - 1;
+    if (permits > 0) this.leases.set(caller, { permits, decision }, Date.now() + LEASE_TTL_MS);
+    return { ...decision, remainingRequests: decision.remainingRequests + Math.max(0, permits) };
+  }
+
+  /** Debit a finished completion's tokens.  Intended for `ctx.waitUntil`. */
+  async charge(caller: string, policy: QuotaPolicy, tokens: number): Promise<void> {
+    if (tokens > 0) await this.call(caller, 'charge', { policy, tokens });
+  }
+
+  private async call(caller: string, op: 'lease' | 'charge', body: object): Promise<QuotaDecision> {
+    if (!this.quotas) return UNLIMITED;
+    try {
+      const stub = this.quotas.get(this.quotas.idFromName(caller));
+      const res  = await stub.fetch(`https://quota/${op}`, { method: 'POST', body: JSON.stringify(body) });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const decision = await res.json<QuotaDecision>();
+      if (decision.allowed) {
+        this.blockedUntil.delete(caller);
+      } else {
+        this.blockedUntil.set(caller, Date.now() + decision.retryAfterMs, Date.now() + decision.retryAfterMs);
+        this.leases.delete(caller);
+      }
+      return decision;
+    } catch (err) {
+      console.error(`[llm] quota ${op} failed for ${caller}, admitting`, err);
+      return UNLIMITED;
+    }
+  }
+}
@@ -0,0 +1,21 @@
+import {
+  IModelHealthStore, ModelHealthSnapshot, ModelSample, applySample,
+} from '../../domain/llm/ModelHealth';
+
+/**
+ * Per-isolate model health.  Used when the MODEL_HEALTH Durable Object is
+ * not bound (local dev, tests); every isolate learns model health on its own.
+ */
+export class LocalModelHealthStore implements IModelHealthStore {
+  private stats: ModelHealthSnapshot = {};
+
+  async snapshot(): Promise<ModelHealthSnapshot> {
+    return this.stats;
+  }
+
+  record(sample: ModelSample): void {
+    this.stats = applySample(this.stats, sample);
+  }
+
+  async flush(): Promise<void> {}
+}
@@ -0,0 +1,42 @@
+/**
+ * ModelHealthDO — Cloudflare Durable Object holding the shared per-model
+ * health statistics for the coderClawLLM proxy.
+ *
+ * A single global instance (keyed "global").  Isolates read the snapshot
+ * through a short local cache and POST batches of attempt samples, so every
+ * isolate learns about a broken model from the first one that hits it.
+ *
+ *   GET  /snapshot  → ModelHealthSnapshot
+ *   POST /report    ← ModelSample[]  → merged ModelHealthSnapshot
+ */
+import { ModelHealthSnapshot, ModelSample, applySample } from "../../domain/llm/ModelHealth";
+
+const STORAGE_KEY = "snapshot";
+
+export class ModelHealthDO implements DurableObject {
+  private stats: ModelHealthSnapshot = {};
+
+  constructor(private state: DurableObjectState, private env: unknown) {
+    this.state.blockConcurrencyWhile(async () => {
+      this.stats = (await this.state.storage.get<ModelHealthSnapshot>(STORAGE_KEY)) ?? {};
+    });
+  }
+
+  async fetch(request: Request): Promise<Response> {
+    const url = new URL(request.url);
+
+    if (request.method === "POST" && url.pathname.endsWith("/report")) {
+      const samples = await request.json<ModelSample[]>();
+      this.stats = samples.reduce(applySample, this.stats);
+      // Unawaited: the output gate holds the response until this commits
+      void this.state.storage.put(STORAGE_KEY, this.stats);
+      return Response.json(this.stats);
+    }
+
+    if (request.method === "GET" && url.pathname.endsWith("/snapshot")) {
+      return Response.json(this.stats);
+    }
+
+    return new Response("Not found", { status: 404 });
+  }
+}
@@ -0,0 +1,99 @@
+import {
+  IModelHealthStore, ModelHealthSnapshot, ModelSample, applySample,
+} from '../../domain/llm/ModelHealth';
+import type { ModelHealthDO } from './ModelHealthDO';
+
+/** How long an isolate routes from its cached snapshot before re-reading. */
+const SNAPSHOT_TTL_MS = 5_000;
+
+/** Longest a sample waits in the isolate before it is sent to the DO. */
+const FLUSH_INTERVAL_MS = 2_000;
+
+/** Send at once when this many samples are waiting. */
+const MAX_PENDING_SAMPLES = 100;
+
+/**
+ * Model health shared across isolates through ModelHealthDO.
+ *
+ * Reads are served from a local copy refreshed at most every
+ * SNAPSHOT_TTL_MS.  Samples are applied to the local copy immediately — so
+ * a failing model is avoided by this isolate on the very next request — and
+ * buffered: flush() sends them once the oldest is FLUSH_INTERVAL_MS old (or
+ * MAX_PENDING_SAMPLES are waiting), so the requests of an isolate share one
+ * POST to the single global DO instead of each making its own.  The reply is
+ * the merged snapshot, which also refreshes the local copy.
+ */
+export class SharedModelHealthStore implements IModelHealthStore {
+  private local: ModelHealthSnapshot = {};
+  private fetchedAt = 0;
+  private pending: ModelSample[] = [];
+  private oldestAt = 0;
+  private inflight: Promise<void> | null = null;
+
+  constructor(private readonly namespace: DurableObjectNamespace<ModelHealthDO>) {}
+
+  async snapshot(): Promise<ModelHealthSnapshot> {
+    if (Date.now() - this.fetchedAt < SNAPSHOT_TTL_MS) return this.local;
+    try {
+      const res = await this.stub().fetch('https://model-health/snapshot');
+      this.adopt(await res.json<ModelHealthSnapshot>());
+    } catch {
+      // DO unreachable – keep routing on what we know, retry after the TTL
+      this.fetchedAt = Date.now();
+    }
+    return this.local;
+  }
+
+  record(sample: ModelSample): void {
+    this.local = applySample(this.local, sample);
+    if (this.pending.length === 0) this.oldestAt = Date.now();
+    this.pending.push(sample);
+  }
+
+  /**
+   * Share the buffered samples, waiting until the oldest is
+   * FLUSH_INTERVAL_MS old so concurrent requests share one POST.
+   * Intended for `ctx.waitUntil`.
+   */
+  async flush(): Promise<void> {
+    if (this.pending.length === 0) return this.inflight ?? undefined;
+    if (this.pending.length < MAX_PENDING_SAMPLES) {
+      const waitMs = FLUSH_INTERVAL_MS - (Date.now() - this.oldestAt);
+      if (waitMs > 0) await new Promise((resolve) => setTimeout(resolve, waitMs));
+    }
+    while (this.inflight) await this.inflight;
+    if (this.pending.length === 0) return;
+
+    const batch = this.pending;
+    this.pending = [];
+    this.inflight = this.report(batch).finally(() => { this.inflight = null; });
+    await this.inflight;
+  }
+
+  // ---------------------------------------------------------------------------
+  // Helpers
+  // ---------------------------------------------------------------------------
+
+  private async report(batch: ModelSample[]): Promise<void> {
+    try {
+      const res = await this.stub().fetch('https://model-health/report', {
+        method:  'POST',
+        headers: { 'content-type': 'application/json' },
+        body:    JSON.stringify(batch),
+      });
+      this.adopt(await res.json<ModelHealthSnapshot>());
+    } catch (err) {
+      console.error(`[llm] dropped ${batch.length} model health sample(s)`, err);
+    }
+  }
+
+  private adopt(shared: ModelHealthSnapshot) {
+    // Samples recorded since the batch left are re-applied on top
+    this.local = this.pending.reduce(applySample, shared);
+    this.fetchedAt = Date.now();
+  }
+
+  private stub() {
+    return this.namespace.get(this.namespace.idFromName('global'));
+  }
+}
@@ -0,0 +1,87 @@
+import { LruCache } from '../cache/LruCache';
+
+export interface ClawCredential {
+  apiKeyHash: string;
+  tenantId:   number;
+}
+
+export interface ClawConnectionCacheOptions {
+  /** How long a claw's key hash may be served without re-reading the DB. */
+  credentialTtlMs:    number;
+  /** Minimum gap between connectedAt / lastSeenAt writes for one claw. */
+  presenceIntervalMs: number;
+  /** How long a relay presence answer serves status polls. */
+  liveStatusTtlMs:    number;
+  maxEntries:         number;
+}
+
+export const DEFAULT_CLAW_CONNECTION_CACHE_OPTIONS: ClawConnectionCacheOptions = {
+  credentialTtlMs:    60_000,
+  presenceIntervalMs: 60_000,
+  liveStatusTtlMs:    10_000,
+  maxEntries:         5_000,
+};
+
+/**
+ * Per-isolate hot-path cache for claw upstream connects.
+ *
+ * - Credentials: claw id → (key hash, tenant), so a reconnect only costs a
+ *   SHA-256 instead of a DB round trip.  Invalidate explicitly when a claw is
+ *   deleted or re-keyed; other isolates converge within `credentialTtlMs`.
+ * - Presence: remembers when connectedAt / lastSeenAt was last written so a
+ *   claw that reconnects in a tight loop updates its row at most once per
+ *   `presenceIntervalMs`.  An observed disconnect clears the entry so the
+ *   next connect is always recorded.  Because connects are coalesced, the
+ *   disconnect edge only clears `connectedAt` after ClawRelayDO confirms no
+ *   upstream socket remains, and the live status is read from the relay.
+ * - Live status: the relay's answer is kept for `liveStatusTtlMs`, so polling
+ *   the status endpoint wakes a hibernating ClawRelayDO at most once per
+ *   claw per isolate per TTL, however many pollers there are.
+ */
+export class ClawConnectionCache {
+  private readonly credentials: LruCache<number, ClawCredential>;
+  private readonly presence:    LruCache<number, true>;
+  private readonly liveStatus:  LruCache<number, boolean>;
+
+  constructor(private readonly opts: ClawConnectionCacheOptions = DEFAULT_CLAW_CONNECTION_CACHE_OPTIONS) {
+    this.credentials = new LruCache(opts.maxEntries);
+    this.presence    = new LruCache(opts.maxEntries);
+    this.liveStatus  = new LruCache(opts.maxEntries);
+  }
+
+  getCredential(clawId: number): ClawCredential | undefined {
+    return this.credentials.get(clawId);
+  }
+
+  setCredential(clawId: number, credential: ClawCredential): void {
+    this.credentials.set(clawId, credential, Date.now() + this.opts.credentialTtlMs);
+  }
+
+  /** Drop everything cached for a claw (deleted, re-keyed, or failed auth). */
+  invalidate(clawId: number): void {
+    this.credentials.delete(clawId);
+    this.presence.delete(clawId);
+    this.liveStatus.delete(clawId);
+  }
+
+  /** Recent relay presence answer for a claw, if still fresh. */
+  getLiveStatus(clawId: number): boolean | undefined {
+    return this.liveStatus.get(clawId);
+  }
+
+  setLiveStatus(clawId: number, online: boolean): void {
+    this.liveStatus.set(clawId, online, Date.now() + this.opts.liveStatusTtlMs);
+  }
+
+  /** True if this connect should be written to the DB; false if coalesced. */
+  shouldRecordConnect(clawId: number): boolean {
+    if (this.presence.get(clawId)) return false;
+    this.presence.set(clawId, true, Date.now() + this.opts.presenceIntervalMs);
+    return true;
+  }
+
+  recordDisconnect(clawId: number): void {
+    this.presence.delete(clawId);
+    this.liveStatus.delete(clawId);
+  }
+}
@@ -6,134 +6,513 @@
  *
  * Lifecycle:
  *   1. CoderClaw connects to /api/claws/:id/upstream (claw API key auth)
- *      → stored as upstreamSocket
+ *      → hibernatable socket tagged "upstream"
  *   2. Browser clients connect to /api/claws/:id/ws (tenant JWT auth)
- *      → added to clientSockets set
- *   3. Messages from CoderClaw → broadcast to all clientSockets
- *   4. Messages from any client → forwarded to upstreamSocket
+ *      → hibernatable socket tagged "client"
+ *   3. Messages from CoderClaw → batched, then broadcast to all clients
+ *   4. Messages from any client → forwarded to the upstream socket
  *   5. When CoderClaw disconnects → send { type:"claw_offline" } to clients
+ *
+ * Execution dispatch: the tenant's ExecutionDispatcherDO is told when the
+ * upstream connects and disconnects, delivers `execution.dispatch` frames
+ * through POST /dispatch, and receives the claw's `execution.ack|heartbeat|
+ * reject|result` replies instead of them being broadcast to clients.
+ *
+ * Sockets are accepted through the Hibernation API and `{type:"ping"}` is
+ * answered by the runtime's auto-response, so an idle claw costs no DO
+ * duration.  Upstream output that arrives within `batchWindowMs` is sent to
+ * clients as one `{ type:"relay_batch", seq, messages:[...] }` frame, where
+ * `seq` numbers the first message.  Each client gets a byte budget per
+ * window; frames over budget are dropped and the client is told how many
+ * with `{ type:"relay_dropped", count }`.
+ *
+ * The last HISTORY_SIZE upstream messages are kept in a ring buffer in DO
+ * storage.  Writes are coalesced: flushed batches collect in memory and are
+ * committed once PERSIST_INTERVAL_MS has passed or a storage batch is full.
+ * A client that connects with `?last_seq=N` is replayed everything after N
+ * that is still buffered, then sent `{ type:"relay_sync", seq }`, so late
+ * joiners never have to ask the claw to resend.  When N has fallen out of the
+ * ring or is unknown to this DO, the re-base frame carries `expired: true` so
+ * the client knows the replay has a hole and must re-request state.
  */
+
+import type { ExecutionDispatcherDO } from "../dispatch/ExecutionDispatcherDO";
+
+const UPSTREAM_TAG = "upstream";
+const CLIENT_TAG   = "client";
+
+const PING = JSON.stringify({ type: "ping" });
+const PONG = JSON.stringify({ type: "pong" });
+
+/** Claw replies that belong to the dispatcher rather than to browser clients. */
+const DISPATCH_REPLIES = new Set([
+  "execution.ack", "execution.heartbeat", "execution.reject", "execution.result",
+]);
+
+interface UpstreamAttachment {
+  clawId:   number;
+  tenantId: number;
+}
+
+interface RelayEnv {
+  EXECUTION_DISPATCHER?: DurableObjectNamespace<ExecutionDispatcherDO>;
+}
+
+export interface RelayLimits {
+  /** How long upstream output is held to be sent as one batch. */
+  batchWindowMs:        number;
+  /** A batch is flushed early once it holds this many messages. */
+  maxBatchMessages:     number;
+  /** Bytes a single client may be sent per budget window. */
+  clientBudgetBytes:    number;
+  clientBudgetWindowMs: number;
+}
+
+export const DEFAULT_RELAY_LIMITS: RelayLimits = {
+  batchWindowMs:        16,
+  maxBatchMessages:     64,
+  clientBudgetBytes:    1024 * 1024,
+  clientBudgetWindowMs: 1000,
+};
+
+/** Fan-out latency samples kept for the percentile snapshot. */
+const LATENCY_SAMPLES = 256;
+
+/** Upstream messages kept for replay, in storage slots `msg:<seq % size>`. */
+const HISTORY_SIZE = 256;
+/** Larger messages are relayed live but not kept for replay. */
+const MAX_HISTORY_BYTES = 64 * 1024;
+/** DO storage accepts at most 128 keys per get/put. */
+const STORAGE_BATCH = 128;
+/** Longest that flushed history may sit in memory before it is written. */
+const PERSIST_INTERVAL_MS = 1_000;
+
+interface HistoryEntry {
+  seq:  number;
+  data: string | null; // null: too large to keep
+}
+
+export interface RelayMetrics {
+  upstreamMessages: number;
+  batchesSent:      number;
+  framesSent:       number;
+  framesDropped:    number;
+  clients:          number;
+  upstreamOnline:   boolean;
+  /** Time from upstream arrival to client delivery, over recent flushes. */
+  fanoutLatencyMs:  { p50: number; p95: number; max: number; samples: number };
+}
+
+interface ClientBudget {
+  windowStart: number;
+  bytes:       number;
+  dropped:     number;
+}
+
+interface PendingMessage {
+  data:       string;
+  receivedAt: number;
+}
+
 export class ClawRelayDO implements DurableObject {
-  private upstreamSocket: WebSocket | null = null;
-  private clientSockets: Set<WebSocket> = new Set();
-  private pingInterval: ReturnType<typeof setInterval> | null = null;
+  private readonly limits: RelayLimits = DEFAULT_RELAY_LIMITS;
+
+  // In-memory only: budgets and counters reset when the DO hibernates,
+  // which only happens once the relay is idle anyway.
+  private budgets = new WeakMap<WebSocket, ClientBudget>();
+  private pending: PendingMessage[] = [];
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  // History slots flushed to clients but not yet written to storage
+  private unpersisted = new Map<string, HistoryEntry>();
+  private persistTimer: ReturnType<typeof setTimeout> | null = null;
+  private latencies: number[] = [];
+  private counters = { upstreamMessages: 0, batchesSent: 0, framesSent: 0, framesDropped: 0 };
 
-  constructor(private state: DurableObjectState, private env: unknown) {}
+  /** Sequence number of the last flushed upstream message. */
+  private seq = 0;
+
+  constructor(private state: DurableObjectState, private env: RelayEnv) {
+    this.state.setWebSocketAutoResponse(new WebSocketRequestResponsePair(PING, PONG));
+    this.state.blockConcurrencyWhile(async () => {
+      this.seq = (await this.state.storage.get<number>("seq")) ?? 0;
+    });
+  }
 
   async fetch(request: Request): Promise<Response> {
     const url = new URL(request.url);
-    const role = url.searchParams.get("role"); // "upstream" | "client"
+
+    if (request.method === "GET" && url.pathname.endsWith("/metrics")) {
+      return Response.json(this.metrics());
+    }
+
+    // Every upstream socket lands here, so this is the authoritative presence
+    if (request.method === "GET" && url.pathname.endsWith("/presence")) {
+      return Response.json({ online: this.upstream() !== null });
+    }
+
+    // Execution frames from the dispatcher go straight to the claw
+    if (request.method === "POST" && url.pathname.endsWith("/dispatch")) {
+      const upstream = this.upstream();
+      if (!upstream) return Response.json({ error: "claw_offline" }, { status: 409 });
+      upstream.send(await request.text());
+      return Response.json({ ok: true });
+    }
 
     if (request.headers.get("Upgrade") !== "websocket") {
       return new Response("Expected WebSocket upgrade", { status: 426 });
     }
 
+    const role = url.searchParams.get("role"); // "upstream" | "client"
     const { 0: client, 1: server } = new WebSocketPair();
-    server.accept();
 
     if (role === "upstream") {
-      this.attachUpstream(server);
+      this.attachUpstream(server, {
+        clawId:   Number(url.searchParams.get("claw")),
+        tenantId: Number(url.searchParams.get("tenant")),
+      });
     } else {
-      this.attachClient(server);
+      const lastSeq = url.searchParams.get("last_seq");
+      await this.attachClient(server, lastSeq === null ? null : Number(lastSeq));
     }
 
     return new Response(null, { status: 101, webSocket: client });
   }
 
   // ---------------------------------------------------------------------------
-  // Upstream (CoderClaw instance)
+  // Hibernation handlers
   // ---------------------------------------------------------------------------
 
-  private attachUpstream(ws: WebSocket) {
-    // Close any existing upstream connection
-    if (this.upstreamSocket) {
-      try { this.upstreamSocket.close(1001, "replaced"); } catch { /* ignore */ }
+  async webSocketMessage(ws: WebSocket, message: string | ArrayBuffer): Promise<void> {
+    const data = typeof message === "string" ? message : new TextDecoder().decode(message);
+
+    if (this.state.getTags(ws).includes(UPSTREAM_TAG)) {
+      const reply = data.includes('"execution.') ? dispatchReply(data) : null;
+      if (reply) {
+        await this.notifyDispatcher(ws, "claw-message", { message: reply });
+      } else {
+        this.enqueue(data);
+      }
+      return;
     }
-    this.upstreamSocket = ws;
-    this.schedulePings();
 
-    ws.addEventListener("message", (ev) => {
-      // Broadcast every upstream message to all connected clients
-      this.broadcast(ev.data as string);
-    });
+    // Forward client messages to the upstream claw
+    const upstream = this.upstream();
+    if (upstream) {
+      upstream.send(data);
+    } else {
+      ws.send(JSON.stringify({ type: "claw_offline" }));
+    }
+  }
 
-    ws.addEventListener("close", () => {
-      if (this.upstreamSocket === ws) {
-        this.upstreamSocket = null;
-        this.clearPings();
-        // Notify all clients that the claw went offline
-        this.broadcast(JSON.stringify({ type: "claw_offline" }));
-      }
-    });
+  async webSocketClose(ws: WebSocket, code: number, reason: string): Promise<void> {
+    try { ws.close(code, reason); } catch { /* already closed */ }
+
+    // A replaced upstream closes after its successor is attached – only
+    // report offline when no other upstream socket remains.
+    if (this.state.getTags(ws).includes(UPSTREAM_TAG) && !this.upstream(ws)) {
+      this.flush();
+      this.broadcastControl(JSON.stringify({ type: "claw_offline" }));
+      await this.notifyDispatcher(ws, "claw-offline");
+    }
+  }
 
-    ws.addEventListener("error", () => { /* close follows */ });
+  async webSocketError(ws: WebSocket): Promise<void> {
+    await this.webSocketClose(ws, 1011, "error");
+  }
+
+  // ---------------------------------------------------------------------------
+  // Upstream (CoderClaw instance)
+  // ---------------------------------------------------------------------------
+
+  private attachUpstream(ws: WebSocket, attachment: UpstreamAttachment) {
+    // Close any existing upstream connection
+    for (const existing of this.state.getWebSockets(UPSTREAM_TAG)) {
+      try { existing.close(1001, "replaced"); } catch { /* ignore */ }
+    }
+    this.state.acceptWebSocket(ws, [UPSTREAM_TAG]);
+    // Survives hibernation, so close and message handlers know whose socket it is
+    ws.serializeAttachment(attachment);
 
     // Tell the claw it is connected
     ws.send(JSON.stringify({ type: "relay_connected" }));
 
     // Notify any waiting clients that the claw is now online
-    this.broadcast(JSON.stringify({ type: "claw_online" }));
+    this.broadcastControl(JSON.stringify({ type: "claw_online" }));
+
+    // Queued executions can now be pushed to this claw
+    this.state.waitUntil(this.notifyDispatcher(ws, "claw-online"));
+  }
+
+  private upstream(except?: WebSocket): WebSocket | null {
+    for (const ws of this.state.getWebSockets(UPSTREAM_TAG)) {
+      if (ws !== except && ws.readyState === WebSocket.OPEN) return ws;
+    }
+    return null;
+  }
+
+  /** Best-effort: the dispatcher's lease timeouts cover anything lost here. */
+  private async notifyDispatcher(ws: WebSocket, op: string, body: object = {}) {
+    const namespace  = this.env.EXECUTION_DISPATCHER;
+    const attachment = ws.deserializeAttachment() as UpstreamAttachment | null;
+    if (!namespace || !attachment?.tenantId) return;
+
+    const stub = namespace.get(namespace.idFromName(String(attachment.tenantId)));
+    try {
+      await stub.fetch(`https://dispatcher/${op}`, {
+        method: "POST",
+        body:   JSON.stringify({ ...attachment, ...body }),
+      });
+    } catch (err) {
+      console.error(`[relay] dispatcher ${op} failed`, err);
+    }
   }
 
   // ---------------------------------------------------------------------------
   // Clients (browser sessions)
   // ---------------------------------------------------------------------------
 
-  private attachClient(ws: WebSocket) {
-    this.clientSockets.add(ws);
+  private async attachClient(ws: WebSocket, lastSeq: number | null) {
+    // Read the replay before accepting so nothing flushed meanwhile is missed
+    const replay = lastSeq !== null && Number.isFinite(lastSeq)
+      ? await this.readHistorySince(lastSeq)
+      : null;
+
+    this.state.acceptWebSocket(ws, [CLIENT_TAG]);
 
     // Immediately tell the client whether the claw is connected
-    if (this.upstreamSocket === null) {
-      ws.send(JSON.stringify({ type: "claw_offline" }));
-    } else {
-      ws.send(JSON.stringify({ type: "claw_online" }));
+    ws.send(JSON.stringify({ type: this.upstream() ? "claw_online" : "claw_offline" }));
+
+    if (replay) {
+      // Re-base the client first in case our history was reset under it
+      ws.send(JSON.stringify(replay.expired
+        ? { type: "relay_sync", seq: replay.from - 1, expired: true }
+        : { type: "relay_sync", seq: replay.from - 1 }));
+      if (replay.missed > 0) {
+        ws.send(JSON.stringify({ type: "relay_dropped", count: replay.missed }));
+      }
+      for (let i = 0; i < replay.entries.length; i += this.limits.maxBatchMessages) {
+        const chunk = replay.entries.slice(i, i + this.limits.maxBatchMessages);
+        const first = chunk[0];
+        if (!first) continue;
+        ws.send(JSON.stringify({
+          type:     "relay_batch",
+          seq:      first.seq,
+          messages: chunk.map((e) => e.data),
+        }));
+      }
     }
+    ws.send(JSON.stringify({ type: "relay_sync", seq: this.seq }));
+  }
 
-    ws.addEventListener("message", (ev) => {
-      // Forward client messages to the upstream claw
-      if (this.upstreamSocket?.readyState === WebSocket.OPEN) {
-        this.upstreamSocket.send(ev.data as string);
-      } else {
-        ws.send(JSON.stringify({ type: "claw_offline" }));
+  // ---------------------------------------------------------------------------
+  // Replay history
+  // ---------------------------------------------------------------------------
+
+  /**
+   * Buffered messages after `lastSeq`, plus how many were lost because they
+   * fell out of the ring or were too large to keep.  `expired` is set when
+   * `lastSeq` is unknown here or older than the ring.  Keeps reading until it
+   * has caught up with `this.seq`, which may advance between storage reads.
+   */
+  private async readHistorySince(lastSeq: number): Promise<{
+    from:    number;
+    entries: { seq: number; data: string }[];
+    missed:  number;
+    expired: boolean;
+  }> {
+    const entries: { seq: number; data: string }[] = [];
+    let missed = 0;
+
+    // A last_seq ahead of ours means this DO's history was reset – start over
+    let expired = lastSeq > this.seq;
+    const from  = expired ? 1 : Math.max(1, lastSeq + 1);
+    let next = from;
+    while (next <= this.seq) {
+      const oldest = Math.max(1, this.seq - HISTORY_SIZE + 1);
+      if (next < oldest) {
+        missed += oldest - next;
+        next    = oldest;
+        expired = true;
       }
-    });
 
-    ws.addEventListener("close", () => {
-      this.clientSockets.delete(ws);
+      const end  = Math.min(this.seq, next + STORAGE_BATCH - 1);
+      const keys: string[] = [];
+      for (let seq = next; seq <= end; seq++) keys.push(historyKey(seq));
+      // Staged slots may be committed (and the map replaced) during the read
+      const staged = this.unpersisted;
+      const found  = await this.state.storage.get<HistoryEntry>(keys);
+
+      for (let seq = next; seq <= end; seq++) {
+        const key   = historyKey(seq);
+        const entry = [staged.get(key), this.unpersisted.get(key), found.get(key)]
+          .find((e) => e?.seq === seq);
+        if (entry && entry.data !== null) {
+          entries.push({ seq, data: entry.data });
+        } else {
+          missed++;
+        }
+      }
+      next = end + 1;
+    }
+    return { from, entries, missed, expired };
+  }
+
+  /** Stage a flushed batch; storage is written by `commitHistory`. */
+  private persist(batch: PendingMessage[], firstSeq: number) {
+    batch.forEach((m, i) => {
+      const seq = firstSeq + i;
+      this.unpersisted.set(historyKey(seq), { seq, data: m.data.length > MAX_HISTORY_BYTES ? null : m.data });
+      // Leave room for the "seq" key in the same put
+      if (this.unpersisted.size >= STORAGE_BATCH - 1) this.commitHistory();
     });
+    if (this.unpersisted.size > 0 && this.persistTimer === null) {
+      this.persistTimer = setTimeout(() => this.commitHistory(), PERSIST_INTERVAL_MS);
+    }
+  }
 
-    ws.addEventListener("error", () => { /* close follows */ });
+  private commitHistory() {
+    if (this.persistTimer !== null) {
+      clearTimeout(this.persistTimer);
+      this.persistTimer = null;
+    }
+    if (this.unpersisted.size === 0) return;
+
+    // Everything flushed so far is staged, so `this.seq` is consistent with it
+    const writes: Record<string, HistoryEntry | number> = { seq: this.seq };
+    for (const [key, entry] of this.unpersisted) writes[key] = entry;
+    this.unpersisted = new Map();
+    // Unawaited: one put per interval instead of one per flushed batch
+    void this.state.storage.put(writes);
   }
 
   // ---------------------------------------------------------------------------
-  // Helpers
+  // Batching and fan-out
   // ---------------------------------------------------------------------------
 
-  private broadcast(data: string) {
-    const dead: WebSocket[] = [];
-    for (const ws of this.clientSockets) {
+  private enqueue(data: string) {
+    this.counters.upstreamMessages++;
+    this.pending.push({ data, receivedAt: Date.now() });
+
+    if (this.pending.length >= this.limits.maxBatchMessages) {
+      this.flush();
+    } else if (this.flushTimer === null) {
+      this.flushTimer = setTimeout(() => this.flush(), this.limits.batchWindowMs);
+    }
+  }
+
+  private flush() {
+    if (this.flushTimer !== null) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    const batch = this.pending;
+    const first = batch[0];
+    if (!first) return;
+    this.pending = [];
+
+    const firstSeq = this.seq + 1;
+    this.seq += batch.length;
+    this.persist(batch, firstSeq);
+
+    const frame = JSON.stringify({
+      type:     "relay_batch",
+      seq:      firstSeq,
+      messages: batch.map((m) => m.data),
+    });
+
+    const now = Date.now();
+    for (const ws of this.state.getWebSockets(CLIENT_TAG)) {
+      this.deliver(ws, frame, now);
+    }
+    this.counters.batchesSent++;
+    this.recordLatency(now - first.receivedAt);
+  }
+
+  /** Send a data frame to one client, respecting its byte budget. */
+  private deliver(ws: WebSocket, frame: string, now: number) {
+    const budget = this.budgetFor(ws, now);
+    if (budget.bytes + frame.length > this.limits.clientBudgetBytes) {
+      budget.dropped++;
+      this.counters.framesDropped++;
+      return;
+    }
+
+    try {
+      if (budget.dropped > 0) {
+        ws.send(JSON.stringify({ type: "relay_dropped", count: budget.dropped }));
+        budget.dropped = 0;
+      }
+      ws.send(frame);
+      budget.bytes += frame.length;
+      this.counters.framesSent++;
+    } catch {
+      /* socket is closing – webSocketClose cleans up */
+    }
+  }
+
+  private budgetFor(ws: WebSocket, now: number): ClientBudget {
+    let budget = this.budgets.get(ws);
+    if (!budget) {
+      budget = { windowStart: now, bytes: 0, dropped: 0 };
+      this.budgets.set(ws, budget);
+    } else if (now - budget.windowStart >= this.limits.clientBudgetWindowMs) {
+      budget.windowStart = now;
+      budget.bytes       = 0;
+    }
+    return budget;
+  }
+
+  /** Control frames (online/offline) are small and always delivered. */
+  private broadcastControl(data: string) {
+    for (const ws of this.state.getWebSockets(CLIENT_TAG)) {
       try {
         ws.send(data);
       } catch {
-        dead.push(ws);
+        /* socket is closing – webSocketClose cleans up */
       }
     }
-    for (const ws of dead) this.clientSockets.delete(ws);
   }
 
-  private schedulePings() {
-    this.clearPings();
-    this.pingInterval = setInterval(() => {
-      if (this.upstreamSocket?.readyState === WebSocket.OPEN) {
-        this.upstreamSocket.send(JSON.stringify({ type: "ping" }));
-      }
-    }, 30_000);
+  // ---------------------------------------------------------------------------
+  // Metrics
+  // ---------------------------------------------------------------------------
+
+  private recordLatency(ms: number) {
+    this.latencies.push(ms);
+    if (this.latencies.length > LATENCY_SAMPLES) this.latencies.shift();
   }
 
-  private clearPings() {
-    if (this.pingInterval !== null) {
-      clearInterval(this.pingInterval);
-      this.pingInterval = null;
-    }
+  private metrics(): RelayMetrics {
+    const sorted = [...this.latencies].sort((a, b) => a - b);
+    const pct = (p: number) =>
+      sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))] ?? 0;
+
+    return {
+      ...this.counters,
+      clients:         this.state.getWebSockets(CLIENT_TAG).length,
+      upstreamOnline:  this.upstream() !== null,
+      fanoutLatencyMs: {
+        p50:     pct(0.5),
+        p95:     pct(0.95),
+        max:     sorted[sorted.length - 1] ?? 0,
+        samples: sorted.length,
+      },
+    };
   }
 }
+
+/** The parsed frame if `data` is a claw reply to a dispatched execution. */
+function dispatchReply(data: string): { type: string } | null {
+  try {
+    const parsed = JSON.parse(data) as { type?: unknown };
+    return typeof parsed.type === "string" && DISPATCH_REPLIES.has(parsed.type)
+      ? (parsed as { type: string })
+      : null;
+  } catch {
+    return null;
+  }
+}
+
+function historyKey(seq: number): string {
+  return `msg:${seq % HISTORY_SIZE}`;
+}
@@ -1,4 +1,4 @@
-import { eq } from 'drizzle-orm';
+import { eq, inArray } from 'drizzle-orm';
 import { IAgentRepository } from '../../domain/agent/IAgentRepository';
 import { Agent, AgentProps } from '../../domain/agent/Agent';
 import { AgentId, TenantId, AgentType, asAgentId, asTenantId } from '../../domain/shared/types';
@@ -15,6 +15,14 @@ export class AgentRepository implements IAgentRepository {
     return row ? toDomain(row) : null;
   }
 
+  async findByIds(ids: AgentId[]): Promise<Agent[]> {
+    if (ids.length === 0) return [];
+    const rows = await this.db
+      .select().from(agentsTable)
+      .where(inArray(agentsTable.id, ids));
+    return rows.map(toDomain);
+  }
+
   async findAllByTenant(tenantId: TenantId): Promise<Agent[]> {
     const rows = await this.db
       .select().from(agentsTable)
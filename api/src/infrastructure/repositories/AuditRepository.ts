@@ -1,31 +1,30 @@
-import { eq, and } from 'drizzle-orm';
+import { eq, and, gte, lt, inArray, desc, getTableColumns } from 'drizzle-orm';
 import { IAuditRepository, AuditQueryOptions } from '../../domain/audit/IAuditRepository';
 import { AuditEvent, AuditEventProps } from '../../domain/audit/AuditEvent';
 import { TenantId, AuditEventType, asTenantId } from '../../domain/shared/types';
 import { auditEvents as auditTable } from '../database/schema';
 import type { Db } from '../database/connection';
+import { cursorText, olderThan, toPage } from '../database/keyset';
+import { Page } from '../../domain/shared/pagination';
 
 export class AuditRepository implements IAuditRepository {
   constructor(private readonly db: Db) {}
 
   async save(event: AuditEvent): Promise<AuditEvent> {
-    const plain = event.toPlain();
     const [inserted] = await this.db
       .insert(auditTable)
-      .values({
-        tenantId:     plain.tenantId ?? undefined,
-        userId:       plain.userId ?? undefined,
-        eventType:    plain.eventType,
-        resourceType: plain.resourceType ?? undefined,
-        resourceId:   plain.resourceId ?? undefined,
-        metadata:     plain.metadata ?? undefined,
-      })
+      .values(toRow(event))
       .returning();
     if (!inserted) throw new Error('Audit insert returned no rows');
     return toDomain(inserted);
   }
 
-  async query(opts: AuditQueryOptions): Promise<AuditEvent[]> {
+  async saveMany(events: AuditEvent[]): Promise<void> {
+    if (events.length === 0) return;
+    await this.db.insert(auditTable).values(events.map(toRow));
+  }
+
+  async query(opts: AuditQueryOptions): Promise<Page<AuditEvent>> {
     const conditions = [];
     if (opts.tenantId !== undefined) {
       conditions.push(eq(auditTable.tenantId, opts.tenantId));
@@ -33,18 +32,51 @@ export class AuditRepository implements IAuditRepository {
     if (opts.userId !== undefined) {
       conditions.push(eq(auditTable.userId, opts.userId));
     }
+    if (opts.eventTypes !== undefined && opts.eventTypes.length > 0) {
+      conditions.push(inArray(auditTable.eventType, opts.eventTypes));
+    }
+    if (opts.resourceType !== undefined) {
+      conditions.push(eq(auditTable.resourceType, opts.resourceType));
+    }
+    if (opts.resourceId !== undefined) {
+      conditions.push(eq(auditTable.resourceId, opts.resourceId));
+    }
+    if (opts.since !== undefined) {
+      conditions.push(gte(auditTable.createdAt, opts.since));
+    }
+    if (opts.until !== undefined) {
+      conditions.push(lt(auditTable.createdAt, opts.until));
+    }
+    if (opts.cursor !== undefined) {
+      conditions.push(olderThan(auditTable.createdAt, auditTable.id, opts.cursor));
+    }
 
-    const query = this.db
-      .select().from(auditTable)
+    // Newest first, with id as a tie-breaker so paging is stable.
+    const limit = opts.limit ?? 100;
+    const rows = await this.db
+      .select({ ...getTableColumns(auditTable), cursorTs: cursorText(auditTable.createdAt) })
+      .from(auditTable)
       .where(conditions.length > 0 ? and(...conditions) : undefined)
-      .limit(opts.limit ?? 100)
-      .offset(opts.offset ?? 0);
+      .orderBy(desc(auditTable.createdAt), desc(auditTable.id))
+      .limit(limit + 1);
 
-    const rows = await query;
-    return rows.map(toDomain);
+    return toPage(rows, limit, toDomain);
   }
 }
 
+function toRow(event: AuditEvent): typeof auditTable.$inferInsert {
+  const plain = event.toPlain();
+  return {
+    tenantId:     plain.tenantId ?? undefined,
+    userId:       plain.userId ?? undefined,
+    eventType:    plain.eventType,
+    resourceType: plain.resourceType ?? undefined,
+    resourceId:   plain.resourceId ?? undefined,
+    metadata:     plain.metadata ?? undefined,
+    createdAt:    plain.createdAt,
+  };
+}
+
 function toDomain(row: typeof auditTable.$inferSelect): AuditEvent {
   return AuditEvent.reconstitute({
     id:           row.id,
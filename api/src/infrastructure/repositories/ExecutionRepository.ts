@@ -1,5 +1,5 @@
-import { eq } from 'drizzle-orm';
-import { IExecutionRepository } from '../../domain/execution/IExecutionRepository';
+import { eq, and, count, inArray, desc, getTableColumns } from 'drizzle-orm';
+import { ExecutionChange, IExecutionRepository } from '../../domain/execution/IExecutionRepository';
 import { Execution, ExecutionProps } from '../../domain/execution/Execution';
 import {
   ExecutionId, TaskId, TenantId, AgentId, ExecutionStatus,
@@ -7,6 +7,14 @@ import {
 } from '../../domain/shared/types';
 import { executions as executionsTable } from '../database/schema';
 import type { Db } from '../database/connection';
+import { cursorText, olderThan, toPage } from '../database/keyset';
+import { Cursor, Page } from '../../domain/shared/pagination';
+
+const ACTIVE_STATUSES = [
+  ExecutionStatus.PENDING,
+  ExecutionStatus.SUBMITTED,
+  ExecutionStatus.RUNNING,
+];
 
 export class ExecutionRepository implements IExecutionRepository {
   constructor(private readonly db: Db) {}
@@ -18,41 +26,97 @@ export class ExecutionRepository implements IExecutionRepository {
     return row ? toDomain(row) : null;
   }
 
-  async findByTask(taskId: TaskId): Promise<Execution[]> {
+  async findByIds(ids: ExecutionId[]): Promise<Execution[]> {
+    if (ids.length === 0) return [];
     const rows = await this.db
       .select().from(executionsTable)
-      .where(eq(executionsTable.taskId, taskId));
+      .where(inArray(executionsTable.id, ids));
     return rows.map(toDomain);
   }
 
-  async findByTenant(tenantId: TenantId, limit = 50): Promise<Execution[]> {
+  async findByTask(taskId: TaskId): Promise<Execution[]> {
     const rows = await this.db
       .select().from(executionsTable)
-      .where(eq(executionsTable.tenantId, tenantId))
-      .limit(limit);
+      .where(eq(executionsTable.taskId, taskId))
+      .orderBy(desc(executionsTable.createdAt), desc(executionsTable.id));
     return rows.map(toDomain);
   }
 
+  async findByTenant(tenantId: TenantId, limit = 50, cursor?: Cursor): Promise<Page<Execution>> {
+    const conditions = [eq(executionsTable.tenantId, tenantId)];
+    if (cursor) conditions.push(olderThan(executionsTable.createdAt, executionsTable.id, cursor));
+
+    const rows = await this.db
+      .select({ ...getTableColumns(executionsTable), cursorTs: cursorText(executionsTable.createdAt) })
+      .from(executionsTable)
+      .where(and(...conditions))
+      .orderBy(desc(executionsTable.createdAt), desc(executionsTable.id))
+      .limit(limit + 1);
+    return toPage(rows, limit, toDomain);
+  }
+
+  async countActive(tenantId: TenantId, agentId?: AgentId): Promise<number> {
+    const conditions = [
+      eq(executionsTable.tenantId, tenantId),
+      inArray(executionsTable.status, ACTIVE_STATUSES),
+    ];
+    if (agentId !== undefined) conditions.push(eq(executionsTable.agentId, agentId));
+
+    const [row] = await this.db
+      .select({ value: count() })
+      .from(executionsTable)
+      .where(and(...conditions));
+    return Number(row?.value ?? 0);
+  }
+
+  async countActiveByAgent(tenantId: TenantId): Promise<Map<AgentId | null, number>> {
+    const rows = await this.db
+      .select({ agentId: executionsTable.agentId, value: count() })
+      .from(executionsTable)
+      .where(and(
+        eq(executionsTable.tenantId, tenantId),
+        inArray(executionsTable.status, ACTIVE_STATUSES),
+      ))
+      .groupBy(executionsTable.agentId);
+    return new Map(rows.map((r) => [r.agentId != null ? asAgentId(r.agentId) : null, Number(r.value)]));
+  }
+
   async save(execution: Execution): Promise<Execution> {
-    const plain = execution.toPlain();
     const [inserted] = await this.db
       .insert(executionsTable)
-      .values({
-        taskId:      plain.taskId,
-        agentId:     plain.agentId ?? undefined,
-        tenantId:    plain.tenantId,
-        submittedBy: plain.submittedBy,
-        status:      plain.status,
-        payload:     plain.payload ?? undefined,
-      })
+      .values(insertValues(execution))
       .returning();
     if (!inserted) throw new Error('Execution insert returned no rows');
     return toDomain(inserted);
   }
 
-  async update(execution: Execution): Promise<Execution> {
+  async saveMany(executions: Execution[]): Promise<Execution[]> {
+    if (executions.length === 0) return [];
+    // Postgres returns the rows of a single multi-row INSERT in VALUES order
+    const inserted = await this.db
+      .insert(executionsTable)
+      .values(executions.map(insertValues))
+      .returning();
+    if (inserted.length !== executions.length) throw new Error('Execution insert returned too few rows');
+    return inserted.map(toDomain);
+  }
+
+  async update(execution: Execution, from: ExecutionStatus): Promise<Execution | null> {
+    const [updated] = await this.updateQuery({ execution, from });
+    return updated ? toDomain(updated) : null;
+  }
+
+  async updateMany(changes: ExecutionChange[]): Promise<Array<Execution | null>> {
+    const [first, ...rest] = changes.map((c) => this.updateQuery(c));
+    if (!first) return [];
+    // One HTTP round trip, run by Neon as a single transaction
+    const results = await this.db.batch([first, ...rest]);
+    return results.map(([updated]) => (updated ? toDomain(updated) : null));
+  }
+
+  private updateQuery({ execution, from }: ExecutionChange) {
     const plain = execution.toPlain();
-    const [updated] = await this.db
+    return this.db
       .update(executionsTable)
       .set({
         status:       plain.status,
@@ -62,13 +126,24 @@ export class ExecutionRepository implements IExecutionRepository {
         completedAt:  plain.completedAt ?? undefined,
         updatedAt:    new Date(),
       })
-      .where(eq(executionsTable.id, plain.id))
+      // Compare-and-set: a concurrent transition makes this a no-op
+      .where(and(eq(executionsTable.id, plain.id), eq(executionsTable.status, from)))
       .returning();
-    if (!updated) throw new Error('Execution update returned no rows');
-    return toDomain(updated);
   }
 }
 
+function insertValues(execution: Execution): typeof executionsTable.$inferInsert {
+  const plain = execution.toPlain();
+  return {
+    taskId:      plain.taskId,
+    agentId:     plain.agentId ?? undefined,
+    tenantId:    plain.tenantId,
+    submittedBy: plain.submittedBy,
+    status:      plain.status,
+    payload:     plain.payload ?? undefined,
+  };
+}
+
 function toDomain(row: typeof executionsTable.$inferSelect): Execution {
   return Execution.reconstitute({
     id:           asExecutionId(row.id),
@@ -0,0 +1,90 @@
+import { and, eq, isNull, sql } from 'drizzle-orm';
+import {
+  IRefreshTokenRepository,
+  NewRefreshToken,
+  RefreshSession,
+} from '../../domain/auth/IRefreshTokenRepository';
+import { TenantRole, UserId } from '../../domain/shared/types';
+import { refreshTokens, tenantMembers, users } from '../database/schema';
+import type { Db } from '../database/connection';
+
+export class RefreshTokenRepository implements IRefreshTokenRepository {
+  constructor(private readonly db: Db) {}
+
+  async findSession(tokenHash: string, tenantId: number | null): Promise<RefreshSession | null> {
+    const [row] = await this.db
+      .select({
+        id:        refreshTokens.id,
+        familyId:  refreshTokens.familyId,
+        expiresAt: refreshTokens.expiresAt,
+        revokedAt: refreshTokens.revokedAt,
+        userId:    users.id,
+        email:     users.email,
+        username:  users.username,
+        role:      tenantMembers.role,
+      })
+      .from(refreshTokens)
+      .innerJoin(users, eq(users.id, refreshTokens.userId))
+      // Serial tenant ids start at 1, so `0` joins nothing when no tenant is asked for
+      .leftJoin(tenantMembers, and(
+        eq(tenantMembers.userId, refreshTokens.userId),
+        eq(tenantMembers.tenantId, tenantId ?? 0),
+        eq(tenantMembers.isActive, true),
+      ))
+      .where(eq(refreshTokens.tokenHash, tokenHash))
+      .limit(1);
+    if (!row) return null;
+    return {
+      id:        row.id,
+      familyId:  row.familyId,
+      expiresAt: row.expiresAt,
+      revokedAt: row.revokedAt,
+      user:      { id: row.userId as UserId, email: row.email, username: row.username },
+      role:      (row.role as TenantRole | null) ?? null,
+    };
+  }
+
+  /**
+   * Also drops the user's expired rows, so sessions that are never renewed
+   * (and so never swept by `rotate`) don't accumulate.
+   */
+  async create(userId: UserId, familyId: string, token: NewRefreshToken): Promise<void> {
+    await this.db.execute(sql`
+      WITH swept AS (
+        DELETE FROM ${refreshTokens}
+         WHERE user_id = ${userId} AND expires_at <= now()
+      )
+      INSERT INTO ${refreshTokens} (user_id, family_id, token_hash, expires_at)
+      VALUES (${userId}, ${familyId}, ${token.tokenHash}, ${token.expiresAt.toISOString()}::timestamp)
+    `);
+  }
+
+  /**
+   * One statement: revoke the live row, insert its successor, and drop the
+   * family's expired rows — nothing to reconcile if two renewals race.
+   */
+  async rotate(id: number, next: NewRefreshToken): Promise<boolean> {
+    const result = await this.db.execute<{ id: number }>(sql`
+      WITH used AS (
+        UPDATE ${refreshTokens}
+           SET revoked_at = now()
+         WHERE id = ${id} AND revoked_at IS NULL AND expires_at > now()
+        RETURNING user_id, family_id
+      ), swept AS (
+        DELETE FROM ${refreshTokens}
+         WHERE family_id = (SELECT family_id FROM used) AND expires_at <= now()
+      )
+      INSERT INTO ${refreshTokens} (user_id, family_id, token_hash, expires_at)
+      SELECT user_id, family_id, ${next.tokenHash}, ${next.expiresAt.toISOString()}::timestamp FROM used
+      RETURNING id
+    `);
+    return result.rows.length > 0;
+  }
+
+  async revokeFamily(familyId: string): Promise<void> {
+    await this.db
+      .update(refreshTokens)
+      .set({ revokedAt: sql`now()` })
+      .where(and(eq(refreshTokens.familyId, familyId), isNull(refreshTokens.revokedAt)));
+  }
+}
@@ -1,31 +1,36 @@
-import { eq, count, inArray } from 'drizzle-orm';
-import { ITaskRepository } from '../../domain/task/ITaskRepository';
+import { eq, and, gt, count, desc, inArray, getTableColumns } from 'drizzle-orm';
+import { ITaskRepository, TaskQueryOptions } from '../../domain/task/ITaskRepository';
 import { Task } from '../../domain/task/Task';
 import {
   TaskId, ProjectId, TaskStatus, TaskPriority, AgentType,
   asTaskId, asProjectId,
 } from '../../domain/shared/types';
-import { tasks as tasksTable } from '../database/schema';
+import { Page } from '../../domain/shared/pagination';
+import { tasks as tasksTable, projects as projectsTable } from '../database/schema';
+import { cursorText, olderThan, toPage } from '../database/keyset';
 import type { Db } from '../database/connection';
 
 export class TaskRepository implements ITaskRepository {
   constructor(private readonly db: Db) {}
 
-  async findAll(projectId?: ProjectId): Promise<Task[]> {
-    const query = this.db.select().from(tasksTable);
-    const rows = projectId !== undefined
-      ? await query.where(eq(tasksTable.projectId, projectId))
-      : await query;
-    return rows.map(toDomain);
-  }
+  async query(opts: TaskQueryOptions): Promise<Page<Task>> {
+    // Tenant scope comes from the join, so no per-tenant project list is needed
+    const conditions = [eq(projectsTable.tenantId, opts.tenantId)];
+    if (opts.projectId !== undefined)         conditions.push(eq(tasksTable.projectId, opts.projectId));
+    if (opts.statuses?.length)                conditions.push(inArray(tasksTable.status, opts.statuses));
+    if (opts.archived !== undefined)          conditions.push(eq(tasksTable.archived, opts.archived));
+    if (opts.assignedAgentType !== undefined) conditions.push(eq(tasksTable.assignedAgentType, opts.assignedAgentType));
+    if (opts.updatedSince)                    conditions.push(gt(tasksTable.updatedAt, opts.updatedSince));
+    if (opts.cursor)                          conditions.push(olderThan(tasksTable.createdAt, tasksTable.id, opts.cursor));
 
-  async findByProjectIds(ids: ProjectId[]): Promise<Task[]> {
-    if (ids.length === 0) return [];
     const rows = await this.db
-      .select()
+      .select({ ...getTableColumns(tasksTable), cursorTs: cursorText(tasksTable.createdAt) })
       .from(tasksTable)
-      .where(inArray(tasksTable.projectId, ids));
-    return rows.map(toDomain);
+      .innerJoin(projectsTable, eq(tasksTable.projectId, projectsTable.id))
+      .where(and(...conditions))
+      .orderBy(desc(tasksTable.createdAt), desc(tasksTable.id))
+      .limit(opts.limit + 1);
+    return toPage(rows, opts.limit, toDomain);
   }
 
   async findById(id: TaskId): Promise<Task | null> {
@@ -37,6 +42,15 @@ export class TaskRepository implements ITaskRepository {
     return row ? toDomain(row) : null;
   }
 
+  async findByIds(ids: TaskId[]): Promise<Task[]> {
+    if (ids.length === 0) return [];
+    const rows = await this.db
+      .select()
+      .from(tasksTable)
+      .where(inArray(tasksTable.id, ids));
+    return rows.map(toDomain);
+  }
+
   async countByProject(projectId: ProjectId): Promise<number> {
     const [row] = await this.db
       .select({ value: count() })
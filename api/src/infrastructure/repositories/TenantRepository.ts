@@ -1,5 +1,5 @@
-import { eq, inArray } from 'drizzle-orm';
-import { ITenantRepository } from '../../domain/tenant/ITenantRepository';
+import { eq } from 'drizzle-orm';
+import { ITenantRepository, TenantMembership } from '../../domain/tenant/ITenantRepository';
 import { Tenant, TenantMemberProps } from '../../domain/tenant/Tenant';
 import { TenantId, TenantStatus, TenantRole, asTenantId } from '../../domain/shared/types';
 import { tenants as tenantsTable, tenantMembers as membersTable } from '../database/schema';
@@ -31,18 +31,25 @@ export class TenantRepository implements ITenantRepository {
     return row ? this.hydrateMembers(row) : null;
   }
 
-  async findByUserId(userId: string): Promise<Tenant[]> {
-    const memberRows = await this.db
-      .select({ tenantId: membersTable.tenantId })
+  /** Reads only the caller's membership rows – other members are never loaded. */
+  async findMembershipsByUserId(userId: string): Promise<TenantMembership[]> {
+    const rows = await this.db
+      .select({
+        id:       tenantsTable.id,
+        name:     tenantsTable.name,
+        slug:     tenantsTable.slug,
+        role:     membersTable.role,
+        isActive: membersTable.isActive,
+      })
       .from(membersTable)
+      .innerJoin(tenantsTable, eq(tenantsTable.id, membersTable.tenantId))
       .where(eq(membersTable.userId, userId));
-    if (!memberRows.length) return [];
-    const tenantIds = memberRows.map(r => r.tenantId);
-    const rows = await this.db
-      .select()
-      .from(tenantsTable)
-      .where(inArray(tenantsTable.id, tenantIds));
-    return Promise.all(rows.map(r => this.hydrateMembers(r)));
+    return rows.map(r => ({
+      id:   asTenantId(r.id),
+      name: r.name,
+      slug: r.slug,
+      role: r.isActive ? r.role as TenantRole : null,
+    }));
   }
 
   async save(tenant: Tenant): Promise<Tenant> {
@@ -0,0 +1,61 @@
+/** Bucket upper bounds in ms; the last bucket catches everything slower. */
+const BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000];
+
+export interface HistogramSnapshot {
+  count:   number;
+  totalMs: number;
+  maxMs:   number;
+  /** Percentiles as bucket upper bounds (max for the overflow bucket). */
+  p50Ms:   number;
+  p95Ms:   number;
+  p99Ms:   number;
+  /** Observation counts keyed by bucket upper bound ("+Inf" for the last). */
+  buckets: Record<string, number>;
+}
+
+/**
+ * Fixed-bucket latency histogram: recording is one bounds scan and two
+ * increments, and memory does not grow with the number of observations.
+ */
+export class LatencyHistogram {
+  private readonly counts = new Array<number>(BOUNDS_MS.length + 1).fill(0);
+  private count   = 0;
+  private totalMs = 0;
+  private maxMs   = 0;
+
+  record(ms: number): void {
+    let i = 0;
+    while (i < BOUNDS_MS.length && ms > BOUNDS_MS[i]!) i++;
+    this.counts[i]!++;
+    this.count++;
+    this.totalMs += ms;
+    if (ms > this.maxMs) this.maxMs = ms;
+  }
+
+  snapshot(): HistogramSnapshot {
+    const buckets: Record<string, number> = {};
+    this.counts.forEach((n, i) => {
+      if (n > 0) buckets[i < BOUNDS_MS.length ? String(BOUNDS_MS[i]) : '+Inf'] = n;
+    });
+    return {
+      count:   this.count,
+      totalMs: Math.round(this.totalMs),
+      maxMs:   Math.round(this.maxMs),
+      p50Ms:   this.percentile(0.5),
+      p95Ms:   this.percentile(0.95),
+      p99Ms:   this.percentile(0.99),
+      buckets,
+    };
+  }
+
+  private percentile(p: number): number {
+    if (this.count === 0) return 0;
+    const rank = Math.ceil(p * this.count);
+    let seen = 0;
+    for (let i = 0; i < this.counts.length; i++) {
+      seen += this.counts[i]!;
+      if (seen >= rank) return i < BOUNDS_MS.length ? BOUNDS_MS[i]! : Math.round(this.maxMs);
+    }
+    return Math.round(this.maxMs);
+  }
+}
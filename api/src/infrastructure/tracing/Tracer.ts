@@ -0,0 +1,236 @@
+import { AsyncLocalStorage } from 'node:async_hooks';
+import { LatencyHistogram, type HistogramSnapshot } from './LatencyHistogram';
+import { LruCache } from '../cache/LruCache';
+
+/**
+ * Request tracing for the API worker.
+ *
+ * Always on (per isolate): one latency histogram per route and one per SQL
+ * statement shape — an observation is two clock reads and a bucket
+ * increment.  Sampled requests additionally run inside a `Trace` (via
+ * AsyncLocalStorage) that collects spans from the database, the auth
+ * middleware and the services; they answer with a `Server-Timing` header
+ * and log one structured JSON line.  Unsampled requests never allocate a
+ * trace, and span hooks reduce to one `getStore()` check.
+ *
+ * Workers only advance clocks across I/O, so spans measure time spent
+ * waiting (Neon, Durable Objects, fetch); pure CPU work reads as ~0ms.
+ */
+
+export interface Span {
+  name:    string;
+  /** Offset from the start of the request. */
+  startMs: number;
+  durMs:   number;
+  error?:  true;
+}
+
+const storage = new AsyncLocalStorage<Trace>();
+
+/** The sampled trace of the current request, if any. */
+export function currentTrace(): Trace | undefined {
+  return storage.getStore();
+}
+
+/** Run `fn` as span `name` when the current request is sampled; otherwise just run it. */
+export function traced<T>(name: string, fn: () => T): T {
+  const trace = storage.getStore();
+  return trace ? trace.span(name, fn) : fn();
+}
+
+export class Trace {
+  readonly id    = crypto.randomUUID();
+  readonly spans: Span[] = [];
+  private readonly startedAt = performance.now();
+
+  /** Run `fn` (sync or async) and record how long it took. */
+  span<T>(name: string, fn: () => T): T {
+    const start = performance.now();
+    let result: T;
+    try {
+      result = fn();
+    } catch (err) {
+      this.add(name, start, performance.now() - start, true);
+      throw err;
+    }
+    if (!(result instanceof Promise)) {
+      this.add(name, start, performance.now() - start);
+      return result;
+    }
+    return result.then(
+      (value) => {
+        this.add(name, start, performance.now() - start);
+        return value;
+      },
+      (err) => {
+        this.add(name, start, performance.now() - start, true);
+        throw err;
+      },
+    ) as T;
+  }
+
+  /** Record a span measured by the caller (`start` from `performance.now()`). */
+  add(name: string, start: number, durMs: number, error = false): void {
+    const span: Span = { name, startMs: round(start - this.startedAt), durMs: round(durMs) };
+    if (error) span.error = true;
+    this.spans.push(span);
+  }
+
+  elapsed(): number {
+    return performance.now() - this.startedAt;
+  }
+
+  /**
+   * `Server-Timing` value: total plus one entry per span category (the part
+   * of the span name before ':'), e.g. `db;dur=41.2;desc="3 spans"`.
+   */
+  serverTiming(extra: string[] = []): string {
+    const byCategory = new Map<string, { durMs: number; n: number }>();
+    for (const span of this.spans) {
+      const category = span.name.split(':', 1)[0]!;
+      const agg = byCategory.get(category) ?? { durMs: 0, n: 0 };
+      agg.durMs += span.durMs;
+      agg.n++;
+      byCategory.set(category, agg);
+    }
+    const entries = [`total;dur=${round(this.elapsed())}`, ...extra];
+    for (const [category, agg] of byCategory) {
+      entries.push(`${category};dur=${round(agg.durMs)};desc="${agg.n} span${agg.n === 1 ? '' : 's'}"`);
+    }
+    return entries.join(', ');
+  }
+
+  /** Run `fn` with this trace as the current one. */
+  run<T>(fn: () => T): T {
+    return storage.run(this, fn);
+  }
+}
+
+export interface TracerSnapshot {
+  isolate: { startedAt: string; requests: number; sampled: number; sampleRate: number };
+  routes:  Record<string, HistogramSnapshot>;
+  queries: Record<string, HistogramSnapshot>;
+  spans:   Record<string, HistogramSnapshot>;
+}
+
+/** Distinct route / query / span names tracked per isolate. */
+const MAX_SERIES = 500;
+
+/** Per-isolate histograms and the sampling decision. */
+export class Tracer {
+  private readonly routes  = new Map<string, LatencyHistogram>();
+  private readonly queries = new Map<string, LatencyHistogram>();
+  private readonly spans   = new Map<string, LatencyHistogram>();
+  private readonly labels  = new LruCache<string, string>(MAX_SERIES);
+  private readonly startedAt = new Date();
+  private requests = 0;
+  private sampled  = 0;
+  private coldStart = true;
+
+  constructor(readonly sampleRate: number) {}
+
+  /** Sample `forced` requests and a `sampleRate` fraction of the rest. */
+  sample(forced: boolean): Trace | null {
+    this.requests++;
+    if (!forced && (this.sampleRate <= 0 || Math.random() >= this.sampleRate)) return null;
+    this.sampled++;
+    return new Trace();
+  }
+
+  /** True exactly once: for the first request served by this app instance. */
+  takeColdStart(): boolean {
+    const cold = this.coldStart;
+    this.coldStart = false;
+    return cold;
+  }
+
+  recordRoute(route: string, ms: number): void {
+    observe(this.routes, route, ms);
+  }
+
+  /** A finished request's spans feed the span histograms. */
+  recordTrace(trace: Trace): void {
+    for (const span of trace.spans) {
+      if (!span.name.startsWith('db:')) observe(this.spans, span.name, span.durMs);
+    }
+  }
+
+  recordQuery(sql: string, start: number, error: boolean): void {
+    const durMs = performance.now() - start;
+    const label = this.queryLabel(sql);
+    observe(this.queries, label, durMs);
+    storage.getStore()?.add(`db:${label}`, start, durMs, error);
+  }
+
+  snapshot(): TracerSnapshot {
+    return {
+      isolate: {
+        startedAt:  this.startedAt.toISOString(),
+        requests:   this.requests,
+        sampled:    this.sampled,
+        sampleRate: this.sampleRate,
+      },
+      routes:  snapshotAll(this.routes),
+      queries: snapshotAll(this.queries),
+      spans:   snapshotAll(this.spans),
+    };
+  }
+
+  /** `select tasks`, `insert audit_events`, … — statement verb plus first table. */
+  private queryLabel(sql: string): string {
+    let label = this.labels.get(sql);
+    if (label === undefined) {
+      const verb  = /^\s*(\w+)/.exec(sql)?.[1]?.toLowerCase() ?? 'query';
+      const table = /\b(?:from|into|update)\s+"(\w+)"/i.exec(sql)?.[1];
+      label = table ? `${verb} ${table}` : verb;
+      this.labels.set(sql, label);
+    }
+    return label;
+  }
+}
+
+function observe(series: Map<string, LatencyHistogram>, name: string, ms: number): void {
+  let histogram = series.get(name);
+  if (!histogram) {
+    if (series.size >= MAX_SERIES) name = 'other';
+    histogram = series.get(name) ?? new LatencyHistogram();
+    series.set(name, histogram);
+  }
+  histogram.record(ms);
+}
+
+function snapshotAll(series: Map<string, LatencyHistogram>): Record<string, HistogramSnapshot> {
+  const out: Record<string, HistogramSnapshot> = {};
+  for (const [name, histogram] of series) out[name] = histogram.snapshot();
+  return out;
+}
+
+function round(ms: number): number {
+  return Math.round(ms * 10) / 10;
+}
+
+/**
+ * Wrap a method-bearing object so every method call is a span named
+ * `svc:<name>.<method>` on sampled requests.  Unsampled calls go straight
+ * through after one `getStore()` check.
+ */
+export function traceMethods<T extends object>(name: string, target: T): T {
+  const wrapped = new Map<PropertyKey, unknown>();
+  return new Proxy(target, {
+    get(obj, prop, receiver) {
+      const value: unknown = Reflect.get(obj, prop, receiver);
+      if (typeof value !== 'function' || typeof prop !== 'string') return value;
+      let fn = wrapped.get(prop);
+      if (!fn) {
+        const method = value as (...args: unknown[]) => unknown;
+        const span   = `svc:${name}.${prop}`;
+        fn = (...args: unknown[]) => {
+          const trace = storage.getStore();
+          return trace ? trace.span(span, () => method.apply(obj, args)) : method.apply(obj, args);
+        };
+        wrapped.set(prop, fn);
+      }
+      return fn;
+    },
+  });
+}
@@ -0,0 +1,18 @@
+import { MiddlewareHandler } from 'hono';
+import type { HonoEnv } from '../../env';
+import type { BufferedAuditRepository } from '../../infrastructure/audit/BufferedAuditRepository';
+
+/**
+ * Audit flush middleware factory.
+ *
+ * Lets the handler respond first, then hands the buffered audit events to
+ * `ctx.waitUntil` so the batched INSERT runs off the request's critical path.
+ * A batch already being written (flushed when the buffer filled mid-request)
+ * is handed over too, or the runtime could cancel it once the response is sent.
+ */
+export function flushAuditAfterResponse(sink: BufferedAuditRepository): MiddlewareHandler<HonoEnv> {
+  return async (c, next) => {
+    await next();
+    if (sink.busy) c.executionCtx.waitUntil(sink.drain());
+  };
+}
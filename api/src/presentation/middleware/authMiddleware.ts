@@ -1,8 +1,9 @@
 import { MiddlewareHandler } from 'hono';
 import type { HonoEnv } from '../../env';
-import { TenantRole, hasMinRole } from '../../domain/shared/types';
+import { TenantRole, roleRank } from '../../domain/shared/types';
 import { UnauthorizedError, ForbiddenError } from '../../domain/shared/errors';
 import { verifyJwt } from '../../infrastructure/auth/JwtService';
+import { traced } from '../../infrastructure/tracing/Tracer';
 
 /**
  * JWT authentication middleware.
@@ -21,7 +22,7 @@ export const authMiddleware: MiddlewareHandler<HonoEnv> = async (c, next) => {
   const token = authHeader.slice(7);
   let payload;
   try {
-    payload = await verifyJwt(token, c.env.JWT_SECRET);
+    payload = await traced('auth:jwt', () => verifyJwt(token, c.env.JWT_SECRET));
   } catch {
     throw new UnauthorizedError('Invalid or expired token');
   }
@@ -44,9 +45,10 @@ export const authMiddleware: MiddlewareHandler<HonoEnv> = async (c, next) => {
  *   router.delete('/:id', authMiddleware, requireRole(TenantRole.MANAGER), handler)
  */
 export function requireRole(minimum: TenantRole): MiddlewareHandler<HonoEnv> {
+  const minimumRank = roleRank(minimum);
   return async (c, next) => {
     const role = c.get('role') as TenantRole;
-    if (!hasMinRole(role, minimum)) {
+    if (roleRank(role) < minimumRank) {
       throw new ForbiddenError(
         `Requires at least '${minimum}' role, caller has '${role}'`,
       );
@@ -0,0 +1,45 @@
+import { eq } from 'drizzle-orm';
+import { coderclawInstances } from '../../infrastructure/database/schema';
+import { verifySecret } from '../../infrastructure/auth/HashService';
+import type { Db } from '../../infrastructure/database/connection';
+import type { ClawConnectionCache } from '../../infrastructure/relay/ClawConnectionCache';
+
+export type ClawAuthResult =
+  | { ok: true;  tenantId: number }
+  | { ok: false; status: 401 | 404 };
+
+/**
+ * Check a claw's API key.
+ *
+ * The claw's key hash and tenant are served from the per-isolate credential
+ * cache when possible, so repeat calls cost a SHA-256 instead of a DB round
+ * trip.  A key that does not match evicts the entry: it may have been
+ * rotated in another isolate.
+ */
+export async function authenticateClaw(
+  db:          Db,
+  connections: ClawConnectionCache,
+  clawId:      number,
+  key:         string,
+): Promise<ClawAuthResult> {
+  let claw = connections.getCredential(clawId);
+  if (!claw) {
+    const [row] = await db
+      .select({
+        apiKeyHash: coderclawInstances.apiKeyHash,
+        tenantId:   coderclawInstances.tenantId,
+      })
+      .from(coderclawInstances)
+      .where(eq(coderclawInstances.id, clawId));
+
+    if (!row) return { ok: false, status: 404 };
+    claw = row;
+    connections.setCredential(clawId, claw);
+  }
+
+  if (!(await verifySecret(key, claw.apiKeyHash))) {
+    connections.invalidate(clawId);
+    return { ok: false, status: 401 };
+  }
+  return { ok: true, tenantId: claw.tenantId };
+}
@@ -0,0 +1,17 @@
+import { MiddlewareHandler } from 'hono';
+import type { HonoEnv } from '../../env';
+import type { DeferredWork } from '../../infrastructure/background/DeferredWork';
+
+/**
+ * Deferred-work middleware factory.
+ *
+ * Lets the handler respond first, then hands whatever side effects it
+ * deferred (event publishes and the like) to `ctx.waitUntil`, so the runtime
+ * does not cancel them once the response is sent.
+ */
+export function settleDeferredWork(work: DeferredWork): MiddlewareHandler<HonoEnv> {
+  return async (c, next) => {
+    await next();
+    if (work.busy) c.executionCtx.waitUntil(work.drain());
+  };
+}
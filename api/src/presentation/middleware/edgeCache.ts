@@ -0,0 +1,66 @@
+import { MiddlewareHandler } from 'hono';
+import type { HonoEnv } from '../../env';
+import type { EdgeCache } from '../../infrastructure/cache/EdgeCache';
+
+/**
+ * Edge response cache middleware factory for public GET routes.
+ *
+ * Serves 200 responses from the colo cache, tags them with a content-hash
+ * ETag and answers matching `If-None-Match` requests with 304.  Browsers are
+ * told to revalidate every time so a version bump is visible immediately.
+ */
+export function edgeCache(store: EdgeCache): MiddlewareHandler<HonoEnv> {
+  return async (c, next) => {
+    const key = await store.keyFor(c.req.url);
+    const hit = await store.match(key);
+
+    let body: ArrayBuffer;
+    let etag: string;
+    let contentType: string;
+
+    if (hit) {
+      body        = await hit.arrayBuffer();
+      etag        = hit.headers.get('ETag') ?? await computeEtag(body);
+      contentType = hit.headers.get('Content-Type') ?? 'application/json';
+    } else {
+      await next();
+      if (c.res.status !== 200) return;
+
+      body        = await c.res.clone().arrayBuffer();
+      etag        = await computeEtag(body);
+      contentType = c.res.headers.get('Content-Type') ?? 'application/json';
+
+      // Only the representation is stored – CORS headers vary per request
+      c.executionCtx.waitUntil(
+        store.put(key, new Response(body, { headers: { 'Content-Type': contentType, ETag: etag } })),
+      );
+    }
+
+    const headers = {
+      ETag:            etag,
+      'Cache-Control': 'public, max-age=0, must-revalidate',
+      'X-Cache':       hit ? 'HIT' : 'MISS',
+    };
+
+    // Assign rather than return: after next() a returned response is ignored
+    c.res = matchesEtag(c.req.header('If-None-Match'), etag)
+      ? c.body(null, 304, headers)
+      : c.body(body, 200, { ...headers, 'Content-Type': contentType });
+  };
+}
+
+async function computeEtag(body: ArrayBuffer): Promise<string> {
+  const digest = await crypto.subtle.digest('SHA-256', body);
+  const hex    = Array.from(new Uint8Array(digest).slice(0, 16))
+    .map((b) => b.toString(16).padStart(2, '0'))
+    .join('');
+  return `"${hex}"`;
+}
+
+function matchesEtag(header: string | undefined, etag: string): boolean {
+  if (!header) return false;
+  return header.split(',').some((tag) => {
+    const t = tag.trim();
+    return t === '*' || t === etag || t === `W/${etag}`;
+  });
+}
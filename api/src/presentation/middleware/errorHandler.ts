@@ -5,23 +5,34 @@ import {
   ValidationError,
   ForbiddenError,
   UnauthorizedError,
+  TooManyRequestsError,
 } from '../../domain/shared/errors';
+import { currentTrace } from '../../infrastructure/tracing/Tracer';
+
+/** HTTP status for a domain error; null for anything unexpected. */
+export function domainErrorStatus(err: unknown): 400 | 401 | 403 | 404 | 409 | 429 | null {
+  if (err instanceof ValidationError)      return 400;
+  if (err instanceof UnauthorizedError)    return 401;
+  if (err instanceof ForbiddenError)       return 403;
+  if (err instanceof NotFoundError)        return 404;
+  if (err instanceof ConflictError)        return 409;
+  if (err instanceof TooManyRequestsError) return 429;
+  return null;
+}
 
 /**
  * Global error handler for the Hono application.
  *
  * Maps domain errors to HTTP status codes and returns a consistent JSON body.
- * Unknown errors are logged and surfaced as 500s.
+ * Unknown errors are logged (with the route and, when sampled, the trace id)
+ * and surfaced as 500s.
  */
 export function errorHandler(err: Error, c: Context): Response {
-  if (err instanceof ValidationError)  return c.json({ error: err.message }, 400);
-  if (err instanceof UnauthorizedError) return c.json({ error: err.message }, 401);
-  if (err instanceof ForbiddenError)   return c.json({ error: err.message }, 403);
-  if (err instanceof NotFoundError)    return c.json({ error: err.message }, 404);
-  if (err instanceof ConflictError)    return c.json({ error: err.message }, 409);
+  const status = domainErrorStatus(err);
+  if (status !== null) return c.json({ error: err.message }, status);
 
   // Unexpected errors
-  console.error('[unhandled]', err);
+  console.error('[unhandled]', { route: `${c.req.method} ${c.req.routePath}`, trace: currentTrace()?.id }, err);
   const message = err instanceof Error ? err.message : String(err);
   return c.json({ error: message }, 500);
 }
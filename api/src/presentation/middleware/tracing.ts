@@ -0,0 +1,54 @@
+import { MiddlewareHandler } from 'hono';
+import type { HonoEnv } from '../../env';
+import type { Tracer } from '../../infrastructure/tracing/Tracer';
+
+/**
+ * Operators (e.g. while debugging a slow call) can force a trace by sending
+ * the METRICS_TOKEN as `x-coderclaw-trace`.  Anyone else gets sampling only,
+ * so a caller cannot buy Server-Timing and a log line per request.
+ */
+const TRACE_HEADER = 'x-coderclaw-trace';
+
+function traceForced(requested: string | undefined, token: string | undefined): boolean {
+  return !!token && requested === token;
+}
+
+/**
+ * Request tracing middleware factory.
+ *
+ * Every request is timed into its route's histogram (`GET /api/tasks/:id`).
+ * Sampled requests run inside a trace, get a `Server-Timing` header, and log
+ * one JSON line with their spans.
+ */
+export function traceRequests(tracer: Tracer): MiddlewareHandler<HonoEnv> {
+  return async (c, next) => {
+    const start = performance.now();
+    const cold  = tracer.takeColdStart();
+    const trace = tracer.sample(traceForced(c.req.header(TRACE_HEADER), c.env.METRICS_TOKEN));
+
+    if (trace) {
+      await trace.run(next);
+    } else {
+      await next();
+    }
+
+    const route = `${c.req.method} ${c.req.routePath}`;
+    tracer.recordRoute(route, performance.now() - start);
+    if (!trace) return;
+
+    tracer.recordTrace(trace);
+    // Building the app is CPU-only (no clock advance), so it is flagged, not timed
+    if (!c.res.webSocket) {
+      c.res.headers.set('Server-Timing', trace.serverTiming(cold ? ['app;desc="cold start"'] : []));
+    }
+    console.log(JSON.stringify({
+      trace:  trace.id,
+      route,
+      path:   c.req.path,
+      status: c.res.status,
+      cold,
+      durMs:  Math.round(trace.elapsed() * 10) / 10,
+      spans:  trace.spans,
+    }));
+  };
+}
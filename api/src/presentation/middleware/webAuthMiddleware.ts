@@ -2,6 +2,7 @@ import { MiddlewareHandler } from 'hono';
 import type { HonoEnv } from '../../env';
 import { UnauthorizedError } from '../../domain/shared/errors';
 import { verifyWebJwt } from '../../infrastructure/auth/JwtService';
+import { traced } from '../../infrastructure/tracing/Tracer';
 
 /**
  * Web/marketplace JWT middleware.
@@ -21,7 +22,7 @@ export const webAuthMiddleware: MiddlewareHandler<HonoEnv> = async (c, next) =>
   const token = authHeader.slice(7);
   let payload;
   try {
-    payload = await verifyWebJwt(token, c.env.JWT_SECRET);
+    payload = await traced('auth:web-jwt', () => verifyWebJwt(token, c.env.JWT_SECRET));
   } catch {
     throw new UnauthorizedError('Invalid or expired token');
   }
@@ -2,12 +2,32 @@ import { Hono } from 'hono';
 import { AuditService } from '../../application/audit/AuditService';
 import type { HonoEnv } from '../../env';
 import { authMiddleware, requireRole } from '../middleware/authMiddleware';
-import { TenantRole, asTenantId } from '../../domain/shared/types';
+import { TenantRole, AuditEventType, asTenantId } from '../../domain/shared/types';
+import { ValidationError } from '../../domain/shared/errors';
+import { decodeCursor, clampLimit } from '../../domain/shared/pagination';
+
+const EVENT_TYPES = new Set<string>(Object.values(AuditEventType));
+
+function parseDate(name: string, value: string | undefined): Date | undefined {
+  if (!value) return undefined;
+  const d = new Date(value);
+  if (Number.isNaN(d.getTime())) throw new ValidationError(`'${name}' must be an ISO-8601 timestamp`);
+  return d;
+}
+
+function parseEventTypes(value: string | undefined): AuditEventType[] | undefined {
+  if (!value) return undefined;
+  const types = value.split(',').map((t) => t.trim()).filter(Boolean);
+  const unknown = types.find((t) => !EVENT_TYPES.has(t));
+  if (unknown) throw new ValidationError(`Unknown audit event type '${unknown}'`);
+  return types as AuditEventType[];
+}
 
 /**
  * Audit routes – compliance & access review.
  *
- * GET /api/audit/events                       – tenant-wide event log (MANAGER+)
+ * GET /api/audit/events                       – tenant-wide event log (MANAGER+),
+ *                                                filterable by type, resource and time range
  * GET /api/audit/users/:userId/activity       – user activity log (MANAGER+)
  */
 export function createAuditRoutes(auditService: AuditService): Hono<HonoEnv> {
@@ -15,28 +35,39 @@ export function createAuditRoutes(auditService: AuditService): Hono<HonoEnv> {
   router.use('*', authMiddleware);
   router.use('*', requireRole(TenantRole.MANAGER));
 
-  // GET /api/audit/events?limit=100&offset=0
+  // GET /api/audit/events?type=&resource_type=&resource_id=&since=&until=&limit=100&cursor=
   router.get('/events', async (c) => {
-    const limit  = Number(c.req.query('limit')  ?? '100');
-    const offset = Number(c.req.query('offset') ?? '0');
-    const events = await auditService.query(
-      { tenantId: asTenantId(c.get('tenantId')), limit, offset },
+    const limit  = clampLimit(Number(c.req.query('limit') ?? '100'), 100);
+    const cursor = c.req.query('cursor');
+    const page = await auditService.query(
+      {
+        tenantId:     asTenantId(c.get('tenantId')),
+        eventTypes:   parseEventTypes(c.req.query('type')),
+        resourceType: c.req.query('resource_type') || undefined,
+        resourceId:   c.req.query('resource_id') || undefined,
+        since:        parseDate('since', c.req.query('since')),
+        until:        parseDate('until', c.req.query('until')),
+        limit,
+        cursor:       cursor ? decodeCursor(cursor) : undefined,
+      },
       c.get('role'),
     );
-    return c.json(events.map(e => e.toPlain()));
+    return c.json({ events: page.items.map(e => e.toPlain()), next_cursor: page.nextCursor });
   });
 
-  // GET /api/audit/users/:userId/activity?limit=50
+  // GET /api/audit/users/:userId/activity?limit=50&cursor=
   router.get('/users/:userId/activity', async (c) => {
     const userId = c.req.param('userId');
-    const limit  = Number(c.req.query('limit') ?? '50');
-    const events = await auditService.userActivity(
+    const limit  = clampLimit(Number(c.req.query('limit') ?? '50'), 50);
+    const cursor = c.req.query('cursor');
+    const page = await auditService.userActivity(
       userId,
       c.get('tenantId'),
       c.get('role'),
       limit,
+      cursor ? decodeCursor(cursor) : undefined,
     );
-    return c.json(events.map(e => e.toPlain()));
+    return c.json({ events: page.items.map(e => e.toPlain()), next_cursor: page.nextCursor });
   });
 
   return router;
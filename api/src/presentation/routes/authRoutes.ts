@@ -22,6 +22,11 @@ import type { Db } from '../../infrastructure/database/connection';
  *   GET  /api/auth/my-tenants     – list tenants the caller belongs to (WebJWT required)
  *   POST /api/auth/tenant-token   – exchange WebJWT + tenantId for tenant-scoped JWT
  *   GET  /api/auth/me             – return caller's profile (WebJWT required)
+ *
+ * Sessions (web login / register return a refresh token):
+ *   POST /api/auth/refresh  – rotate the refresh token, get a fresh access JWT
+ *                             (tenant-scoped when tenantId is sent: workspace switch)
+ *   POST /api/auth/logout   – revoke the refresh token's session
  */
 export function createAuthRoutes(authService: AuthService, db: Db): Hono<HonoEnv> {
   const router = new Hono<HonoEnv>();
@@ -44,6 +49,26 @@ export function createAuthRoutes(authService: AuthService, db: Db): Hono<HonoEnv
     return c.json({ token: result.token, expiresIn: result.expiresIn });
   });
 
+  // POST /api/auth/refresh
+  router.post('/refresh', async (c) => {
+    const body = await c.req.json<{ refreshToken: string; tenantId?: number }>();
+    if (!body.refreshToken) return c.json({ error: 'refreshToken is required' }, 400);
+    const tenantId = body.tenantId == null ? null : Number(body.tenantId);
+    if (tenantId !== null && !Number.isInteger(tenantId)) {
+      return c.json({ error: 'tenantId must be an integer' }, 400);
+    }
+    const result = await authService.refresh(body.refreshToken, tenantId);
+    return c.json(result);
+  });
+
+  // POST /api/auth/logout
+  router.post('/logout', async (c) => {
+    const body = await c.req.json<{ refreshToken: string }>();
+    if (!body.refreshToken) return c.json({ error: 'refreshToken is required' }, 400);
+    await authService.logout(body.refreshToken);
+    return c.body(null, 204);
+  });
+
   // -------------------------------------------------------------------------
   // Web / marketplace auth
   // -------------------------------------------------------------------------
@@ -8,13 +8,15 @@
  * All routes require a tenant-scoped JWT (authMiddleware).
  */
 import { Hono } from 'hono';
-import { eq, and } from 'drizzle-orm';
+import { eq, and, gte, sql } from 'drizzle-orm';
 import { authMiddleware } from '../middleware/authMiddleware';
-import { coderclawInstances } from '../../infrastructure/database/schema';
-import { generateApiKey, hashSecret, verifySecret } from '../../infrastructure/auth/HashService';
+import { authenticateClaw } from '../middleware/clawAuth';
+import { coderclawInstances, llmUsage } from '../../infrastructure/database/schema';
+import { generateApiKey, hashSecret } from '../../infrastructure/auth/HashService';
 import type { HonoEnv } from '../../env';
 import type { Db } from '../../infrastructure/database/connection';
 import type { ClawRelayDO } from '../../infrastructure/relay/ClawRelayDO';
+import { ClawConnectionCache } from '../../infrastructure/relay/ClawConnectionCache';
 
 // Extend HonoEnv bindings type to include the Durable Object
 type ClawHonoEnv = HonoEnv & {
@@ -23,12 +25,25 @@ type ClawHonoEnv = HonoEnv & {
   };
 };
 
-export function createClawRoutes(db: Db): Hono<ClawHonoEnv> {
+/** Whether the claw's relay currently holds an upstream socket. */
+async function relayOnline(relay: DurableObjectNamespace<ClawRelayDO>, clawId: number): Promise<boolean> {
+  const stub = relay.get(relay.idFromName(String(clawId)));
+  const res  = await stub.fetch('https://claw-relay/presence');
+  return ((await res.json()) as { online: boolean }).online;
+}
+
+export function createClawRoutes(
+  db:          Db,
+  connections: ClawConnectionCache = new ClawConnectionCache(),
+): Hono<ClawHonoEnv> {
   const router = new Hono<ClawHonoEnv>();
 
   // Tenant-authenticated routes
   router.use('/', authMiddleware as never);
   router.use('/:id', authMiddleware as never);
+  router.use('/:id/rotate-key', authMiddleware as never);
+  router.use('/:id/relay/metrics', authMiddleware as never);
+  router.use('/:id/usage', authMiddleware as never);
 
   // GET /api/claws – list all claws for the current tenant
   router.get('/', async (c) => {
@@ -94,9 +109,32 @@ export function createClawRoutes(db: Db): Hono<ClawHonoEnv> {
     await db
       .delete(coderclawInstances)
       .where(and(eq(coderclawInstances.id, id), eq(coderclawInstances.tenantId, tenantId)));
+    connections.invalidate(id);
     return c.body(null, 204);
   });
 
+  // POST /api/claws/:id/rotate-key – issue a new API key; the old one stops working
+  // Returns the plaintext API key once – it is never stored in plaintext.
+  router.post('/:id/rotate-key', async (c) => {
+    const tenantId = c.get('tenantId') as number;
+    const id       = Number(c.req.param('id'));
+    const rawKey   = generateApiKey();
+    const keyHash  = await hashSecret(rawKey);
+
+    const [updated] = await db
+      .update(coderclawInstances)
+      .set({ apiKeyHash: keyHash })
+      .where(and(eq(coderclawInstances.id, id), eq(coderclawInstances.tenantId, tenantId)))
+      .returning({ id: coderclawInstances.id });
+    if (!updated) return c.json({ error: 'not found' }, 404);
+
+    connections.invalidate(id);
+    return c.json({
+      apiKey: rawKey,
+      note:   'Save this API key — it will not be shown again. Paste it into your CoderClaw config.',
+    });
+  });
+
   // -------------------------------------------------------------------------
   // GET /api/claws/:id/status – connection status (no auth required for polling)
   // -------------------------------------------------------------------------
@@ -107,7 +145,76 @@ export function createClawRoutes(db: Db): Hono<ClawHonoEnv> {
       .from(coderclawInstances)
       .where(eq(coderclawInstances.id, id));
     if (!row) return c.json({ error: 'not found' }, 404);
-    return c.json({ connected: row.connectedAt !== null, connectedAt: row.connectedAt });
+    // connectedAt is coalesced per isolate; the relay knows whether a socket is
+    // attached now, and its answer is cached briefly so polls don't wake it
+    let connected = connections.getLiveStatus(id);
+    if (connected === undefined) {
+      connected = c.env.CLAW_RELAY
+        ? await relayOnline(c.env.CLAW_RELAY, id).catch(() => row.connectedAt !== null)
+        : row.connectedAt !== null;
+      connections.setLiveStatus(id, connected);
+    }
+    return c.json({ connected, connectedAt: row.connectedAt });
+  });
+
+  // -------------------------------------------------------------------------
+  // GET /api/claws/:id/relay/metrics – relay fan-out counters and latency
+  // -------------------------------------------------------------------------
+  router.get('/:id/relay/metrics', async (c) => {
+    const tenantId = c.get('tenantId') as number;
+    const id       = Number(c.req.param('id'));
+    const env      = c.env;
+
+    if (!env.CLAW_RELAY) return c.text('CLAW_RELAY binding not configured', 503);
+
+    const [claw] = await db
+      .select({ id: coderclawInstances.id })
+      .from(coderclawInstances)
+      .where(and(eq(coderclawInstances.id, id), eq(coderclawInstances.tenantId, tenantId)));
+    if (!claw) return c.json({ error: 'not found' }, 404);
+
+    const stub = env.CLAW_RELAY.get(env.CLAW_RELAY.idFromName(String(id)));
+    return stub.fetch('https://claw-relay/metrics');
+  });
+
+  // -------------------------------------------------------------------------
+  // GET /api/claws/:id/usage – coderClawLLM usage from the hourly rollup
+  // ?since=<ISO timestamp> (default: 7 days ago)  &bucket=hour|day (default day)
+  // -------------------------------------------------------------------------
+  router.get('/:id/usage', async (c) => {
+    const tenantId = c.get('tenantId') as number;
+    const id       = Number(c.req.param('id'));
+    const bucket   = c.req.query('bucket') === 'hour' ? 'hour' : 'day';
+    const sinceRaw = c.req.query('since');
+    const since    = sinceRaw ? new Date(sinceRaw) : new Date(Date.now() - 7 * 86_400_000);
+    if (Number.isNaN(since.getTime())) return c.json({ error: 'since must be an ISO timestamp' }, 400);
+
+    const start = sql<string>`date_trunc(${sql.raw(`'${bucket}'`)}, ${llmUsage.bucketStart})`;
+    const rows = await db
+      .select({
+        start,
+        requests:         sql<number>`sum(${llmUsage.requests})::int`,
+        cachedRequests:   sql<number>`sum(${llmUsage.cachedRequests})::int`,
+        promptTokens:     sql<number>`sum(${llmUsage.promptTokens})::int`,
+        completionTokens: sql<number>`sum(${llmUsage.completionTokens})::int`,
+      })
+      .from(llmUsage)
+      .where(and(
+        eq(llmUsage.clawId, id),
+        eq(llmUsage.tenantId, tenantId),
+        gte(llmUsage.bucketStart, since),
+      ))
+      .groupBy(start)
+      .orderBy(start);
+
+    const totals = { requests: 0, cachedRequests: 0, promptTokens: 0, completionTokens: 0 };
+    for (const row of rows) {
+      totals.requests         += row.requests;
+      totals.cachedRequests   += row.cachedRequests;
+      totals.promptTokens     += row.promptTokens;
+      totals.completionTokens += row.completionTokens;
+    }
+    return c.json({ bucket, since: since.toISOString(), buckets: rows, totals });
   });
 
   // -------------------------------------------------------------------------
@@ -150,37 +257,44 @@ export function createClawRoutes(db: Db): Hono<ClawHonoEnv> {
     if (!env.CLAW_RELAY) return c.text('CLAW_RELAY binding not configured', 503);
     if (!key) return c.text('Unauthorized', 401);
 
-    const [claw] = await db
-      .select({
-        id:         coderclawInstances.id,
-        apiKeyHash: coderclawInstances.apiKeyHash,
-        tenantId:   coderclawInstances.tenantId,
-      })
-      .from(coderclawInstances)
-      .where(eq(coderclawInstances.id, id));
+    // Reconnects are served from the per-isolate credential cache
+    const auth = await authenticateClaw(db, connections, id, key);
+    if (!auth.ok) return auth.status === 404 ? c.text('Not found', 404) : c.text('Unauthorized', 401);
 
-    if (!claw) return c.text('Not found', 404);
-
-    const valid = await verifySecret(key, claw.apiKeyHash);
-    if (!valid) return c.text('Unauthorized', 401);
-
-    // Mark as connected
-    await db
-      .update(coderclawInstances)
-      .set({ connectedAt: new Date(), lastSeenAt: new Date() })
-      .where(eq(coderclawInstances.id, id));
+    // Mark as connected (coalesced: at most once per interval per claw)
+    if (connections.shouldRecordConnect(id)) {
+      const now = new Date();
+      c.executionCtx.waitUntil(
+        db
+          .update(coderclawInstances)
+          .set({ connectedAt: now, lastSeenAt: now })
+          .where(eq(coderclawInstances.id, id))
+          .catch((err) => console.error(`[claw ${id}] presence write failed`, err)),
+      );
+    }
 
     const stub = env.CLAW_RELAY.get(env.CLAW_RELAY.idFromName(String(id)));
     const url  = new URL(c.req.url);
     url.searchParams.set('role', 'upstream');
+    // Lets the relay tell the tenant's execution dispatcher who came online
+    url.searchParams.set('claw', String(id));
+    url.searchParams.set('tenant', String(auth.tenantId));
     const response = await stub.fetch(new Request(url.toString(), c.req.raw));
 
-    // When the WS closes, mark as disconnected (best-effort)
+    // When the WS closes, mark as disconnected (best-effort) – unless the claw
+    // has already reconnected, possibly through another isolate whose
+    // coalesced connect write was skipped.
     response.webSocket?.addEventListener('close', async () => {
-      await db
-        .update(coderclawInstances)
-        .set({ connectedAt: null })
-        .where(eq(coderclawInstances.id, id));
+      try {
+        if (await relayOnline(env.CLAW_RELAY, id)) return;
+        connections.recordDisconnect(id);
+        await db
+          .update(coderclawInstances)
+          .set({ connectedAt: null })
+          .where(eq(coderclawInstances.id, id));
+      } catch (err) {
+        console.error(`[claw ${id}] disconnect write failed`, err);
+      }
     });
 
     return response;
@@ -1,23 +1,271 @@
 /**
  * coderClawLLM routes — OpenAI-compatible LLM proxy.
  *
- * POST  /v1/chat/completions   – proxied chat completion (429 failover)
+ * POST  /v1/chat/completions   – proxied chat completion (429 failover, opt-in cache)
  * GET   /v1/models             – list the free model pool + status
  * GET   /v1/health             – health check
+ *
+ * Claws identify themselves with `x-coderclaw-claw-id` and their API key as
+ * the bearer token; they are rate limited per claw and their usage is
+ * metered.  Other callers are rate limited per client IP.
  */
-import { Hono } from 'hono';
-import type { HonoEnv } from '../../env';
+import { Hono, type Context } from 'hono';
+import type { Env, HonoEnv } from '../../env';
 import {
   LlmProxyService,
   FREE_MODEL_POOL,
   type ChatCompletionRequest,
+  type ProxyResult,
+  type RoutingOptions,
 } from '../../application/llm/LlmProxyService';
+import { CompletionFlight, type CompletionHead } from '../../application/llm/CompletionFlight';
+import type { IModelHealthStore } from '../../domain/llm/ModelHealth';
+import { LocalModelHealthStore } from '../../infrastructure/llm/LocalModelHealthStore';
+import { SharedModelHealthStore } from '../../infrastructure/llm/SharedModelHealthStore';
+import { CompletionCache, MAX_CACHED_BYTES, completionKey } from '../../infrastructure/llm/CompletionCache';
+import { UsageTap } from '../../application/llm/UsageTap';
+import { ANONYMOUS_QUOTA, CLAW_QUOTA, type QuotaDecision, type QuotaPolicy } from '../../domain/llm/Quota';
+import { LlmRateLimiter } from '../../infrastructure/llm/LlmRateLimiter';
+import { LlmUsageBuffer } from '../../infrastructure/counters/LlmUsageBuffer';
+import { ClawConnectionCache } from '../../infrastructure/relay/ClawConnectionCache';
+import type { Db } from '../../infrastructure/database/connection';
+import { authenticateClaw } from '../middleware/clawAuth';
+
+/** Append `"_coderclaw": {...}` to a JSON object body; other bodies pass unchanged. */
+function withProxyMetadata(json: string, metadata: Record<string, unknown>): string {
+  const close = json.lastIndexOf('}');
+  if (close === -1 || !json.trimStart().startsWith('{')) return json;
+  const empty = json.slice(0, close).trimEnd().endsWith('{');
+  return `${json.slice(0, close)}${empty ? '' : ','}"_coderclaw":${JSON.stringify(metadata)}${json.slice(close)}`;
+}
+
+/** Header values that opt a request into the completion cache. */
+const CACHE_OPT_IN = new Set(['1', 'true', 'on']);
+
+const DEFAULT_CACHE_TTL_SECONDS = 3600;
+
+function headOf(result: ProxyResult): CompletionHead {
+  return {
+    status:        result.response.status,
+    contentType:   result.response.headers.get('content-type'),
+    resolvedModel: result.resolvedModel,
+    retries:       result.retries,
+    hedged:        result.hedged,
+  };
+}
+
+/** True if an SSE transcript ran to its `[DONE]` terminator. */
+function endsWithDone(body: Uint8Array): boolean {
+  return new TextDecoder().decode(body.subarray(-64)).includes('[DONE]');
+}
+
+/** Render a completion: streams pass through, JSON gets `_coderclaw` spliced in. */
+async function respond(
+  stream: boolean,
+  head:   CompletionHead,
+  body:   ReadableStream<Uint8Array> | null,
+  extra:  Record<string, string> = {},
+): Promise<Response> {
+  // Expose which model actually served + retry count
+  const meta = {
+    'x-coderclaw-model':   head.resolvedModel,
+    'x-coderclaw-retries': String(head.retries),
+    ...(head.hedged ? { 'x-coderclaw-hedged': 'true' } : {}),
+    ...extra,
+  };
+
+  // Stream passthrough: hand the (already inspected) upstream body straight on
+  if (stream && body) {
+    return new Response(body, {
+      status:  head.status,
+      headers: {
+        ...(head.contentType ? { 'content-type': head.contentType } : {}),
+        ...meta,
+        'cache-control': 'no-cache',
+        connection:      'keep-alive',
+      },
+    });
+  }
+
+  // Non-streaming: splice proxy metadata under a non-colliding key without
+  // re-parsing the completion
+  const text = body ? await new Response(body).text() : '';
+  return new Response(withProxyMetadata(text, {
+    resolvedModel: head.resolvedModel,
+    retries:       head.retries,
+    pool:          FREE_MODEL_POOL.length,
+  }), {
+    status:  head.status,
+    headers: { 'content-type': head.contentType ?? 'application/json', ...meta },
+  });
+}
+
+/** Who a completion is charged to. */
+interface LlmCaller {
+  /** LlmQuotaDO name. */
+  key:    string;
+  policy: QuotaPolicy;
+  claw?:  { id: number; tenantId: number };
+}
 
-export function createLlmRoutes(): Hono<HonoEnv> {
+function rateLimitHeaders(decision: QuotaDecision): Record<string, string> {
+  if (!Number.isFinite(decision.remainingRequests)) return {};
+  return {
+    'x-ratelimit-remaining-requests': String(decision.remainingRequests),
+    'x-ratelimit-remaining-tokens':   String(decision.remainingTokens),
+  };
+}
+
+export function createLlmRoutes(
+  db:          Db,
+  connections: ClawConnectionCache = new ClawConnectionCache(),
+  usage:       LlmUsageBuffer = new LlmUsageBuffer(db),
+): Hono<HonoEnv> {
   const router = new Hono<HonoEnv>();
 
+  // Quota: per-caller token buckets in LlmQuotaDO, fronted per isolate
+  let limiter: LlmRateLimiter | null = null;
+  const limiterFor = (env: Env): LlmRateLimiter => (limiter ??= new LlmRateLimiter(env.LLM_QUOTA));
+
+  /** Resolve the caller; null when claw credentials are present but wrong. */
+  const identify = async (c: Context<HonoEnv>): Promise<LlmCaller | null> => {
+    const clawHeader = c.req.header('x-coderclaw-claw-id');
+    if (clawHeader === undefined) {
+      return { key: `ip:${c.req.header('cf-connecting-ip') ?? 'unknown'}`, policy: ANONYMOUS_QUOTA };
+    }
+    const clawId = Number(clawHeader);
+    const key    = (c.req.header('Authorization') ?? '').replace(/^Bearer\s+/i, '');
+    if (!Number.isInteger(clawId) || !key) return null;
+
+    const auth = await authenticateClaw(db, connections, clawId, key);
+    if (!auth.ok) return null;
+    return {
+      key:    `claw:${auth.tenantId}:${clawId}`,
+      policy: CLAW_QUOTA,
+      claw:   { id: clawId, tenantId: auth.tenantId },
+    };
+  };
+
+  /**
+   * Attach quota headers and meter the response: the request is counted now,
+   * its tokens once the body has been fully sent.  Tokens served from the
+   * completion cache (hit or shared flight) are not charged.
+   */
+  const meter = (c: Context<HonoEnv>, caller: LlmCaller, decision: QuotaDecision, res: Response): Response => {
+    const cacheStatus = res.headers.get('x-coderclaw-cache');
+    const fromCache   = cacheStatus === 'hit' || cacheStatus === 'shared';
+    for (const [name, value] of Object.entries(rateLimitHeaders(decision))) res.headers.set(name, value);
+
+    if (caller.claw) {
+      usage.add(caller.claw.tenantId, caller.claw.id, { requests: 1, cachedRequests: fromCache ? 1 : 0 });
+    }
+    if (!res.body || fromCache) {
+      if (caller.claw) c.executionCtx.waitUntil(usage.drain());
+      return res;
+    }
+
+    const tap = new UsageTap();
+    c.executionCtx.waitUntil(tap.usage.then(async (used) => {
+      if (used) {
+        if (caller.claw) usage.add(caller.claw.tenantId, caller.claw.id, used);
+        await limiterFor(c.env).charge(caller.key, caller.policy, used.promptTokens + used.completionTokens);
+      }
+      if (caller.claw) await usage.drain();
+    }));
+    return new Response(res.body.pipeThrough(tap.stream), { status: res.status, headers: res.headers });
+  };
+
+  // Opt-in completion cache, plus identical requests currently in flight in
+  // this isolate (single-flight)
+  let completions: CompletionCache | null = null;
+  const completionCacheFor = (env: Env): CompletionCache => {
+    const ttl = Number(env.LLM_CACHE_TTL_SECONDS);
+    return completions ??= new CompletionCache(ttl > 0 ? ttl : DEFAULT_CACHE_TTL_SECONDS);
+  };
+  const inflight = new Map<string, CompletionFlight>();
+
+  // One health store per isolate: shared through MODEL_HEALTH when bound
+  let health: IModelHealthStore | null = null;
+  const proxyFor = (env: Env): LlmProxyService => {
+    health ??= env.MODEL_HEALTH
+      ? new SharedModelHealthStore(env.MODEL_HEALTH)
+      : new LocalModelHealthStore();
+    const hedgeAfterMs = Number(env.LLM_HEDGE_AFTER_MS);
+    const routing: RoutingOptions = {
+      ...(hedgeAfterMs > 0 ? { hedgeAfterMs } : {}),
+      ...(env.OPENROUTER_BASE_URL ? { baseUrl: env.OPENROUTER_BASE_URL } : {}),
+    };
+    return new LlmProxyService(env.OPENROUTER_API_KEY, health, routing);
+  };
+
+  /** Answer a validated completion request: from cache, a shared flight, or upstream. */
+  const serveCompletion = async (
+    c: Context<HonoEnv>, caller: LlmCaller, body: ChatCompletionRequest,
+  ): Promise<Response> => {
+    const stream = body.stream === true;
+
+    if (!CACHE_OPT_IN.has((c.req.header('x-coderclaw-cache') ?? '').toLowerCase())) {
+      const service = proxyFor(c.env);
+      const result = await service.complete(body);
+      c.executionCtx.waitUntil(service.flushHealth());
+      return respond(stream, headOf(result), result.response.body);
+    }
+
+    const key   = await completionKey(body, caller.key);
+    const cache = completionCacheFor(c.env);
+    const cacheHeaders = (status: string): Record<string, string> => ({
+      'x-coderclaw-cache':     status,
+      'x-coderclaw-cache-key': key.slice(0, 16),
+    });
+
+    const hit = await cache.match(key);
+    if (hit) {
+      const head: CompletionHead = {
+        status: 200, contentType: hit.contentType, resolvedModel: hit.resolvedModel, retries: 0, hedged: false,
+      };
+      return respond(stream, head, hit.body, {
+        ...cacheHeaders('hit'),
+        'x-coderclaw-cache-age': String(hit.ageSeconds),
+      });
+    }
+
+    let flight = inflight.get(key);
+    const status = flight ? 'shared' : 'miss';
+    if (!flight) {
+      // Too large to cache or replay: later callers go upstream instead of
+      // holding the whole body in this isolate
+      const release = () => { if (inflight.get(key) === leader) inflight.delete(key); };
+      const leader  = new CompletionFlight(MAX_CACHED_BYTES, release);
+      const service = proxyFor(c.env);
+      inflight.set(key, leader);
+      c.executionCtx.waitUntil(
+        leader.run(service.complete(body))
+          .then(async () => {
+            const content = leader.body(MAX_CACHED_BYTES);
+            if (!content) return;
+            const head = await leader.head;
+            if (head.status !== 200 || (stream && !endsWithDone(content))) return;
+            await cache.put(key, { body: content, contentType: head.contentType, resolvedModel: head.resolvedModel });
+          })
+          .catch((err) => console.error('[llm] completion cache write failed', err))
+          .finally(release)
+          .then(() => service.flushHealth()),
+      );
+      flight = leader;
+    }
+
+    const reader = flight.subscribe();
+    return respond(stream, await flight.head, reader, cacheHeaders(status));
+  };
+
   // -----------------------------------------------------------------------
   // POST /v1/chat/completions
+  //
+  // Send `x-coderclaw-cache: 1` to opt into the completion cache: identical
+  // requests (same messages and params) from the same caller are answered from
+  // the edge cache, or share the upstream call already in flight in this
+  // isolate.  Nothing is shared across claws, tenants or client addresses.  The response
+  // reports `x-coderclaw-cache: hit | miss | shared`.
   // -----------------------------------------------------------------------
   router.post('/v1/chat/completions', async (c) => {
     const apiKey = c.env.OPENROUTER_API_KEY;
@@ -25,46 +273,27 @@ export function createLlmRoutes(): Hono<HonoEnv> {
       return c.json({ error: 'LLM proxy not configured (missing OPENROUTER_API_KEY)' }, 503);
     }
 
+    const caller = await identify(c);
+    if (!caller) return c.json({ error: 'invalid claw credentials' }, 401);
+
     const body = await c.req.json<ChatCompletionRequest>();
     if (!body.messages || !Array.isArray(body.messages) || body.messages.length === 0) {
       return c.json({ error: 'messages array is required' }, 400);
     }
 
-    const service = new LlmProxyService(apiKey);
-    const result = await service.complete(body);
-
-    // Clone upstream headers we care about
-    const upstreamHeaders = new Headers();
-    const contentType = result.response.headers.get('content-type');
-    if (contentType) upstreamHeaders.set('content-type', contentType);
-    // Expose which model actually served + retry count
-    upstreamHeaders.set('x-coderclaw-model', result.resolvedModel);
-    upstreamHeaders.set('x-coderclaw-retries', String(result.retries));
-
-    // Stream passthrough: if the upstream is SSE, pipe it through
-    if (body.stream && result.response.body) {
-      upstreamHeaders.set('cache-control', 'no-cache');
-      upstreamHeaders.set('connection', 'keep-alive');
-      return new Response(result.response.body, {
-        status: result.response.status,
-        headers: upstreamHeaders,
-      });
+    const decision = await limiterFor(c.env).admit(caller.key, caller.policy);
+    if (!decision.allowed) {
+      const retryAfter = Math.max(1, Math.ceil(decision.retryAfterMs / 1000));
+      return c.json({
+        error: {
+          message: `Rate limit exceeded for this ${caller.claw ? 'claw' : 'client'}. Retry in ${retryAfter}s.`,
+          code:    429,
+          type:    'rate_limit_error',
+        },
+      }, 429, { 'retry-after': String(retryAfter), ...rateLimitHeaders(decision) });
     }
 
-    // Non-streaming: parse, augment with metadata, return
-    const upstream = await result.response.json() as Record<string, unknown>;
-    return c.json(
-      {
-        ...upstream,
-        // Inject proxy metadata under a non-colliding key
-        _coderclaw: {
-          resolvedModel: result.resolvedModel,
-          retries: result.retries,
-          pool: FREE_MODEL_POOL.length,
-        },
-      },
-      result.response.status as 200,
-    );
+    return meter(c, caller, decision, await serveCompletion(c, caller, body));
   });
 
   // -----------------------------------------------------------------------
@@ -76,11 +305,11 @@ export function createLlmRoutes(): Hono<HonoEnv> {
       // Still return the pool info, just flag unconfigured
       return c.json({ configured: false, models: FREE_MODEL_POOL });
     }
-    const service = new LlmProxyService(apiKey);
+    const service = proxyFor(c.env);
     return c.json({
       configured: true,
       object: 'list',
-      data: service.status(),
+      data: await service.status(),
     });
   });
 
@@ -9,63 +9,18 @@
  * by the orchestration API). Marketplace JWTs carry { sub, tid: 0 }.
  */
 import { Hono } from 'hono';
-import type { MiddlewareHandler } from 'hono';
+import type { Context, MiddlewareHandler } from 'hono';
 import { eq, and, sql, desc } from 'drizzle-orm';
 import type { Db } from '../../infrastructure/database/connection';
 import * as schema from '../../infrastructure/database/schema';
 import { signWebJwt, verifyWebJwt } from '../../infrastructure/auth/JwtService';
+import { hashPassword, verifyPassword } from '../../infrastructure/auth/HashService';
+import { EdgeCache } from '../../infrastructure/cache/EdgeCache';
+import { LruCache } from '../../infrastructure/cache/LruCache';
+import { SkillCounterBuffer } from '../../infrastructure/counters/SkillCounterBuffer';
+import { edgeCache } from '../middleware/edgeCache';
 import type { HonoEnv } from '../../env';
 
-// ---------------------------------------------------------------------------
-// Password hashing (PBKDF2 via Web Crypto – works in CF Workers)
-// ---------------------------------------------------------------------------
-
-async function hashPassword(password: string): Promise<string> {
-  const saltBytes = crypto.getRandomValues(new Uint8Array(16));
-  const saltHex = Array.from(saltBytes)
-    .map((b) => b.toString(16).padStart(2, '0'))
-    .join('');
-  const keyMat = await crypto.subtle.importKey(
-    'raw',
-    new TextEncoder().encode(password),
-    'PBKDF2',
-    false,
-    ['deriveBits'],
-  );
-  const bits = await crypto.subtle.deriveBits(
-    { name: 'PBKDF2', salt: saltBytes, iterations: 100_000, hash: 'SHA-256' },
-    keyMat,
-    256,
-  );
-  const hashHex = Array.from(new Uint8Array(bits))
-    .map((b) => b.toString(16).padStart(2, '0'))
-    .join('');
-  return `${saltHex}:${hashHex}`;
-}
-
-async function verifyPassword(input: string, stored: string): Promise<boolean> {
-  const [saltHex, hashHex] = stored.split(':');
-  const saltBytes = new Uint8Array(
-    (saltHex ?? '').match(/../g)?.map((h) => parseInt(h, 16)) ?? [],
-  );
-  const keyMat = await crypto.subtle.importKey(
-    'raw',
-    new TextEncoder().encode(input),
-    'PBKDF2',
-    false,
-    ['deriveBits'],
-  );
-  const bits = await crypto.subtle.deriveBits(
-    { name: 'PBKDF2', salt: saltBytes, iterations: 100_000, hash: 'SHA-256' },
-    keyMat,
-    256,
-  );
-  const inputHash = Array.from(new Uint8Array(bits))
-    .map((b) => b.toString(16).padStart(2, '0'))
-    .join('');
-  return inputHash === hashHex;
-}
-
 // ---------------------------------------------------------------------------
 // Marketplace-specific auth middleware
 // ---------------------------------------------------------------------------
@@ -89,8 +44,81 @@ const requireMarketplaceAuth: MiddlewareHandler<HonoEnv> = async (c, next) => {
 // Factory
 // ---------------------------------------------------------------------------
 
-export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
-  const router = new Hono<HonoEnv>();
+/** Seconds a public marketplace read may be served from the edge cache. */
+const PUBLIC_CACHE_TTL_SECONDS = 60;
+
+/** How long a listing total may be reused before it is recounted. */
+const TOTALS_TTL_MS = 5 * 60_000;
+
+export function createMarketplaceRoutes(
+  db:       Db,
+  cache:    EdgeCache          = new EdgeCache('marketplace', PUBLIC_CACHE_TTL_SECONDS),
+  counters: SkillCounterBuffer = new SkillCounterBuffer(db),
+): Hono<HonoEnv> {
+  const router      = new Hono<HonoEnv>();
+  const publicCache = edgeCache(cache);
+
+  // ── Listing totals ──────────────────────────────────────────────────────
+  // One grouped count serves the total for every category page, and search
+  // totals are memoised per query, so paging never recounts the table.
+
+  let categoryTotals: { byCategory: Map<string, number>; expiresAt: number } | null = null;
+  const searchTotals = new LruCache<string, number>(500);
+
+  async function countPublished(category?: string, q?: string): Promise<number> {
+    if (!q) {
+      if (!categoryTotals || categoryTotals.expiresAt <= Date.now()) {
+        const rows = await db
+          .select({ category: schema.marketplaceSkills.category, count: sql<number>`count(*)` })
+          .from(schema.marketplaceSkills)
+          .where(eq(schema.marketplaceSkills.published, true))
+          .groupBy(schema.marketplaceSkills.category);
+        categoryTotals = {
+          byCategory: new Map(rows.map((r) => [r.category, Number(r.count)])),
+          expiresAt:  Date.now() + TOTALS_TTL_MS,
+        };
+      }
+      const { byCategory } = categoryTotals;
+      if (category) return byCategory.get(category) ?? 0;
+      let total = 0;
+      for (const n of byCategory.values()) total += n;
+      return total;
+    }
+
+    const key    = `${category ?? ''}\n${q}`;
+    const cached = searchTotals.get(key);
+    if (cached !== undefined) return cached;
+
+    const conditions = [eq(schema.marketplaceSkills.published, true)];
+    if (category) conditions.push(eq(schema.marketplaceSkills.category, category));
+    const [row] = await db
+      .select({ count: sql<number>`count(*)` })
+      .from(schema.marketplaceSkills)
+      .where(sql`${and(...conditions)} AND ${schema.marketplaceSkills.searchVector} @@ websearch_to_tsquery(${q})`);
+    const count = Number(row?.count ?? 0);
+    searchTotals.set(key, count, Date.now() + TOTALS_TTL_MS);
+    return count;
+  }
+
+  /** Invalidate cached public reads after a write that changes them. */
+  function invalidatePublicReads(c: Context<HonoEnv>): void {
+    categoryTotals = null;
+    searchTotals.clear();
+    c.executionCtx.waitUntil(cache.bump());
+  }
+
+  /**
+   * A like only changes one skill's counter: evict that skill's cached page
+   * once the buffered delta is written.  Listings show the new count when
+   * their entries expire, like download counts.
+   */
+  function invalidateSkillPage(c: Context<HonoEnv>, after: Promise<void>): void {
+    // …/skills/:slug/like → …/skills/:slug, wherever the router is mounted
+    const page = new URL(c.req.url);
+    page.pathname = page.pathname.replace(/\/like$/, '');
+    page.search   = '';
+    c.executionCtx.waitUntil(after.then(() => cache.evict(page.href)));
+  }
 
   // ── Auth ────────────────────────────────────────────────────────────────
 
@@ -209,7 +237,7 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
   /**
    * GET /marketplace/users/:username – public profile + their skills
    */
-  router.get('/users/:username', async (c) => {
+  router.get('/users/:username', publicCache, async (c) => {
     const username = c.req.param('username');
     const [user] = await db
       .select({
@@ -276,6 +304,8 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
         avatar_url:   schema.users.avatarUrl,
         bio:          schema.users.bio,
       });
+    // Display name and avatar appear on profile and skill pages
+    invalidatePublicReads(c);
     return c.json({ user: updated });
   });
 
@@ -285,7 +315,7 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
    * GET /marketplace/skills – list published skills
    * Query: ?category=&q=&page=1&limit=24
    */
-  router.get('/skills', async (c) => {
+  router.get('/skills', publicCache, async (c) => {
     const { category, q, page = '1', limit = '24' } = c.req.query();
     const pageNum  = Math.max(1, Number(page));
     const limitNum = Math.min(100, Math.max(1, Number(limit)));
@@ -353,18 +383,25 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
         .offset(offset);
     }
 
-    const [{ count }] = await db
-      .select({ count: sql<number>`count(*)` })
-      .from(schema.marketplaceSkills)
-      .where(and(...conditions));
+    const total = await countPublished(category, q);
 
-    return c.json({ skills: rows, total: Number(count), page: pageNum, limit: limitNum });
+    return c.json({ skills: rows, total, page: pageNum, limit: limitNum });
   });
 
   /**
    * GET /marketplace/skills/:slug
+   * Every successful view counts as a download — including edge-cache hits
+   * and 304 revalidations, since this runs outside the cache middleware.
+   * Downloads are summed in memory and flushed in batches (SkillCounterBuffer).
    */
-  router.get('/skills/:slug', async (c) => {
+  const countDownload: MiddlewareHandler<HonoEnv> = async (c, next) => {
+    await next();
+    if (c.res.status !== 200 && c.res.status !== 304) return;
+    counters.addDownload(c.req.param('slug'));
+    c.executionCtx.waitUntil(counters.drain());
+  };
+
+  router.get('/skills/:slug', countDownload, publicCache, async (c) => {
     const slug = c.req.param('slug');
     const [row] = await db
       .select({
@@ -397,14 +434,6 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
       .limit(1);
     if (!row) return c.json({ error: 'Skill not found' }, 404);
 
-    // Fire-and-forget download counter increment
-    c.executionCtx.waitUntil(
-      db
-        .update(schema.marketplaceSkills)
-        .set({ downloads: sql`${schema.marketplaceSkills.downloads} + 1` })
-        .where(eq(schema.marketplaceSkills.slug, slug)),
-    );
-
     return c.json({ skill: row });
   });
 
@@ -445,6 +474,7 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
           repoUrl: body.repo_url ?? null,
         })
         .returning();
+      invalidatePublicReads(c);
       return c.json({ skill }, 201);
     } catch (err: unknown) {
       const msg = err instanceof Error ? err.message : String(err);
@@ -492,6 +522,7 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
       })
       .where(eq(schema.marketplaceSkills.slug, slug))
       .returning();
+    invalidatePublicReads(c);
     return c.json({ skill: updated });
   });
 
@@ -523,10 +554,8 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
             eq(schema.marketplaceSkillLikes.skillSlug, slug),
           ),
         );
-      await db
-        .update(schema.marketplaceSkills)
-        .set({ likes: sql`${schema.marketplaceSkills.likes} - 1` })
-        .where(eq(schema.marketplaceSkills.slug, slug));
+      counters.addLike(slug, -1);
+      invalidateSkillPage(c, counters.drain());
       return c.json({ liked: false });
     }
 
@@ -534,10 +563,8 @@ export function createMarketplaceRoutes(db: Db): Hono<HonoEnv> {
     await db
       .insert(schema.marketplaceSkillLikes)
       .values({ userId, skillSlug: slug });
-    await db
-      .update(schema.marketplaceSkills)
-      .set({ likes: sql`${schema.marketplaceSkills.likes} + 1` })
-      .where(eq(schema.marketplaceSkills.slug, slug));
+    counters.addLike(slug, 1);
+    invalidateSkillPage(c, counters.drain());
     return c.json({ liked: true });
   });
 
@@ -0,0 +1,30 @@
+import { Hono } from 'hono';
+import type { HonoEnv } from '../../env';
+import type { Tracer } from '../../infrastructure/tracing/Tracer';
+import { UnauthorizedError } from '../../domain/shared/errors';
+
+/**
+ * Operator metrics – not tenant-scoped, so guarded by the METRICS_TOKEN
+ * secret instead of a tenant JWT (404 when the secret is not set).
+ *
+ * GET /api/metrics/latency – route, query and span latency histograms
+ *
+ * Histograms are per isolate: each response describes the isolate that
+ * served it, since its last start.
+ */
+export function createMetricsRoutes(tracer: Tracer): Hono<HonoEnv> {
+  const router = new Hono<HonoEnv>();
+
+  router.use('*', async (c, next) => {
+    const token = c.env.METRICS_TOKEN;
+    if (!token) return c.json({ error: 'Not found' }, 404);
+    if (c.req.header('Authorization') !== `Bearer ${token}`) {
+      throw new UnauthorizedError('Invalid metrics token');
+    }
+    await next();
+  });
+
+  router.get('/latency', (c) => c.json(tracer.snapshot()));
+
+  return router;
+}
@@ -1,21 +1,75 @@
 import { Hono } from 'hono';
-import { RuntimeService } from '../../application/runtime/RuntimeService';
+import {
+  RuntimeService, type BatchItemResult, type SubmitItemDto, type UpdateItemDto,
+} from '../../application/runtime/RuntimeService';
 import { ExecutionStatus } from '../../domain/shared/types';
 import type { HonoEnv } from '../../env';
 import { authMiddleware } from '../middleware/authMiddleware';
+import { verifyJwt } from '../../infrastructure/auth/JwtService';
+import { decodeCursor, clampLimit } from '../../domain/shared/pagination';
+import { ValidationError } from '../../domain/shared/errors';
+import { domainErrorStatus } from '../middleware/errorHandler';
+
+/** Per-item batch results as sent to the client, plus summary counts. */
+function batchBody(results: BatchItemResult[]) {
+  const succeeded = results.filter((r) => r.ok).length;
+  return {
+    succeeded,
+    failed:  results.length - succeeded,
+    results: results.map((r) => r.ok
+      ? { index: r.index, ok: true,  execution: r.execution.toPlain() }
+      : { index: r.index, ok: false, status: domainErrorStatus(r.error) ?? 500, error: r.error.message }),
+  };
+}
+
+async function batchItems<T>(body: Promise<{ items?: T[] }>): Promise<T[]> {
+  const { items } = await body;
+  if (!Array.isArray(items)) throw new ValidationError('items array is required');
+  return items;
+}
 
 /**
  * Runtime routes – task execution lifecycle.
  *
  * POST   /api/runtime/executions             – submit a task for execution
- * GET    /api/runtime/executions             – list executions for caller's tenant
+ * POST   /api/runtime/executions/batch       – submit many tasks (per-item results)
+ * GET    /api/runtime/executions             – list executions for caller's tenant (keyset-paginated)
+ * GET    /api/runtime/capacity               – active executions vs. admission limits
+ * GET    /api/runtime/dispatch               – push-dispatch queue, leases and claw load
  * GET    /api/runtime/executions/:id         – get execution state
  * POST   /api/runtime/executions/:id/cancel  – cancel an execution
  * PATCH  /api/runtime/executions/:id/state   – agent callback: update state
+ * PATCH  /api/runtime/executions/state       – agent callback: update many states (per-item results)
  * GET    /api/runtime/tasks/:taskId/executions – history for a task
+ * GET    /api/runtime/events                 – WebSocket push of execution transitions
  */
 export function createRuntimeRoutes(runtimeService: RuntimeService): Hono<HonoEnv> {
   const router = new Hono<HonoEnv>();
+
+  // WebSocket subscription to the tenant's execution transitions.
+  // Registered ahead of authMiddleware: browsers cannot set headers on a WS
+  // upgrade, so the tenant JWT arrives as ?token= and is verified here.
+  // Optional ?task_id= narrows the stream to one task.
+  router.get('/events', async (c) => {
+    const env = c.env;
+    if (!env.TENANT_EVENTS) return c.text('TENANT_EVENTS binding not configured', 503);
+
+    const token = c.req.query('token');
+    if (!token) return c.text('Unauthorized', 401);
+
+    let tenantId: number;
+    try {
+      const payload = await verifyJwt(token, env.JWT_SECRET);
+      if (payload.tid == null) return c.text('Unauthorized', 401);
+      tenantId = payload.tid;
+    } catch {
+      return c.text('Unauthorized', 401);
+    }
+
+    const stub = env.TENANT_EVENTS.get(env.TENANT_EVENTS.idFromName(String(tenantId)));
+    return stub.fetch(new Request(c.req.url, c.req.raw));
+  });
+
   router.use('*', authMiddleware);
 
   // Submit a task for execution
@@ -35,11 +89,48 @@ export function createRuntimeRoutes(runtimeService: RuntimeService): Hono<HonoEn
     return c.json(execution.toPlain(), 201);
   });
 
-  // List executions for the caller's tenant
+  // Submit many tasks in one call: { items: [{ taskId, agentId?, payload? }, …] }
+  router.post('/executions/batch', async (c) => {
+    const items   = await batchItems(c.req.json<{ items?: SubmitItemDto[] }>());
+    const results = await runtimeService.submitMany(c.get('tenantId'), c.get('userId'), items);
+    return c.json(batchBody(results));
+  });
+
+  // Agent callback for many executions: { items: [{ id, status, result?, errorMessage? }, …] }
+  router.patch('/executions/state', async (c) => {
+    const items   = await batchItems(c.req.json<{ items?: UpdateItemDto[] }>());
+    const results = await runtimeService.updateMany(c.get('tenantId'), items);
+    return c.json(batchBody(results));
+  });
+
+  // List executions for the caller's tenant, newest first.
+  // GET /api/runtime/executions?limit=50&cursor=<next_cursor>
   router.get('/executions', async (c) => {
-    const limit = Number(c.req.query('limit') ?? '50');
-    const executions = await runtimeService.listByTenant(c.get('tenantId'), limit);
-    return c.json(executions.map(e => e.toPlain()));
+    const limit  = clampLimit(Number(c.req.query('limit') ?? '50'), 50);
+    const cursor = c.req.query('cursor');
+    const page = await runtimeService.listByTenant(
+      c.get('tenantId'),
+      limit,
+      cursor ? decodeCursor(cursor) : undefined,
+    );
+    return c.json({
+      executions:  page.items.map(e => e.toPlain()),
+      next_cursor: page.nextCursor,
+    });
+  });
+
+  // Active executions vs. admission-control limits
+  router.get('/capacity', async (c) => {
+    const capacity = await runtimeService.capacity(c.get('tenantId'));
+    return c.json(capacity);
+  });
+
+  // Push-dispatch queue, leases and per-claw load
+  router.get('/dispatch', async (c) => {
+    const ns = c.env.EXECUTION_DISPATCHER;
+    if (!ns) return c.text('EXECUTION_DISPATCHER binding not configured', 503);
+    const stub = ns.get(ns.idFromName(String(c.get('tenantId'))));
+    return stub.fetch('https://dispatcher/status');
   });
 
   // Get a single execution by ID
@@ -3,17 +3,75 @@ import { TaskService } from '../../application/task/TaskService';
 import { TaskPriority, AgentType, TaskStatus } from '../../domain/shared/types';
 import type { HonoEnv } from '../../env';
 import { authMiddleware } from '../middleware/authMiddleware';
+import { ValidationError } from '../../domain/shared/errors';
+import { decodeCursor, clampLimit } from '../../domain/shared/pagination';
+
+const STATUSES    = new Set<string>(Object.values(TaskStatus));
+const AGENT_TYPES = new Set<string>(Object.values(AgentType));
+
+/**
+ * A delta listing reaches back this far before the previous `as_of`, so a
+ * task written by a request still in flight at that instant is not missed.
+ * Clients merge deltas by id, so the overlap is harmless.
+ */
+const DELTA_OVERLAP_MS = 5_000;
+
+function parseDate(name: string, value: string | undefined): Date | undefined {
+  if (!value) return undefined;
+  const d = new Date(value);
+  if (Number.isNaN(d.getTime())) throw new ValidationError(`'${name}' must be an ISO-8601 timestamp`);
+  return d;
+}
+
+function parseStatuses(value: string | undefined): TaskStatus[] | undefined {
+  if (!value) return undefined;
+  const statuses = value.split(',').map((s) => s.trim()).filter(Boolean);
+  const unknown = statuses.find((s) => !STATUSES.has(s));
+  if (unknown) throw new ValidationError(`Unknown task status '${unknown}'`);
+  return statuses as TaskStatus[];
+}
+
+function parseAssignee(value: string | undefined): AgentType | undefined {
+  if (!value) return undefined;
+  if (!AGENT_TYPES.has(value)) throw new ValidationError(`Unknown agent type '${value}'`);
+  return value as AgentType;
+}
+
+/** 'true' → only archived, 'all' → both, anything else → only active. */
+function parseArchived(value: string | undefined, fallback: boolean | undefined): boolean | undefined {
+  if (value === 'true')  return true;
+  if (value === 'false') return false;
+  if (value === 'all')   return undefined;
+  return fallback;
+}
 
 export function createTaskRoutes(taskService: TaskService): Hono<HonoEnv> {
   const router = new Hono<HonoEnv>();
   router.use('*', authMiddleware);
 
-  // GET /api/tasks?project_id=1
+  // GET /api/tasks?project_id=&status=&archived=&assignee=&updated_since=&limit=100&cursor=
+  // With updated_since, archived defaults to 'all' so the board sees tasks
+  // leave as well as change. Pass the returned as_of as the next updated_since.
   router.get('/', async (c) => {
     const projectIdParam = c.req.query('project_id');
-    const projectId = projectIdParam ? Number(projectIdParam) : undefined;
-    const tasks = await taskService.listTasks(c.get('tenantId'), projectId);
-    return c.json({ tasks: tasks.map(t => t.toPlain()) });
+    const updatedSince   = parseDate('updated_since', c.req.query('updated_since'));
+    const cursor         = c.req.query('cursor');
+    const asOf           = new Date(Date.now() - DELTA_OVERLAP_MS);
+
+    const page = await taskService.listTasks(c.get('tenantId'), {
+      projectId:         projectIdParam ? Number(projectIdParam) : undefined,
+      statuses:          parseStatuses(c.req.query('status')),
+      archived:          parseArchived(c.req.query('archived'), updatedSince ? undefined : false),
+      assignedAgentType: parseAssignee(c.req.query('assignee')),
+      updatedSince,
+      limit:             clampLimit(Number(c.req.query('limit') ?? '100'), 100, 500),
+      cursor:            cursor ? decodeCursor(cursor) : undefined,
+    });
+    return c.json({
+      tasks:       page.items.map(t => t.toPlain()),
+      next_cursor: page.nextCursor,
+      as_of:       asOf.toISOString(),
+    });
   });
 
   // GET /api/tasks/:id
@@ -0,0 +1,10 @@
+/**
+ * The slice of `node:async_hooks` the Workers runtime provides under the
+ * `nodejs_compat` flag (used for per-request tracing).
+ */
+declare module 'node:async_hooks' {
+  export class AsyncLocalStorage<T> {
+    getStore(): T | undefined;
+    run<R>(store: T, fn: () => R): R;
+  }
+}
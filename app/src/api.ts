@@ -2,6 +2,8 @@
  *  Manages JWT tokens and talks to api.coderclaw.ai.
  */
 
+import { EntityStore, QueryCache } from "./cache.js";
+
 const BASE = (typeof window !== "undefined" && (window as unknown as { API_URL?: string }).API_URL)
   ?? "https://api.coderclaw.ai";
 
@@ -13,14 +15,20 @@ const WEB_TOKEN_KEY  = "ccl-web-token";
 const TENANT_TOKEN_KEY = "ccl-tenant-token";
 const TENANT_ID_KEY  = "ccl-tenant-id";
 const USER_KEY       = "ccl-user";
+const REFRESH_TOKEN_KEY = "ccl-refresh-token";
 
 export function getWebToken(): string | null   { return localStorage.getItem(WEB_TOKEN_KEY); }
 export function getTenantToken(): string | null { return localStorage.getItem(TENANT_TOKEN_KEY); }
 export function getTenantId(): string | null    { return localStorage.getItem(TENANT_ID_KEY); }
+export function getRefreshToken(): string | null { return localStorage.getItem(REFRESH_TOKEN_KEY); }
 
 export function setWebToken(t: string)   { localStorage.setItem(WEB_TOKEN_KEY, t); }
 export function setTenantToken(t: string) { localStorage.setItem(TENANT_TOKEN_KEY, t); }
-export function setTenantId(id: string)  { localStorage.setItem(TENANT_ID_KEY, id); }
+export function setRefreshToken(t: string) { localStorage.setItem(REFRESH_TOKEN_KEY, t); }
+export function setTenantId(id: string)  {
+  if (id !== getTenantId()) resetCache();
+  localStorage.setItem(TENANT_ID_KEY, id);
+}
 
 export function setUser(u: UserInfo)   { localStorage.setItem(USER_KEY, JSON.stringify(u)); }
 export function getUser(): UserInfo | null {
@@ -33,6 +41,86 @@ export function clearSession() {
   localStorage.removeItem(TENANT_TOKEN_KEY);
   localStorage.removeItem(TENANT_ID_KEY);
   localStorage.removeItem(USER_KEY);
+  localStorage.removeItem(REFRESH_TOKEN_KEY);
+  resetCache();
+}
+
+// ---------------------------------------------------------------------------
+// Session renewal
+// ---------------------------------------------------------------------------
+
+/** Renew an access token this close to its expiry instead of letting a request 401. */
+const RENEW_BEFORE_MS = 2 * 60_000;
+
+/** `exp` of a JWT in ms (0 if unreadable). */
+function tokenExpiry(jwt: string): number {
+  try {
+    const body = jwt.split(".")[1]!.replace(/-/g, "+").replace(/_/g, "/");
+    return (JSON.parse(atob(body)) as { exp: number }).exp * 1000;
+  } catch { return 0; }
+}
+
+// Renewals are serialized: each one consumes the refresh token the previous one stored
+let renewals: Promise<unknown> = Promise.resolve();
+let renewing: Promise<boolean> | null = null;
+
+/**
+ * Rotate the refresh token for a new access token: tenant-scoped when
+ * `tenantId` is given, a web token otherwise.  Resolves false when there is
+ * no refresh token or the server refused it.
+ */
+function renewSession(tenantId: string | null): Promise<boolean> {
+  const run = renewals.then(async () => {
+    const refreshToken = getRefreshToken();
+    if (!refreshToken) return false;
+    const res = await fetch(`${BASE}/api/auth/refresh`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refreshToken, tenantId: tenantId ? Number(tenantId) : undefined }),
+    });
+    if (!res.ok) return false;
+    const body = await res.json() as { token: string; refreshToken: string };
+    setRefreshToken(body.refreshToken);
+    if (tenantId) setTenantToken(body.token);
+    else setWebToken(body.token);
+    return true;
+  });
+  renewals = run.catch(() => undefined);
+  return run;
+}
+
+/** Renew the current session's access token (concurrent callers share one renewal). */
+export function refreshSession(): Promise<boolean> {
+  const before = getRefreshToken();
+  // Refused because another tab rotated the token first: its tokens are already stored
+  renewing ??= renewSession(getTenantId())
+    .then(ok => ok || (before !== null && getRefreshToken() !== before))
+    .finally(() => { renewing = null; });
+  return renewing;
+}
+
+/** Renew ahead of time if the stored access token is about to expire. */
+export async function ensureFreshSession(): Promise<void> {
+  const current = getTenantToken() ?? getWebToken();
+  if (!current || !getRefreshToken()) return;
+  if (tokenExpiry(current) - Date.now() > RENEW_BEFORE_MS) return;
+  await refreshSession().catch(() => false);
+}
+
+// ---------------------------------------------------------------------------
+// Client cache
+// ---------------------------------------------------------------------------
+
+/** Cached listings are shown instantly and revalidated once older than this. */
+const STALE_MS = 30_000;
+
+const queries = new QueryCache(STALE_MS);
+const taskStore = new EntityStore<Task>();
+
+/** Drop everything cached for the current session / tenant. */
+export function resetCache() {
+  queries.clear();
+  taskStore.clear();
 }
 
 // ---------------------------------------------------------------------------
@@ -43,19 +131,40 @@ export class ApiError extends Error {
   constructor(public status: number, message: string) { super(message); }
 }
 
-async function request<T>(
-  path: string,
-  opts: RequestInit & { token?: string | null } = {}
-): Promise<T> {
-  const { token, ...rest } = opts;
+/** GETs in flight, by bearer + path: identical concurrent reads share one fetch. */
+const inflight = new Map<string, Promise<unknown>>();
+
+interface RequestOptions extends RequestInit {
+  token?: string | null;
+  /** Renew an expiring / rejected access token and retry (off for the login calls). */
+  renew?: boolean;
+}
+
+function request<T>(path: string, opts: RequestOptions = {}): Promise<T> {
+  const { token, renew = true, ...rest } = opts;
+  if ((rest.method ?? "GET") !== "GET") return send<T>(path, rest, token, renew);
+
+  const key = `${token ?? getTenantToken() ?? getWebToken() ?? ""} ${path}`;
+  let pending = inflight.get(key) as Promise<T> | undefined;
+  if (!pending) {
+    pending = send<T>(path, rest, token, renew).finally(() => inflight.delete(key));
+    inflight.set(key, pending);
+  }
+  return pending;
+}
+
+async function send<T>(path: string, init: RequestInit, token: string | null | undefined, renew: boolean): Promise<T> {
+  if (renew) await ensureFreshSession();
   const bearer = token ?? getTenantToken() ?? getWebToken();
-  const headers = new Headers(rest.headers);
+  const headers = new Headers(init.headers);
   headers.set("Content-Type", "application/json");
   if (bearer) headers.set("Authorization", `Bearer ${bearer}`);
 
-  const res = await fetch(`${BASE}${path}`, { ...rest, headers });
+  const res = await fetch(`${BASE}${path}`, { ...init, headers });
 
   if (res.status === 401) {
+    // Expired access token: renew once and retry before giving up on the session
+    if (renew && await refreshSession()) return send<T>(path, init, token, false);
     clearSession();
     window.dispatchEvent(new CustomEvent("ccl:unauthorized"));
   }
@@ -137,6 +246,24 @@ export interface Claw {
   createdAt: string;
 }
 
+export interface LlmUsageTotals {
+  requests: number;
+  cachedRequests: number;
+  promptTokens: number;
+  completionTokens: number;
+}
+
+export interface LlmUsageBucket extends LlmUsageTotals {
+  start: string;
+}
+
+export interface LlmUsage {
+  bucket: "hour" | "day";
+  since: string;
+  buckets: LlmUsageBucket[];
+  totals: LlmUsageTotals;
+}
+
 export interface ClawRegistration extends Claw {
   apiKey: string; // one-time plaintext key
 }
@@ -173,21 +300,33 @@ export interface SkillAssignment {
 // Auth
 // ---------------------------------------------------------------------------
 
+interface WebSession {
+  token: string;
+  refreshToken?: string;
+  user: UserInfo;
+}
+
 export const auth = {
   async register(email: string, username: string, password: string): Promise<{ token: string; user: UserInfo }> {
-    return request("/api/auth/web/register", {
+    const res = await request<WebSession>("/api/auth/web/register", {
       method: "POST",
       body: JSON.stringify({ email, username, password }),
       token: null,
+      renew: false,
     });
+    if (res.refreshToken) setRefreshToken(res.refreshToken);
+    return res;
   },
 
   async login(email: string, password: string): Promise<{ token: string; user: UserInfo }> {
-    return request("/api/auth/web/login", {
+    const res = await request<WebSession>("/api/auth/web/login", {
       method: "POST",
       body: JSON.stringify({ email, password }),
       token: null,
+      renew: false,
     });
+    if (res.refreshToken) setRefreshToken(res.refreshToken);
+    return res;
   },
 
   async tenantToken(tenantId: string): Promise<{ token: string }> {
@@ -197,6 +336,32 @@ export const auth = {
     });
   },
 
+  /**
+   * Enter a workspace: stores its tenant token and id.  Sessions with a
+   * refresh token switch by rotating it (no password / membership reload);
+   * older sessions fall back to /tenant-token.
+   */
+  async switchTenant(tenantId: string): Promise<void> {
+    if (getRefreshToken() && await renewSession(tenantId)) {
+      setTenantId(tenantId);
+      return;
+    }
+    const { token } = await auth.tenantToken(tenantId);
+    setTenantToken(token);
+    setTenantId(tenantId);
+  },
+
+  /** Revoke the session server-side (best effort; storage is cleared by the caller). */
+  async logout(): Promise<void> {
+    const refreshToken = getRefreshToken();
+    if (!refreshToken) return;
+    await request("/api/auth/logout", {
+      method: "POST",
+      body: JSON.stringify({ refreshToken }),
+      renew: false,
+    }).catch(() => undefined);
+  },
+
   async listTenants(): Promise<TenantSummary[]> {
     const res = await request<{ tenants: TenantSummary[] }>("/api/tenants/mine");
     return res.tenants;
@@ -238,16 +403,26 @@ export const projects = {
     return res.projects;
   },
 
+  /** Stale-while-revalidate listing: `apply` sees the cached list, then the fresh one. */
+  read(apply: (projects: Project[]) => void): Promise<void> {
+    return queries.read("projects", projects.list, apply);
+  },
+
   async create(data: { name: string; description?: string }): Promise<Project> {
-    return request("/api/projects", { method: "POST", body: JSON.stringify(data) });
+    const created = await request<Project>("/api/projects", { method: "POST", body: JSON.stringify(data) });
+    queries.update<Project[]>("projects", list => [created, ...list]);
+    return created;
   },
 
   async update(id: string, data: Partial<Project>): Promise<Project> {
-    return request(`/api/projects/${id}`, { method: "PATCH", body: JSON.stringify(data) });
+    const updated = await request<Project>(`/api/projects/${id}`, { method: "PATCH", body: JSON.stringify(data) });
+    queries.update<Project[]>("projects", list => list.map(p => p.id === updated.id ? updated : p));
+    return updated;
   },
 
   async remove(id: string): Promise<void> {
-    return request(`/api/projects/${id}`, { method: "DELETE" });
+    await request(`/api/projects/${id}`, { method: "DELETE" });
+    queries.update<Project[]>("projects", list => list.filter(p => p.id !== id));
   },
 };
 
@@ -255,26 +430,97 @@ export const projects = {
 // Tasks
 // ---------------------------------------------------------------------------
 
+export interface TaskListParams {
+  projectId?: string;
+  status?: string;
+  /** Include archived tasks alongside active ones. */
+  archived?: boolean;
+}
+
+export interface TaskSnapshot {
+  tasks: Task[];
+  /** Pass to `tasks.changedSince` to fetch only what changed after this listing. */
+  asOf: string;
+}
+
+/** Follow next_cursor until the listing is exhausted. */
+async function listAllTasks(q: URLSearchParams): Promise<TaskSnapshot> {
+  const all: Task[] = [];
+  let asOf = "";
+  let cursor: string | null = null;
+  do {
+    if (cursor) q.set("cursor", cursor);
+    const res = await request<{ tasks: Task[]; next_cursor: string | null; as_of: string }>(
+      `/api/tasks?${q}`,
+    );
+    if (!asOf) asOf = res.as_of;
+    all.push(...res.tasks);
+    cursor = res.next_cursor;
+  } while (cursor);
+  return { tasks: all, asOf };
+}
+
+function taskQuery(params?: TaskListParams): URLSearchParams {
+  const q = new URLSearchParams({ limit: "500" });
+  if (params?.projectId) q.set("project_id", params.projectId);
+  if (params?.status)    q.set("status", params.status);
+  if (params?.archived)  q.set("archived", "all");
+  return q;
+}
+
 export const tasks = {
-  async list(params?: { projectId?: string; status?: string; archived?: boolean }): Promise<Task[]> {
-    const q = new URLSearchParams();
-    if (params?.projectId) q.set("projectId", params.projectId);
-    if (params?.status)    q.set("status", params.status);
-    if (params?.archived)  q.set("archived", "true");
-    const res = await request<{ tasks: Task[] }>(`/api/tasks${q.size ? `?${q}` : ""}`);
-    return res.tasks;
+  async list(params?: TaskListParams): Promise<Task[]> {
+    return (await listAllTasks(taskQuery(params))).tasks;
+  },
+
+  /** Full listing; also becomes the cached snapshot for these params. */
+  async snapshot(params?: TaskListParams): Promise<TaskSnapshot> {
+    const q = taskQuery(params);
+    const epoch = taskStore.epoch;
+    const snapshot = await listAllTasks(q);
+    taskStore.setList(q.toString(), epoch, { items: snapshot.tasks, asOf: snapshot.asOf });
+    return snapshot;
+  },
+
+  /** The last snapshot for these params, kept current by later deltas and edits. */
+  cached(params?: TaskListParams): TaskSnapshot | null {
+    const listing = taskStore.list(taskQuery(params).toString());
+    return listing ? { tasks: listing.items, asOf: listing.asOf } : null;
+  },
+
+  /** Tasks created, modified or archived since a previous snapshot's `asOf`. */
+  async changedSince(asOf: string, params?: TaskListParams): Promise<TaskSnapshot> {
+    const q = taskQuery(params);
+    const key = q.toString();
+    const epoch = taskStore.epoch;
+    q.set("updated_since", asOf);
+    if (!params?.archived) q.set("archived", "all");
+    const delta = await listAllTasks(q);
+    const archived = params?.archived ? [] : delta.tasks.filter(t => t.archived);
+    taskStore.patchList(
+      key, epoch,
+      delta.tasks.filter(t => !archived.includes(t)),
+      archived.map(t => t.id),
+      delta.asOf,
+    );
+    return delta;
   },
 
   async create(data: Partial<Task>): Promise<Task> {
-    return request("/api/tasks", { method: "POST", body: JSON.stringify(data) });
+    const created = await request<Task>("/api/tasks", { method: "POST", body: JSON.stringify(data) });
+    taskStore.put([created]);
+    return created;
   },
 
   async update(id: string, data: Partial<Task>): Promise<Task> {
-    return request(`/api/tasks/${id}`, { method: "PATCH", body: JSON.stringify(data) });
+    const updated = await request<Task>(`/api/tasks/${id}`, { method: "PATCH", body: JSON.stringify(data) });
+    taskStore.put([updated]);
+    return updated;
   },
 
   async remove(id: string): Promise<void> {
-    return request(`/api/tasks/${id}`, { method: "DELETE" });
+    await request(`/api/tasks/${id}`, { method: "DELETE" });
+    taskStore.remove(id);
   },
 
   async run(id: string, payload?: string): Promise<Execution> {
@@ -289,6 +535,20 @@ export const tasks = {
   },
 };
 
+// ---------------------------------------------------------------------------
+// Runtime
+// ---------------------------------------------------------------------------
+
+export const runtime = {
+  /** WebSocket URL for the tenant's execution event stream (optionally one task). */
+  eventsUrl(taskId?: string): string {
+    const base = BASE.replace(/^http/, "ws");
+    const q = new URLSearchParams({ token: getTenantToken() ?? "" });
+    if (taskId) q.set("task_id", taskId);
+    return `${base}/api/runtime/events?${q}`;
+  },
+};
+
 // ---------------------------------------------------------------------------
 // Claws
 // ---------------------------------------------------------------------------
@@ -299,18 +559,36 @@ export const claws = {
     return res.claws;
   },
 
+  /** Stale-while-revalidate listing: `apply` sees the cached list, then the fresh one. */
+  read(apply: (claws: Claw[]) => void): Promise<void> {
+    return queries.read("claws", claws.list, apply);
+  },
+
   async register(name: string): Promise<ClawRegistration> {
-    return request("/api/claws", { method: "POST", body: JSON.stringify({ name }) });
+    const registered = await request<ClawRegistration>("/api/claws", { method: "POST", body: JSON.stringify({ name }) });
+    // The one-time key is handed to the caller, never cached
+    const { apiKey: _apiKey, ...claw } = registered;
+    queries.update<Claw[]>("claws", list => [...list, claw]);
+    return registered;
   },
 
   async remove(id: string): Promise<void> {
-    return request(`/api/claws/${id}`, { method: "DELETE" });
+    await request(`/api/claws/${id}`, { method: "DELETE" });
+    queries.update<Claw[]>("claws", list => list.filter(c => c.id !== id));
   },
 
   async status(id: string): Promise<{ connected: boolean; clients: number }> {
     return request(`/api/claws/${id}/status`);
   },
 
+  /** coderClawLLM usage, rolled up per hour or day since `since` (server default: 7 days). */
+  async usage(id: string, params?: { since?: string; bucket?: "hour" | "day" }): Promise<LlmUsage> {
+    const q = new URLSearchParams();
+    if (params?.since) q.set("since", params.since);
+    if (params?.bucket) q.set("bucket", params.bucket);
+    return request<LlmUsage>(`/api/claws/${id}/usage${q.size ? `?${q}` : ""}`);
+  },
+
   /** WebSocket URL for connecting to a claw's relay */
   wsUrl(id: string): string {
     const base = BASE.replace(/^http/, "ws");
@@ -328,6 +606,11 @@ export const marketplace = {
     const res = await request<{ skills: Skill[] }>("/marketplace/skills");
     return res.skills;
   },
+
+  /** Stale-while-revalidate listing: `apply` sees the cached list, then the fresh one. */
+  read(apply: (skills: Skill[]) => void): Promise<void> {
+    return queries.read("skills", marketplace.list, apply);
+  },
 };
 
 export const skillAssignments = {
@@ -336,15 +619,22 @@ export const skillAssignments = {
     return res.assignments;
   },
 
+  /** Stale-while-revalidate listing: `apply` sees the cached list, then the fresh one. */
+  readTenant(apply: (assignments: SkillAssignment[]) => void): Promise<void> {
+    return queries.read("skill-assignments", skillAssignments.listTenant, apply);
+  },
+
   async assignTenant(slug: string): Promise<void> {
-    return request("/api/skill-assignments/tenant", {
+    await request("/api/skill-assignments/tenant", {
       method: "POST",
       body: JSON.stringify({ slug }),
     });
+    queries.invalidate("skill-assignments");
   },
 
   async unassignTenant(slug: string): Promise<void> {
-    return request(`/api/skill-assignments/tenant/${slug}`, { method: "DELETE" });
+    await request(`/api/skill-assignments/tenant/${slug}`, { method: "DELETE" });
+    queries.update<SkillAssignment[]>("skill-assignments", list => list.filter(a => a.slug !== slug));
   },
 
   async assignClaw(clawId: string, slug: string): Promise<void> {
@@ -364,6 +654,9 @@ export const executions = {
     const q = new URLSearchParams();
     if (params?.taskId) q.set("taskId", params.taskId);
     if (params?.clawId) q.set("clawId", params.clawId);
-    return request(`/api/runtime/executions${q.size ? `?${q}` : ""}`);
+    const res = await request<{ executions: Execution[]; next_cursor: string | null }>(
+      `/api/runtime/executions${q.size ? `?${q}` : ""}`,
+    );
+    return res.executions;
   },
 };
@@ -2,25 +2,34 @@ import { LitElement, html, css, type PropertyValues } from "lit";
 import { customElement, state } from "lit/decorators.js";
 
 import {
-  auth, tenants, clearSession,
+  auth, tenants, clearSession, ensureFreshSession,
   getWebToken, getTenantToken, getTenantId, getUser,
-  setWebToken, setTenantToken, setTenantId, setUser,
+  setWebToken, setUser,
   type TenantSummary, type UserInfo,
 } from "./api.js";
 
-// Views
-import "./views/auth.js";
-import "./views/workspace-picker.js";
-import "./views/projects.js";
-import "./views/tasks.js";
-import "./views/claws.js";
-import "./views/skills.js";
-import "./views/workspace.js";
-import "./views/logs.js";
+/** How often the stored access token is checked and renewed ahead of expiry. */
+const SESSION_CHECK_MS = 60_000;
 
 type AppState = "loading" | "landing" | "auth" | "workspace-picker" | "dashboard";
 type DashTab = "projects" | "tasks" | "claws" | "skills" | "workspace" | "logs";
 
+// Views are separate chunks, fetched on first use: first paint only pays for
+// the shell, and a tab never opened is never downloaded.
+const SCREENS: Partial<Record<AppState, () => Promise<unknown>>> = {
+  "auth":             () => import("./views/auth.js"),
+  "workspace-picker": () => import("./views/workspace-picker.js"),
+};
+
+const VIEWS: Record<DashTab, { tag: string; load: () => Promise<unknown> }> = {
+  tasks:     { tag: "ccl-tasks",     load: () => import("./views/tasks.js") },
+  projects:  { tag: "ccl-projects",  load: () => import("./views/projects.js") },
+  claws:     { tag: "ccl-claws",     load: () => import("./views/claws.js") },
+  skills:    { tag: "ccl-skills",    load: () => import("./views/skills.js") },
+  workspace: { tag: "ccl-workspace", load: () => import("./views/workspace.js") },
+  logs:      { tag: "ccl-logs",      load: () => import("./views/logs.js") },
+};
+
 @customElement("ccl-app")
 export class CclApp extends LitElement {
   // Disable shadow DOM so global CSS applies
@@ -34,22 +43,31 @@ export class CclApp extends LitElement {
   @state() private theme: "dark" | "light" = "dark";
   @state() private navCollapsed = false;
 
+  // Keeps the stored access token valid for WebSocket (re)connects, which
+  // read it from storage rather than going through request()
+  private sessionTimer: ReturnType<typeof setInterval> | null = null;
+
   override connectedCallback() {
     super.connectedCallback();
     this.loadTheme();
     this.bootstrap();
     window.addEventListener("ccl:unauthorized", this.handleUnauthorized);
+    this.sessionTimer = setInterval(() => void ensureFreshSession(), SESSION_CHECK_MS);
   }
 
   override disconnectedCallback() {
     super.disconnectedCallback();
     window.removeEventListener("ccl:unauthorized", this.handleUnauthorized);
+    if (this.sessionTimer !== null) clearInterval(this.sessionTimer);
+    this.sessionTimer = null;
   }
 
   override updated(changed: PropertyValues<this>) {
+    // <ccl-auth> / <ccl-workspace-picker> upgrade in place once their chunk lands
+    if (changed.has("appState")) void SCREENS[this.appState]?.();
     if (this.appState !== "dashboard") return;
     if (changed.has("appState") || changed.has("tab") || changed.has("tenant")) {
-      this.mountDashboardView();
+      void this.mountDashboardView();
     }
   }
 
@@ -69,7 +87,8 @@ export class CclApp extends LitElement {
     this.user = getUser();
 
     if (tenantToken && tenantId) {
-      // Restore last tenant
+      // Restore last tenant; fetch the default view alongside the tenant list
+      void VIEWS[this.tab].load();
       try {
         const list = await auth.listTenants();
         this.tenantList = list;
@@ -111,9 +130,7 @@ export class CclApp extends LitElement {
   private async handleSelectTenant(e: CustomEvent<TenantSummary>) {
     const t = e.detail;
     try {
-      const { token } = await auth.tenantToken(t.id);
-      setTenantToken(token);
-      setTenantId(t.id);
+      await auth.switchTenant(t.id);
       this.tenant = t;
       this.appState = "dashboard";
     } catch (err) {
@@ -124,9 +141,7 @@ export class CclApp extends LitElement {
   private async handleCreateTenant(e: CustomEvent<{ name: string }>) {
     try {
       const created = await tenants.create(e.detail.name);
-      const { token } = await auth.tenantToken(created.id);
-      setTenantToken(token);
-      setTenantId(created.id);
+      await auth.switchTenant(created.id);
       this.tenant = created;
       this.appState = "dashboard";
     } catch (err) {
@@ -135,6 +150,7 @@ export class CclApp extends LitElement {
   }
 
   private handleSignOut() {
+    void auth.logout();
     clearSession();
     this.user = null;
     this.tenant = null;
@@ -151,52 +167,29 @@ export class CclApp extends LitElement {
     this.tab = t;
   }
 
-  private mountDashboardView() {
+  private async mountDashboardView() {
+    const { tab, tenant } = this;
+    const loaded = await VIEWS[tab].load().then(
+      () => true,
+      (err: unknown) => { console.error(`Failed to load the ${tab} view`, err); return false; },
+    );
+    // Superseded while the chunk was loading
+    if (this.appState !== "dashboard" || this.tab !== tab || this.tenant !== tenant) return;
+
     const host = this.querySelector("#dashboard-view-host");
     if (!(host instanceof HTMLElement)) return;
-
-    const tenantId = this.tenant?.id ?? "";
-    let view: HTMLElement;
-
-    switch (this.tab) {
-      case "tasks": {
-        const el = document.createElement("ccl-tasks") as HTMLElement & { tenantId?: string };
-        el.tenantId = tenantId;
-        view = el;
-        break;
-      }
-      case "projects": {
-        const el = document.createElement("ccl-projects") as HTMLElement & { tenantId?: string };
-        el.tenantId = tenantId;
-        view = el;
-        break;
-      }
-      case "claws": {
-        const el = document.createElement("ccl-claws") as HTMLElement & { tenantId?: string };
-        el.tenantId = tenantId;
-        view = el;
-        break;
-      }
-      case "skills": {
-        const el = document.createElement("ccl-skills") as HTMLElement & { tenantId?: string };
-        el.tenantId = tenantId;
-        view = el;
-        break;
-      }
-      case "workspace": {
-        const el = document.createElement("ccl-workspace") as HTMLElement & { tenant?: TenantSummary | null };
-        el.tenant = this.tenant;
-        view = el;
-        break;
-      }
-      case "logs": {
-        const el = document.createElement("ccl-logs") as HTMLElement & { tenantId?: string };
-        el.tenantId = tenantId;
-        view = el;
-        break;
-      }
+    if (!loaded) {
+      host.textContent = "This view failed to load. Reload the page to try again.";
+      return;
     }
 
+    const view = document.createElement(VIEWS[tab].tag) as HTMLElement & {
+      tenantId?: string;
+      tenant?: TenantSummary | null;
+    };
+    if (tab === "workspace") view.tenant = tenant;
+    else view.tenantId = tenant?.id ?? "";
+
     host.replaceChildren(view);
   }
 
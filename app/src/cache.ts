@@ -0,0 +1,127 @@
+/** Client-side caches for API reads.
+ *
+ *  - `QueryCache` keeps the last response per key and serves it
+ *    stale-while-revalidate, so switching back to a view paints at once.
+ *  - `EntityStore` keeps records by id plus the membership of each listing,
+ *    so an update seen through one request is what every listing reads next.
+ *
+ *  Both are dropped wholesale with `clear()` (sign-out, tenant switch);
+ *  responses to requests started before a `clear()` are discarded.
+ */
+
+interface Entry<T> {
+  value: T;
+  fetchedAt: number;
+}
+
+export class QueryCache {
+  private entries = new Map<string, Entry<unknown>>();
+  private generation = 0;
+
+  /** `staleMs`: how long a cached value is served without revalidating. */
+  constructor(private readonly staleMs: number) {}
+
+  /**
+   * Stale-while-revalidate read.  `apply` gets the cached value right away
+   * (if any), then the fresh one once it arrives; a value younger than
+   * `staleMs` is not refetched.  Rejects only when nothing was cached.
+   */
+  async read<T>(key: string, load: () => Promise<T>, apply: (value: T) => void): Promise<void> {
+    const entry = this.entries.get(key) as Entry<T> | undefined;
+    if (entry) {
+      apply(entry.value);
+      if (Date.now() - entry.fetchedAt < this.staleMs) return;
+    }
+    const generation = this.generation;
+    try {
+      const value = await load();
+      if (generation !== this.generation) return;
+      this.entries.set(key, { value, fetchedAt: Date.now() });
+      apply(value);
+    } catch (e) {
+      if (!entry) throw e;
+    }
+  }
+
+  /** Write a mutation's result through to a cached value (no-op when absent). */
+  update<T>(key: string, fn: (value: T) => T): void {
+    const entry = this.entries.get(key) as Entry<T> | undefined;
+    if (entry) entry.value = fn(entry.value);
+  }
+
+  /** Keep serving the value, but revalidate on the next read. */
+  invalidate(key: string): void {
+    const entry = this.entries.get(key);
+    if (entry) entry.fetchedAt = 0;
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.generation++;
+  }
+}
+
+export interface Listing<T> {
+  items: T[];
+  /** Server watermark the listing is current as of. */
+  asOf: string;
+}
+
+export class EntityStore<T extends { id: string }> {
+  private entities = new Map<string, T>();
+  private lists = new Map<string, { ids: Set<string>; asOf: string }>();
+  private generation = 0;
+
+  /** Capture before a request; pass to `setList`/`patchList` with its response. */
+  get epoch(): number { return this.generation; }
+
+  get(id: string): T | undefined {
+    return this.entities.get(String(id));
+  }
+
+  /** Insert or replace records (ids compare as strings). */
+  put(items: readonly T[]): void {
+    for (const item of items) this.entities.set(String(item.id), item);
+  }
+
+  /** Forget a deleted record, including from every listing. */
+  remove(id: string): void {
+    const key = String(id);
+    this.entities.delete(key);
+    for (const list of this.lists.values()) list.ids.delete(key);
+  }
+
+  /** Record a full listing, replacing what `key` held before. */
+  setList(key: string, epoch: number, listing: Listing<T>): void {
+    if (epoch !== this.generation) return;
+    this.put(listing.items);
+    this.lists.set(key, { ids: new Set(listing.items.map(i => String(i.id))), asOf: listing.asOf });
+  }
+
+  /** Merge a delta into listing `key`: upsert `items`, drop the `removed` ids. */
+  patchList(key: string, epoch: number, items: readonly T[], removed: readonly string[], asOf: string): void {
+    const list = this.lists.get(key);
+    if (!list || epoch !== this.generation) return;
+    this.put(items);
+    for (const item of items) list.ids.add(String(item.id));
+    for (const id of removed) list.ids.delete(String(id));
+    list.asOf = asOf;
+  }
+
+  list(key: string): Listing<T> | undefined {
+    const list = this.lists.get(key);
+    if (!list) return undefined;
+    const items: T[] = [];
+    for (const id of list.ids) {
+      const item = this.entities.get(id);
+      if (item) items.push(item);
+    }
+    return { items, asOf: list.asOf };
+  }
+
+  clear(): void {
+    this.entities.clear();
+    this.lists.clear();
+    this.generation++;
+  }
+}
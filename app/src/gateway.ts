@@ -4,12 +4,22 @@
  * browser sessions to the CoderClaw instance.  The wire protocol is identical
  * to the CoderClaw gateway protocol so CoderClaw's existing server-side code
  * requires no changes.
+ *
+ * The relay numbers every upstream message.  The gateway remembers the last
+ * sequence it saw and reconnects with `?last_seq=`, so the relay replays what
+ * was missed instead of each tab asking the claw to resend its state.  If the
+ * relay no longer holds that sequence it says so, and the gateway emits
+ * `resume_expired` so views can re-request what the replay could not cover.
  */
 
+import { getTenantToken } from "./api.js";
+
 export type GatewayEvent =
-  | { type: "connected" }
+  | { type: "connected"; resumed: boolean }
   | { type: "disconnected"; code: number; reason: string }
   | { type: "claw_offline" }
+  | { type: "frames_dropped"; count: number }
+  | { type: "resume_expired" }
   | { type: "message"; data: unknown };
 
 export type GatewayEventHandler = (ev: GatewayEvent) => void;
@@ -18,41 +28,71 @@ export interface GatewayOptions {
   url: string;                  // wss://…/api/claws/:id/ws
   onEvent: GatewayEventHandler;
   clientName?: string;
+  /** Replay the relay's buffered history on the first connect too. */
+  replayHistory?: boolean;
 }
 
 const RECONNECT_DELAYS = [800, 1500, 3000, 5000, 10000, 15000];
 
+function parseFrame(raw: unknown): unknown {
+  try { return JSON.parse(raw as string); } catch { return raw; }
+}
+
 export class ClawGateway {
   private ws: WebSocket | null = null;
   private attempt = 0;
   private destroyed = false;
   private pingInterval: ReturnType<typeof setInterval> | null = null;
+  private lastSeq: number | null;
 
   constructor(private opts: GatewayOptions) {
+    this.lastSeq = opts.replayHistory ? 0 : null;
     this.connect();
   }
 
   private connect() {
     if (this.destroyed) return;
-    this.ws = new WebSocket(this.opts.url);
+    const resumed = this.lastSeq !== null;
+    const url = new URL(this.opts.url);
+    if (resumed) url.searchParams.set("last_seq", String(this.lastSeq));
+    // Access tokens are short-lived: reconnect with the current one, not the one baked into the URL
+    const token = getTenantToken();
+    if (token && url.searchParams.has("token")) url.searchParams.set("token", token);
+    this.ws = new WebSocket(url.toString());
 
     this.ws.addEventListener("open", () => {
       this.attempt = 0;
       this.schedulePings();
-      this.opts.onEvent({ type: "connected" });
+      this.opts.onEvent({ type: "connected", resumed });
     });
 
     this.ws.addEventListener("message", (ev) => {
-      let data: unknown;
-      try { data = JSON.parse(ev.data as string); } catch { data = ev.data; }
-      if (
-        data && typeof data === "object" &&
-        (data as { type?: string }).type === "claw_offline"
-      ) {
-        this.opts.onEvent({ type: "claw_offline" });
+      const data = parseFrame(ev.data);
+      const type = data && typeof data === "object" ? (data as { type?: string }).type : undefined;
+
+      // The relay batches bursts of upstream output into one frame
+      if (type === "relay_batch") {
+        const batch = data as { seq: number; messages: unknown[] };
+        batch.messages.forEach((raw, i) => {
+          // Skip anything already seen (replay overlapping a live batch)
+          const seq = batch.seq + i;
+          if (this.lastSeq !== null && seq <= this.lastSeq) return;
+          this.lastSeq = seq;
+          this.dispatch(parseFrame(raw));
+        });
+        return;
+      }
+      if (type === "relay_sync") {
+        const sync = data as { seq: number; expired?: boolean };
+        this.lastSeq = sync.seq;
+        if (sync.expired) this.opts.onEvent({ type: "resume_expired" });
         return;
       }
-      this.opts.onEvent({ type: "message", data });
+      if (type === "relay_dropped") {
+        this.opts.onEvent({ type: "frames_dropped", count: (data as { count: number }).count });
+        return;
+      }
+      this.dispatch(data);
     });
 
     this.ws.addEventListener("close", (ev) => {
@@ -86,6 +126,17 @@ export class ClawGateway {
     return this.ws?.readyState ?? WebSocket.CLOSED;
   }
 
+  private dispatch(data: unknown) {
+    if (
+      data && typeof data === "object" &&
+      (data as { type?: string }).type === "claw_offline"
+    ) {
+      this.opts.onEvent({ type: "claw_offline" });
+      return;
+    }
+    this.opts.onEvent({ type: "message", data });
+  }
+
   private schedulePings() {
     this.clearPings();
     this.pingInterval = setInterval(() => {
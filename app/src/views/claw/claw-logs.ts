@@ -45,7 +45,14 @@ export class CclClawLogs extends LitElement {
     this.gw = new ClawGateway({
       url: this.wsUrl,
       onEvent: (ev: GatewayEvent) => {
-        if (ev.type === "connected")    { this.connState = "connected"; this.gw?.send({ type: "logs.subscribe" }); return; }
+        if (ev.type === "connected") {
+          this.connState = "connected";
+          // A resumed session is replayed what it missed; only a fresh one subscribes
+          if (!ev.resumed) this.gw?.send({ type: "logs.subscribe" });
+          return;
+        }
+        // The relay no longer holds our cursor, so the replay has a hole
+        if (ev.type === "resume_expired") { this.gw?.send({ type: "logs.subscribe" }); return; }
         if (ev.type === "disconnected") { this.connState = "disconnected"; return; }
         if (ev.type === "claw_offline") { this.connState = "offline"; return; }
         if (ev.type !== "message") return;
@@ -1,9 +1,13 @@
 import { LitElement, html } from "lit";
 import { customElement, property, state } from "lit/decorators.js";
-import { executions, type Execution } from "../../api.js";
+import { claws, executions, type Execution, type LlmUsage } from "../../api.js";
 
 type TimeFilter = "today" | "week" | "month" | "all";
 
+const WINDOW_MS: Record<TimeFilter, number> = {
+  today: 86400000, week: 604800000, month: 2592000000, all: Infinity,
+};
+
 @customElement("ccl-claw-usage")
 export class CclClawUsage extends LitElement {
   override createRenderRoot() { return this; }
@@ -15,26 +19,44 @@ export class CclClawUsage extends LitElement {
   @state() private loading = true;
   @state() private error = "";
   @state() private timeFilter: TimeFilter = "week";
+  @state() private llm: LlmUsage | null = null;
 
   override connectedCallback() { super.connectedCallback(); this.load(); }
   override updated(c: Map<string, unknown>) { if (c.has("clawId") && this.clawId) this.load(); }
 
   private async load() {
     this.loading = true;
-    try { this.items = await executions.list({ clawId: this.clawId }); }
+    try {
+      const [items] = await Promise.all([executions.list({ clawId: this.clawId }), this.loadLlm()]);
+      this.items = items;
+    }
     catch (e) { this.error = (e as Error).message; }
     finally { this.loading = false; }
   }
 
+  /** LLM usage comes pre-aggregated from the hourly rollup, so refetch per window. */
+  private async loadLlm() {
+    const windowMs = WINDOW_MS[this.timeFilter];
+    const since = new Date(Number.isFinite(windowMs) ? Date.now() - windowMs : 0).toISOString();
+    try { this.llm = await claws.usage(this.clawId, { since, bucket: this.timeFilter === "today" ? "hour" : "day" }); }
+    catch { this.llm = null; }
+  }
+
+  private setFilter(f: TimeFilter) {
+    this.timeFilter = f;
+    void this.loadLlm();
+  }
+
   private filtered(): Execution[] {
     const now = Date.now();
-    const cutoffs: Record<TimeFilter, number> = {
-      today: 86400000, week: 604800000, month: 2592000000, all: Infinity,
-    };
-    const cutoff = cutoffs[this.timeFilter];
+    const cutoff = WINDOW_MS[this.timeFilter];
     return this.items.filter(e => now - new Date(e.createdAt).getTime() < cutoff);
   }
 
+  private tokens(n: number): string {
+    return n >= 1_000_000 ? `${(n / 1_000_000).toFixed(1)}M` : n >= 1000 ? `${(n / 1000).toFixed(1)}k` : String(n);
+  }
+
   private stats(items: Execution[]) {
     const total = items.length;
     const completed = items.filter(e => e.status === "completed").length;
@@ -62,7 +84,7 @@ export class CclClawUsage extends LitElement {
           <div style="font-size:14px;font-weight:600;color:var(--text-strong)">Usage</div>
           <div style="display:flex;gap:4px">
             ${(["today", "week", "month", "all"] as TimeFilter[]).map(f => html`
-              <button class="btn btn-sm ${this.timeFilter === f ? "btn-primary" : "btn-ghost"}" @click=${() => { this.timeFilter = f; }}>
+              <button class="btn btn-sm ${this.timeFilter === f ? "btn-primary" : "btn-ghost"}" @click=${() => this.setFilter(f)}>
                 ${f}
               </button>
             `)}
@@ -104,6 +126,39 @@ export class CclClawUsage extends LitElement {
                   </tbody>
                 </table>
               </div>`}
+
+        ${this.llm ? html`
+          <div style="font-size:13px;font-weight:600;color:var(--text-strong)">LLM</div>
+          <div class="stat-grid">
+            ${[
+              ["Requests", String(this.llm.totals.requests)],
+              ["Cached", String(this.llm.totals.cachedRequests)],
+              ["Prompt tokens", this.tokens(this.llm.totals.promptTokens)],
+              ["Completion tokens", this.tokens(this.llm.totals.completionTokens)],
+            ].map(([label, val]) => html`
+              <div class="stat-card">
+                <div class="stat-value">${val}</div>
+                <div class="stat-label">${label}</div>
+              </div>
+            `)}
+          </div>
+          ${this.llm.buckets.length > 0 ? html`
+            <div class="table-wrap">
+              <table class="table">
+                <thead><tr><th>${this.llm.bucket === "hour" ? "Hour" : "Day"}</th><th>Requests</th><th>Prompt</th><th>Completion</th></tr></thead>
+                <tbody>
+                  ${this.llm.buckets.slice().reverse().map(b => html`
+                    <tr>
+                      <td style="font-size:12px;color:var(--muted)">${this.fmt(b.start)}</td>
+                      <td style="font-size:12px">${b.requests}</td>
+                      <td style="font-size:12px">${this.tokens(b.promptTokens)}</td>
+                      <td style="font-size:12px">${this.tokens(b.completionTokens)}</td>
+                    </tr>
+                  `)}
+                </tbody>
+              </table>
+            </div>` : ""}
+        ` : ""}
       </div>
     `;
   }
@@ -1,30 +1,21 @@
-import { LitElement, html } from "lit";
+import { LitElement, html, type PropertyValues } from "lit";
 import { customElement, property, state } from "lit/decorators.js";
 import { claws as clawsApi, type Claw, type ClawRegistration } from "../api.js";
-import "./claw/chat.js";
-import "./claw/agents.js";
-import "./claw/config.js";
-import "./claw/sessions.js";
-import "./claw/claw-skills.js";
-import "./claw/usage.js";
-import "./claw/cron.js";
-import "./claw/nodes.js";
-import "./claw/channels.js";
-import "./claw/claw-logs.js";
 
 type Tab = "chat" | "agents" | "config" | "sessions" | "skills" | "usage" | "cron" | "nodes" | "channels" | "logs";
 
-const TABS: { id: Tab; label: string }[] = [
-  { id: "chat",     label: "Chat" },
-  { id: "agents",   label: "Agents" },
-  { id: "config",   label: "Config" },
-  { id: "sessions", label: "Sessions" },
-  { id: "skills",   label: "Skills" },
-  { id: "usage",    label: "Usage" },
-  { id: "cron",     label: "Cron" },
-  { id: "nodes",    label: "Nodes" },
-  { id: "channels", label: "Channels" },
-  { id: "logs",     label: "Logs" },
+/** Each panel is its own chunk, fetched when its tab is first opened. */
+const TABS: { id: Tab; label: string; load: () => Promise<unknown> }[] = [
+  { id: "chat",     label: "Chat",     load: () => import("./claw/chat.js") },
+  { id: "agents",   label: "Agents",   load: () => import("./claw/agents.js") },
+  { id: "config",   label: "Config",   load: () => import("./claw/config.js") },
+  { id: "sessions", label: "Sessions", load: () => import("./claw/sessions.js") },
+  { id: "skills",   label: "Skills",   load: () => import("./claw/claw-skills.js") },
+  { id: "usage",    label: "Usage",    load: () => import("./claw/usage.js") },
+  { id: "cron",     label: "Cron",     load: () => import("./claw/cron.js") },
+  { id: "nodes",    label: "Nodes",    load: () => import("./claw/nodes.js") },
+  { id: "channels", label: "Channels", load: () => import("./claw/channels.js") },
+  { id: "logs",     label: "Logs",     load: () => import("./claw/claw-logs.js") },
 ];
 
 @customElement("ccl-claws")
@@ -51,10 +42,17 @@ export class ClawsView extends LitElement {
     void this.loadClaws();
   }
 
+  override willUpdate(changed: PropertyValues<this>) {
+    // The panel element renders right away and upgrades once its chunk lands
+    if (this.panelOpen && (changed.has("panelOpen") || changed.has("activeTab"))) {
+      void TABS.find(t => t.id === this.activeTab)?.load();
+    }
+  }
+
   private async loadClaws() {
     this.loading = true;
     this.error = "";
-    try { this.clawList = await clawsApi.list(); }
+    try { await clawsApi.read(list => { this.clawList = list; this.loading = false; }); }
     catch (e: unknown) { this.error = (e as Error).message ?? "Failed to load claws"; }
     finally { this.loading = false; }
   }
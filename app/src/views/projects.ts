@@ -24,7 +24,7 @@ export class CclProjects extends LitElement {
   private async load() {
     this.loading = true;
     try {
-      this.items = await projectsApi.list();
+      await projectsApi.read(items => { this.items = items; this.loading = false; });
     } catch (e) {
       this.error = (e as Error).message;
     } finally {
@@ -20,12 +20,12 @@ export class CclSkills extends LitElement {
   private async load() {
     this.loading = true;
     try {
-      const [avail, asgn] = await Promise.all([
-        marketplace.list().catch(() => [] as Skill[]),
-        skillAssignments.listTenant().catch(() => [] as SkillAssignment[]),
+      await Promise.all([
+        marketplace.read(avail => { this.available = avail; this.loading = false; })
+          .catch(() => { this.available = []; }),
+        skillAssignments.readTenant(asgn => { this.assigned = asgn; this.loading = false; })
+          .catch(() => { this.assigned = []; }),
       ]);
-      this.available = avail;
-      this.assigned = asgn;
     } catch (e) { this.error = (e as Error).message; }
     finally { this.loading = false; }
   }
@@ -1,12 +1,16 @@
 import { LitElement, html } from "lit";
 import { customElement, property, state } from "lit/decorators.js";
 import {
-  tasks as tasksApi, projects as projectsApi, claws as clawsApi,
+  tasks as tasksApi, projects as projectsApi, claws as clawsApi, runtime as runtimeApi,
   type Task, type TaskStatus, type TaskPriority, type Project, type Claw, type Execution,
 } from "../api.js";
+import { ClawGateway, type GatewayEvent } from "../gateway.js";
 
 type ViewMode = "kanban" | "list" | "gantt";
 
+/** How often the board pulls task changes made elsewhere. */
+const REFRESH_INTERVAL_MS = 15_000;
+
 const STATUSES: TaskStatus[] = ["todo", "in_progress", "in_review", "done", "blocked"];
 const STATUS_LABELS: Record<TaskStatus, string> = {
   todo: "To Do", in_progress: "In Progress", in_review: "In Review",
@@ -18,6 +22,11 @@ const PRIORITY_COLOR: Record<TaskPriority, string> = {
   low: "badge-gray", medium: "badge-blue", high: "badge-yellow", critical: "badge-red",
 };
 
+const EXECUTION_COLOR: Record<string, string> = {
+  completed: "badge-green", failed: "badge-red",
+  running: "badge-blue", pending: "badge-gray", cancelled: "badge-gray",
+};
+
 @customElement("ccl-tasks")
 export class CclTasks extends LitElement {
   override createRenderRoot() { return this; }
@@ -51,18 +60,77 @@ export class CclTasks extends LitElement {
   // Drag
   @state() private dragTaskId = "";
 
+  // Live execution transitions pushed by the runtime, and the latest per task
+  private events: ClawGateway | null = null;
+  @state() private liveRuns = new Map<string, Execution>();
+
+  // Delta refresh: only tasks changed since the last listing are fetched
+  private asOf = "";
+  private refreshTimer: ReturnType<typeof setInterval> | null = null;
+
   override connectedCallback() {
     super.connectedCallback();
     this.load();
+    this.subscribe();
+    this.refreshTimer = setInterval(() => this.refreshChanges(), REFRESH_INTERVAL_MS);
+  }
+
+  override disconnectedCallback() {
+    super.disconnectedCallback();
+    this.events?.destroy();
+    this.events = null;
+    if (this.refreshTimer !== null) clearInterval(this.refreshTimer);
+    this.refreshTimer = null;
   }
 
+  private subscribe() {
+    this.events = new ClawGateway({
+      url: runtimeApi.eventsUrl(),
+      onEvent: (ev: GatewayEvent) => {
+        if (ev.type !== "message") return;
+        const msg = ev.data as { type?: string; execution?: Execution };
+        if (msg.type === "execution.updated" && msg.execution) this.applyExecution(msg.execution);
+      },
+    });
+  }
+
+  /** Merge a pushed execution into the board and the open drawer instead of refetching. */
+  private applyExecution(exec: Execution) {
+    const taskId = String(exec.taskId);
+    const latest = this.liveRuns.get(taskId);
+    if (!latest || String(latest.id) === String(exec.id) || exec.createdAt >= latest.createdAt) {
+      this.liveRuns = new Map(this.liveRuns).set(taskId, exec);
+    }
+
+    if (!this.drawerTask || taskId !== String(this.drawerTask.id)) return;
+    const known = this.drawerExecutions.some(e => String(e.id) === String(exec.id));
+    this.drawerExecutions = known
+      ? this.drawerExecutions.map(e => String(e.id) === String(exec.id) ? exec : e)
+      : [exec, ...this.drawerExecutions];
+  }
+
+  /**
+   * A board seen earlier this session paints from the client cache at once
+   * and catches up with a delta; only a first visit waits for a full listing.
+   */
   private async load() {
-    this.loading = true;
+    const params = { archived: this.showArchived };
+    const cached = tasksApi.cached(params);
+    if (cached) {
+      this.items = cached.tasks;
+      this.asOf  = cached.asOf;
+    }
+    this.loading = !cached;
     try {
-      [this.items, this.projects, this.claws] = await Promise.all([
-        tasksApi.list({ archived: this.showArchived }),
-        projectsApi.list(),
-        clawsApi.list(),
+      await Promise.all([
+        cached
+          ? this.refreshChanges()
+          : tasksApi.snapshot(params).then(snapshot => {
+              this.items = snapshot.tasks;
+              this.asOf  = snapshot.asOf;
+            }),
+        projectsApi.read(list => { this.projects = list; }),
+        clawsApi.read(list => { this.claws = list; }),
       ]);
     } catch (e) {
       this.error = (e as Error).message;
@@ -71,6 +139,27 @@ export class CclTasks extends LitElement {
     }
   }
 
+  /** Merge tasks changed since the last listing into the board. */
+  private async refreshChanges() {
+    if (!this.asOf || this.loading || document.visibilityState !== "visible") return;
+    try {
+      const delta = await tasksApi.changedSince(this.asOf, { archived: this.showArchived });
+      this.asOf = delta.asOf;
+      if (delta.tasks.length === 0) return;
+
+      const byId = new Map(this.items.map(t => [String(t.id), t]));
+      for (const t of delta.tasks) {
+        if (t.archived && !this.showArchived) byId.delete(String(t.id));
+        else byId.set(String(t.id), t);
+      }
+      this.items = [...byId.values()];
+      const open = this.drawerTask && byId.get(String(this.drawerTask.id));
+      if (open) this.drawerTask = open;
+    } catch {
+      /* transient – the next tick retries from the same asOf */
+    }
+  }
+
   private get filtered(): Task[] {
     return this.items.filter(t => {
       if (this.filterStatus && t.status !== this.filterStatus) return false;
@@ -131,10 +220,25 @@ export class CclTasks extends LitElement {
     if (this.drawerTask?.id === t.id) this.drawerTask = null;
   }
 
+  /** Optimistic move: the card changes column at once and moves back if the server refuses. */
   private async patchStatus(id: string, status: TaskStatus) {
-    const updated = await tasksApi.update(id, { status });
-    this.items = this.items.map(i => i.id === id ? updated : i);
-    if (this.drawerTask?.id === id) this.drawerTask = updated;
+    const before = this.items.find(i => i.id === id);
+    if (!before || before.status === status) return;
+    const moved: Task = { ...before, status };
+    this.replaceTask(moved);
+    try {
+      const updated = await tasksApi.update(id, { status });
+      // A later move of the same card wins over this response
+      if (this.items.find(i => i.id === id) === moved) this.replaceTask(updated);
+    } catch (e) {
+      if (this.items.find(i => i.id === id) === moved) this.replaceTask(before);
+      this.error = (e as Error).message;
+    }
+  }
+
+  private replaceTask(t: Task) {
+    this.items = this.items.map(i => i.id === t.id ? t : i);
+    if (this.drawerTask?.id === t.id) this.drawerTask = t;
   }
 
   private async runTask(t: Task, e: Event) {
@@ -146,7 +250,7 @@ export class CclTasks extends LitElement {
       this.items = this.items.map(i => i.id === updated.id ? updated : i);
       if (this.drawerTask?.id === t.id) {
         this.drawerTask = updated;
-        this.drawerExecutions = [exec, ...this.drawerExecutions];
+        this.applyExecution(exec);
       }
     } catch (e) {
       this.error = (e as Error).message;
@@ -165,6 +269,9 @@ export class CclTasks extends LitElement {
     try {
       this.drawerExecutions = await tasksApi.executions(t.id);
     } catch { this.drawerExecutions = []; }
+    // A transition pushed while the history loaded is newer than the listing
+    const live = this.liveRuns.get(String(t.id));
+    if (live) this.applyExecution(live);
   }
 
   private closeDrawer() { this.drawerTask = null; }
@@ -177,10 +284,9 @@ export class CclTasks extends LitElement {
   private dragOver(e: DragEvent) { e.preventDefault(); }
   private async drop(e: DragEvent, status: TaskStatus) {
     e.preventDefault();
-    if (this.dragTaskId) {
-      await this.patchStatus(this.dragTaskId, status);
-      this.dragTaskId = "";
-    }
+    const id = this.dragTaskId;
+    this.dragTaskId = "";
+    if (id) await this.patchStatus(id, status);
   }
 
   // ---------------------------------------------------------------------------
@@ -207,6 +313,13 @@ export class CclTasks extends LitElement {
     return html`<span class="badge ${map[s]}">${STATUS_LABELS[s]}</span>`;
   }
 
+  /** The task's latest execution, as pushed since the board opened. */
+  private runBadge(t: Task) {
+    const run = this.liveRuns.get(String(t.id));
+    if (!run) return "";
+    return html`<span class="badge ${EXECUTION_COLOR[run.status] ?? "badge-gray"}" title="Latest run">${run.status}</span>`;
+  }
+
   private formatDate(d?: string) {
     if (!d) return "";
     return new Date(d).toLocaleDateString(undefined, { month: "short", day: "numeric" });
@@ -308,6 +421,7 @@ export class CclTasks extends LitElement {
                   <div class="task-card-meta">
                     <span class="task-key">${t.key}</span>
                     ${this.priorityBadge(t.priority)}
+                    ${this.runBadge(t)}
                     ${t.assignedClawId
                       ? html`<span style="font-size:11px;color:var(--muted)">${this.clawName(t.assignedClawId)}</span>`
                       : ""}
@@ -358,7 +472,7 @@ export class CclTasks extends LitElement {
                   <div style="font-weight:500;color:var(--text-strong)">${t.title}</div>
                   <div style="font-size:11px;font-family:var(--mono);color:var(--muted)">${t.key}</div>
                 </td>
-                <td>${this.statusBadge(t.status)}</td>
+                <td>${this.statusBadge(t.status)} ${this.runBadge(t)}</td>
                 <td>${this.priorityBadge(t.priority)}</td>
                 <td style="font-size:12px;color:var(--muted)">${this.projectName(t.projectId)}</td>
                 <td style="font-size:12px;color:var(--muted)">${this.clawName(t.assignedClawId)}</td>
@@ -630,16 +744,12 @@ export class CclTasks extends LitElement {
     if (this.drawerExecutions.length === 0) {
       return html`<div class="empty-state"><div class="empty-state-title">No executions yet</div></div>`;
     }
-    const statusColor: Record<string, string> = {
-      completed: "badge-green", failed: "badge-red",
-      running: "badge-blue", pending: "badge-gray", cancelled: "badge-gray",
-    };
     return html`
       <div style="display:grid;gap:10px">
         ${this.drawerExecutions.map(ex => html`
           <div class="card">
             <div style="display:flex;align-items:center;justify-content:space-between;margin-bottom:8px">
-              <span class="badge ${statusColor[ex.status] ?? "badge-gray"}">${ex.status}</span>
+              <span class="badge ${EXECUTION_COLOR[ex.status] ?? "badge-gray"}">${ex.status}</span>
               <span style="font-size:11px;color:var(--muted)">${this.formatDate(ex.createdAt)}</span>
             </div>
             ${ex.result ? html`